@@ -1,6 +1,19 @@
+import argparse
 import pygame
 import random
 
+# Argumenty příkazové řádky
+parser = argparse.ArgumentParser(description="Fantasy Adventure")
+parser.add_argument("--render", choices=["dirty", "updates", "full"], default="dirty",
+                    help="vykreslování: dirty = LayeredDirty, updates = LayeredUpdates (RenderUpdates s vrstvami), obojí jen změněné "
+                         "obdélníky, full = celá obrazovka každý snímek (výchozí dirty)")
+parser.add_argument("--monsters", type=int, default=5, help="počet nepřátel (výchozí 5)")
+parser.add_argument("--dirty-limit", type=int, default=100,
+                    help="v režimu dirty se nad tímto počtem spritů kreslí celá obrazovka najednou (výchozí 100)")
+parser.add_argument("--frames", type=int,
+                    help="měření: ukončit po daném počtu snímků (bez omezení na FPS) a vypsat průměrné FPS")
+args = parser.parse_args()
+
 # Inicializace Pygame
 pygame.init()
 
@@ -17,6 +30,10 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Fantasy Adventure")
 clock = pygame.time.Clock()
 
+# Pozadí, kterým se překreslují místa, odkud se sprity posunuly
+background = pygame.Surface((WIDTH, HEIGHT)).convert()
+background.fill(WHITE)
+
 # Vytvoření obrázků pro hrdinu a monstrum
 hero_img = pygame.Surface((50, 50), pygame.SRCALPHA)
 hero_img.fill((0, 0, 255))  # Modrá postava
@@ -26,20 +43,31 @@ monster_img = pygame.Surface((50, 50), pygame.SRCALPHA)
 monster_img.fill((255, 0, 0))  # Červené monstrum
 pygame.image.save(monster_img, "monster.png")
 
+def load_image(path):
+    # Převod do formátu obrazovky, jinak se obrázek převádí při každém vykreslení.
+    # Průhlednost per pixel (convert_alpha) jen u obrázků, které průhledné pixely mají,
+    # neprůhledné obrázky se kopírují bez míchání barev (convert) a mnohem rychleji
+    image = pygame.image.load(path)
+    width, height = image.get_size()
+    if image.get_flags() & pygame.SRCALPHA and pygame.mask.from_surface(image, 254).count() < width * height:
+        return image.convert_alpha()
+    return image.convert()
+
 # Načtení obrázků
-hero_img = pygame.image.load("hero.png")
-monster_img = pygame.image.load("monster.png")
+hero_img = load_image("hero.png")
+monster_img = load_image("monster.png")
 
 # Třída hráče
-class Hero(pygame.sprite.Sprite):
+class Hero(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
         self.image = hero_img
         self.rect = self.image.get_rect(center=(WIDTH//2, HEIGHT//2))
         self.speed = 5
-    
+
     def update(self):
         keys = pygame.key.get_pressed()
+        x, y = self.rect.topleft
         if keys[pygame.K_LEFT]:
             self.rect.x -= self.speed
         if keys[pygame.K_RIGHT]:
@@ -48,53 +76,90 @@ class Hero(pygame.sprite.Sprite):
             self.rect.y -= self.speed
         if keys[pygame.K_DOWN]:
             self.rect.y += self.speed
+        # Překreslit jen po pohybu
+        if self.rect.topleft != (x, y):
+            self.dirty = 1
 
 # Třída nepřátel
-class Monster(pygame.sprite.Sprite):
+class Monster(pygame.sprite.DirtySprite):
     def __init__(self, x, y):
         super().__init__()
         self.image = monster_img
         self.rect = self.image.get_rect(center=(x, y))
         self.speed = random.randint(1, 3)
-    
+
     def update(self):
         self.rect.y += self.speed
         if self.rect.top > HEIGHT:
             self.rect.y = random.randint(-100, -40)
             self.rect.x = random.randint(0, WIDTH)
+        self.dirty = 1
 
 # Skóre
 score = 0
 font = pygame.font.Font(None, 36)
 
+# Text skóre se vykreslí znovu jen při změně skóre
+class Score(pygame.sprite.DirtySprite):
+    def __init__(self):
+        super().__init__()
+        self.value = None
+        self.set(0)
+
+    def set(self, value):
+        if value != self.value:
+            self.value = value
+            self.image = font.render(f"Skóre: {value}", True, BLACK).convert_alpha()
+            self.rect = self.image.get_rect(topleft=(10, 10))
+            self.dirty = 1
+
+score_sprite = Score()
+
 def draw_score():
-    score_text = font.render(f"Skóre: {score}", True, BLACK)
-    screen.blit(score_text, (10, 10))
+    score_sprite.set(score)
+    screen.blit(score_sprite.image, score_sprite.rect)
 
 # Skupiny sprite objektů
-all_sprites = pygame.sprite.Group()
+if args.render == "dirty":
+    all_sprites = pygame.sprite.LayeredDirty()
+    all_sprites.clear(screen, background)
+elif args.render == "updates":
+    all_sprites = pygame.sprite.LayeredUpdates()
+else:
+    all_sprites = pygame.sprite.Group()
 monsters = pygame.sprite.Group()
 hero = Hero()
 all_sprites.add(hero)
 
 # Generování nepřátel
-for _ in range(5):
+for _ in range(args.monsters):
     monster = Monster(random.randint(0, WIDTH), random.randint(-100, -40))
     all_sprites.add(monster)
     monsters.add(monster)
 
+# Skóre je ve vrstvě nad ostatními sprity (kromě vykreslování celé obrazovky)
+if args.render != "full":
+    all_sprites.add(score_sprite, layer=1)
+
+# První snímek se vykreslí celý, dál jen změny
+screen.blit(background, (0, 0))
+pygame.display.flip()
+
 # Herní smyčka
 running = True
+full_frame = False
+frames = 0
+start = pygame.time.get_ticks()
 while running:
-    clock.tick(FPS)
-    
+    clock.tick(FPS if args.frames is None else 0)
+
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-    
-    # Aktualizace objektů
+
+    # Aktualizace objektů (skóre se nehýbe, změní ho jen kolize)
     all_sprites.update()
-    
+
     # Kontrola kolize
     hits = pygame.sprite.spritecollide(hero, monsters, True)
     for hit in hits:
@@ -102,11 +167,37 @@ while running:
         new_monster = Monster(random.randint(0, WIDTH), random.randint(-100, -40))
         all_sprites.add(new_monster)
         monsters.add(new_monster)
-    
+
     # Vykreslení objektů
-    screen.fill(WHITE)
-    all_sprites.draw(screen)
-    draw_score()
-    pygame.display.flip()
+    if args.render == "full":
+        screen.fill(WHITE)
+        all_sprites.draw(screen)
+        draw_score()
+        pygame.display.flip()
+    elif args.render == "dirty" and len(all_sprites) > args.dirty_limit:
+        # Když se hýbou tisíce spritů, je změněná skoro celá obrazovka a jedno
+        # dávkové blits() s flip() je rychlejší než tisíce obdélníků
+        score_sprite.set(score)
+        screen.blit(background, (0, 0))
+        screen.blits([(sprite.image, sprite.rect) for sprite in all_sprites.sprites()], False)
+        pygame.display.flip()
+        full_frame = True
+    else:
+        score_sprite.set(score)
+        if args.render == "updates":
+            all_sprites.clear(screen, background)
+        elif full_frame:
+            # Po celých snímcích neplatí zapamatované obdélníky, jednou se překreslí vše
+            all_sprites.repaint_rect(screen.get_rect())
+            full_frame = False
+        pygame.display.update(all_sprites.draw(screen))
+
+    frames += 1
+    if args.frames is not None and frames >= args.frames:
+        running = False
+
+if args.frames is not None:
+    seconds = (pygame.time.get_ticks() - start) / 1000
+    print(f"{args.render}: {frames} snímků, {frames / seconds:.1f} FPS" if seconds else f"{args.render}: {frames} snímků")
 
 pygame.quit()
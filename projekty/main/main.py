@@ -7,65 +7,75 @@ email: seifert.promotion@gmail.com
 
 import sys
 import csv
-import requests
-from bs4 import BeautifulSoup
-import time
 import os
+from urllib.parse import urljoin, parse_qs, urlsplit
+
+# Sdílené moduly obou scraperů jsou v balíčku projekty/volby
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from volby.stahovani import nastav_stahovac, vytvor_stahovac, ziskej_stahovac, stahni
+from volby.parsery import VYCHOZI_BACKEND, nacti_tabulky
+from volby.zapis import CsvZapisovac
+from volby.databaze import PRIPONA_SQLITE, SqliteZapisovac
+from volby.model import VysledekObce
+from volby.extrakce import extrahuj_data_obce
+from volby.definice import VOLBY, VYCHOZI_VOLBY, najdi_volby, povolene_url
+from volby.prirustek import NOVA, ZMENENO, StavObnoveni
+from volby.rejstrik import RejstrikObci, cesta_rejstriku, obce_z_prehledu
+
+# Výchozí strop požadavků za sekundu na server (dříve pevná pauza 0,5 s po každé obci)
+VYCHOZI_RYCHLOST = 2.0
 
 def zkontroluj_argumenty():
     """
     Kontroluje a validuje vstupní argumenty programu.
     
     Returns:
-        tuple: (url, vystup) - URL adresa a název výstupního souboru
+        tuple: (url, vystup, prirustkove, rychlost) - URL adresa, název výstupního souboru,
+               zda obnovit jen změněné obce (--incremental) a strop požadavků za sekundu (--rate)
         
     Raises:
         SystemExit: Pokud argumenty nejsou validní
     """
-    if len(sys.argv) != 3:
-        print("Použití: python main.py \"url\" název_souboru.csv")
+    argumenty = sys.argv[1:]
+    prirustkove = '--incremental' in argumenty
+    if prirustkove:
+        argumenty.remove('--incremental')
+    rychlost = VYCHOZI_RYCHLOST
+    if '--rate' in argumenty:
+        index = argumenty.index('--rate')
+        try:
+            rychlost = float(argumenty[index + 1])
+        except (IndexError, ValueError):
+            rychlost = 0
+        if rychlost <= 0:
+            print("Chyba: --rate musí být kladné číslo (požadavky za sekundu)")
+            sys.exit(1)
+        del argumenty[index:index + 2]
+    if len(argumenty) != 2:
+        print("Použití: python main.py \"url\" název_souboru.csv [--incremental] [--rate R]")
         sys.exit(1)
     
-    url = sys.argv[1]
-    vystup = sys.argv[2]
+    url, vystup = argumenty
     
-    if not url.startswith(("https://volby.cz/pls/ps2017nss/", "https://www.volby.cz/pls/ps2017nss/")):
+    # Adresáře podporovaných voleb (volby.definice); lokální adresy patří
+    # serveru scraper/lokalni_server.py (měření bez sítě)
+    if not url.startswith(povolene_url()):
         print("Chyba: Neplatná URL, musí být z volby.cz")
         sys.exit(1)
     
-    if not vystup.endswith('.csv'):
-        print("Chyba: Výstupní soubor musí mít příponu .csv")
+    if not vystup.endswith(('.csv', PRIPONA_SQLITE)):
+        print(f"Chyba: Výstupní soubor musí mít příponu .csv nebo {PRIPONA_SQLITE}")
         sys.exit(1)
     
-    return url, vystup
+    return url, vystup, prirustkove, rychlost
 
-def nacti_stranku(url):
-    """
-    Načte obsah webové stránky a vrátí parsovaný HTML objekt.
-    
-    Args:
-        url (str): URL adresa stránky k načtení
-        
-    Returns:
-        BeautifulSoup: Parsovaný HTML obsah
-        
-    Raises:
-        SystemExit: Pokud se nepodaří stránku načíst
-    """
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
-    except Exception as e:
-        print(f"Chyba při načítání stránky: {e}")
-        sys.exit(1)
-
-def ziskej_obce(soup):
+def ziskej_obce(soup, url="https://volby.cz/pls/ps2017nss/"):
     """
     Získává seznam obcí z hlavní stránky.
     
     Args:
         soup (BeautifulSoup): Parsovaný HTML obsah hlavní stránky
+        url (str): URL adresa hlavní stránky, odkazy na obce jsou vůči ní relativní
         
     Returns:
         dict: Slovník obcí ve formátu {kód: {'nazev': název, 'url': odkaz}}
@@ -74,64 +84,203 @@ def ziskej_obce(soup):
     tables = soup.find_all('table')
     
     for table in tables:
-        for row in table.find_all('tr')[2:]:  # Přeskočit hlavičku
+        # Řádky hlavičky mají jen buňky <th>, obec poznáme podle číselného kódu s odkazem
+        for row in table.find_all('tr'):
             cells = row.find_all('td')
             if len(cells) >= 3:
                 kod = cells[0].get_text(strip=True)
                 nazev = cells[1].get_text(strip=True)
                 odkaz = cells[0].find('a')['href'] if cells[0].find('a') else None
                 
-                if kod and nazev and odkaz:
+                if kod.isdigit() and nazev and odkaz:
                     obce[kod] = {
                         'nazev': nazev,
-                        'url': f"https://volby.cz/pls/ps2017nss/{odkaz}"
+                        'url': urljoin(url, odkaz)
                     }
     return obce
 
-def zpracuj_obec(obec_url):
+def nacti_obce(url, rejstrik):
+    """
+    Získá obce okresu z rejstříku obcí, nebo z přehledové stránky (a doplní je do rejstříku).
+    
+    Args:
+        url (str): URL adresa přehledové stránky okresu
+        rejstrik (RejstrikObci): Rejstřík obcí voleb
+        
+    Returns:
+        dict: Slovník obcí ve formátu {kód: {'nazev': název, 'url': odkaz}}
+    """
+    okres = parse_qs(urlsplit(url).query).get('xnumnuts', [None])[0]
+    obce = rejstrik.obce_okresu(okres, url)
+    if obce is not None:
+        print("Seznam obcí z rejstříku obcí (bez stahování přehledu)")
+        return obce
+    
+    # Buňky kódu a názvu obce jedním průchodem, při jiném rozložení stránky přes BeautifulSoup
+    html = stahni_html(url)
+    obce = obce_z_prehledu(html, url)
+    if not obce:
+        from bs4 import BeautifulSoup
+        obce = ziskej_obce(BeautifulSoup(html, 'html.parser'), url)
+    if okres and obce:
+        rejstrik.pridej_okres(okres, url, obce)
+        rejstrik.uloz()
+    return obce
+
+def stahni_html(url):
+    """
+    Stáhne obsah webové stránky jako text.
+    
+    Args:
+        url (str): URL adresa stránky k načtení
+        
+    Returns:
+        str: HTML obsah stránky
+        
+    Raises:
+        SystemExit: Pokud se nepodaří stránku načíst
+    """
+    try:
+        return stahni(url).text
+    except Exception as e:
+        print(f"Chyba při načítání stránky: {e}")
+        sys.exit(1)
+
+def zpracuj_obec(obec_url, parser=VYCHOZI_BACKEND, definice=VOLBY[VYCHOZI_VOLBY]):
     """
     Zpracuje detailní data pro jednu obec.
     
     Args:
         obec_url (str): URL adresa detailní stránky obce
+        parser (str): Backend pro čtení HTML ('stream', 'lxml' nebo 'bs4')
+        definice (DefiniceVoleb): Volby, ke kterým stránka patří (lokátory buněk)
         
     Returns:
         dict: Slovník s daty obce ve formátu:
               {'volici': počet, 'obalky': počet, 'platne': počet, 'strany': {strana: hlasy}}
     """
     try:
-        soup = nacti_stranku(obec_url)
-        data = {
-            'volici': None,
-            'obalky': None,
-            'platne': None,
-            'strany': {}
-        }
-
-        # Získání základních údajů
-        base_table = soup.find('table', {'class': 'table'})
-        if base_table:
-            rows = base_table.find_all('tr')
-            data['volici'] = rows[2].find_all('td')[3].get_text().replace('\xa0', '')
-            data['obalky'] = rows[2].find_all('td')[4].get_text().replace('\xa0', '')
-            data['platne'] = rows[2].find_all('td')[7].get_text().replace('\xa0', '')
-
-        # Získání výsledků stran - projdeme všechny tabulky s výsledky
-        results_tables = soup.find_all('table', {'class': 'table'})
-        for table in results_tables:
-            for row in table.find_all('tr')[2:]:  # Přeskočit hlavičku
-                cells = row.find_all('td')
-                if len(cells) >= 4:  # Zkontrolujeme, zda má řádek dostatek buněk
-                    strana = cells[1].get_text(strip=True)
-                    hlasy = cells[2].get_text(strip=True).replace('\xa0', '')
-                    if strana and hlasy.isdigit():
-                        data['strany'][strana] = hlasy
-        
-        return data
+        return data_z_html(stahni_html(obec_url), parser, definice)
     except Exception as e:
         print(f"Chyba u obce: {e}")
         return None
+
+def data_z_html(html, parser=VYCHOZI_BACKEND, definice=VOLBY[VYCHOZI_VOLBY]):
+    """
+    Přečte data obce z HTML detailní stránky.
+    
+    Stránka se projde jednou podle atributů headers buněk (volby.extrakce),
+    u jiného rozložení stránky se data hledají v tabulkách (data_z_tabulek).
+    
+    Args:
+        html (str): HTML obsah detailní stránky obce
+        parser (str): Backend pro čtení HTML ('stream', 'lxml' nebo 'bs4')
+        definice (DefiniceVoleb): Volby, ke kterým stránka patří (lokátory a pozice sloupců)
+        
+    Returns:
+        dict: Slovník s daty obce (viz zpracuj_obec)
+    """
+    data = extrahuj_data_obce(html, None, None, parser, definice.lokatory)
+    if data is None:
+        return data_z_tabulek(nacti_tabulky(html, parser), definice.sloupce_souhrnu)
+    return {
+        'volici': data['registrovani'],
+        'obalky': data['vydane_obalky'],
+        'platne': data['platne_hlasy'],
+        'strany': data['strany']
+    }
+
+def data_z_tabulek(tabulky, sloupce_souhrnu=(3, 4, 7)):
+    """
+    Najde volební data obce v tabulkách detailní stránky.
+    
+    Args:
+        tabulky (list): Tabulky stránky z volby.parsery.nacti_tabulky()
+        sloupce_souhrnu (tuple): Pozice buněk voličů, obálek a platných hlasů (DefiniceVoleb.sloupce_souhrnu)
+        
+    Returns:
+        dict: Slovník s daty obce (viz zpracuj_obec)
+    """
+    data = {
+        'volici': None,
+        'obalky': None,
+        'platne': None,
+        'strany': {}
+    }
+
+    # Tabulky s výsledky mají třídu "table", první z nich obsahuje základní údaje
+    results_tables = [tabulka for tabulka in tabulky if 'table' in tabulka.tridy]
+
+    # Získání základních údajů
+    if results_tables:
+        cells = results_tables[0].radky[2].td
+        volici, obalky, platne = sloupce_souhrnu
+        data['volici'] = cells[volici].replace('\xa0', '')
+        data['obalky'] = cells[obalky].replace('\xa0', '')
+        data['platne'] = cells[platne].replace('\xa0', '')
+
+    # Získání výsledků stran - projdeme všechny tabulky s výsledky
+    for tabulka in results_tables:
+        for radek in tabulka.radky[2:]:  # Přeskočit hlavičku
+            cells = radek.td
+            if len(cells) >= 4:  # Zkontrolujeme, zda má řádek dostatek buněk
+                strana = cells[1].strip()
+                hlasy = cells[2].strip().replace('\xa0', '')
+                if strana and hlasy.isdigit():
+                    data['strany'][strana] = hlasy
+    
+    return data
+    
+HLAVICKA = ['Kód obce', 'Název obce', 'Voliči', 'Obálky', 'Platné hlasy']
+
+def zapis_obec(zapisovac, kod, info):
+    """
+    Zapíše data jedné obce do průběžně ukládaného CSV souboru.
+    
+    Args:
+        zapisovac (CsvZapisovac): Zapisovač výstupního souboru
+        kod (str): Kód obce
+        info (dict): Data obce včetně názvu
+    """
+    vysledek = VysledekObce.z_hodnot(kod, info['nazev'], info['volici'], info['obalky'], info['platne'], info['strany'])
+    zapisovac.zapis_vysledek(vysledek)
+
+def vytvor_zapisovac(vystup, volby=VYCHOZI_VOLBY, okresy=None):
+    """
+    Vytvoří zapisovač podle přípony výstupního souboru.
+    
+    Args:
+        vystup (str): Název výstupního souboru (.csv nebo .sqlite)
+        volby (str): Klíč voleb ukládaný do databáze SQLite
+        okresy (dict): Slovník {kód obce: kód okresu} (ukládá se jen do SQLite)
+        
+    Returns:
+        CsvZapisovac | SqliteZapisovac: Zapisovač výstupního souboru
+    """
+    if vystup.endswith(PRIPONA_SQLITE):
+        return SqliteZapisovac(vystup, volby, okresy)
+    return CsvZapisovac(vystup, HLAVICKA, delimiter=';')
+
+def dokonci_csv(zapisovac):
+    """
+    Dokončí zápis CSV souboru.
     
+    Args:
+        zapisovac (CsvZapisovac): Zapisovač výstupního souboru
+        
+    Raises:
+        SystemExit: Pokud se nepodaří soubor uložit
+    """
+    try:
+        if not zapisovac.dokonci() and isinstance(zapisovac, CsvZapisovac):
+            # Bez dat zapíšeme alespoň hlavičku
+            with open(zapisovac.vystupni_soubor, 'w', newline='', encoding='utf-8-sig') as f:
+                csv.writer(f, delimiter=';').writerow(HLAVICKA)
+        print(f"Data uložena do: {os.path.abspath(zapisovac.vystupni_soubor)}")
+    except Exception as e:
+        print(f"Chyba při ukládání: {e}")
+        sys.exit(1)
+
 def uloz_csv(data, filename):
     """
     Ukládá data do CSV souboru.
@@ -143,57 +292,86 @@ def uloz_csv(data, filename):
     Raises:
         SystemExit: Pokud se nepodaří soubor uložit
     """
+    zapisovac = vytvor_zapisovac(filename)
     try:
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f, delimiter=';')
-            
-            # Příprava hlavičky
-            strany = sorted({strana for obec in data.values() for strana in obec['strany']})
-            header = ['Kód obce', 'Název obce', 'Voliči', 'Obálky', 'Platné hlasy'] + strany
-            writer.writerow(header)
-            
-            # Zápis dat
-            for kod, info in data.items():
-                row = [
-                    kod,
-                    info['nazev'],
-                    info['volici'],
-                    info['obalky'],
-                    info['platne']
-                ]
-                row += [info['strany'].get(strana, '0') for strana in strany]
-                writer.writerow(row)
-        
-        print(f"Data uložena do: {os.path.abspath(filename)}")
+        for kod, info in data.items():
+            zapis_obec(zapisovac, kod, info)
     except Exception as e:
         print(f"Chyba při ukládání: {e}")
         sys.exit(1)
+    dokonci_csv(zapisovac)
+
+def obnov_obec(stav, kod, obec_url, definice=VOLBY[VYCHOZI_VOLBY]):
+    """
+    Ověří stránku obce proti minulému běhu a znovu ji zpracuje, jen pokud se změnila.
+    
+    Args:
+        stav (StavObnoveni): Stav stránek z minulého běhu
+        kod (str): Kód obce
+        obec_url (str): URL adresa detailní stránky obce
+        definice (DefiniceVoleb): Volby, ke kterým stránka patří (lokátory buněk)
+        
+    Returns:
+        tuple: (data obce ve formátu zpracuj_obec, výsledek ověření z volby.prirustek),
+               při chybě (None, None)
+    """
+    try:
+        return stav.obnov(kod, obec_url, lambda html: data_z_html(html, definice=definice))
+    except Exception as e:
+        print(f"Chyba u obce: {e}")
+        return None, None
 
 def main():
     """
     Hlavní funkce programu. Řídí celý proces scrapování a ukládání dat.
     """
-    url, vystup = zkontroluj_argumenty()
+    url, vystup, prirustkove, rychlost = zkontroluj_argumenty()
+    nastav_stahovac(vytvor_stahovac(rychlost))
     print(f"Start scrapování: {url}")
+    # Lokální server bez adresáře voleb v URL = výchozí volby
+    definice = najdi_volby(url) or VOLBY[VYCHOZI_VOLBY]
     
-    # Získání seznamu obcí
-    soup = nacti_stranku(url)
-    obce = ziskej_obce(soup)
+    # Získání seznamu obcí (rejstřík obcí voleb sdílí se scraper.py, viz volby/rejstrik.py)
+    obce = nacti_obce(url, RejstrikObci(cesta_rejstriku(definice.klic, url=url), definice.klic))
     print(f"Nalezeno obcí: {len(obce)}")
     
-    # Zpracování jednotlivých obcí
-    results = {}
+    # Při --incremental se stránky jen ověří proti stavu minulého běhu
+    # a změněné obce se navíc zapíšou do souboru změn <vystup>.delta.csv
+    zaklad = os.path.splitext(vystup)[0]
+    stav = StavObnoveni(zaklad + '.stav.json') if prirustkove else None
+    zmeny = CsvZapisovac(zaklad + '.delta.csv', HLAVICKA, delimiter=';') if prirustkove else None
+    
+    # Zpracování jednotlivých obcí - každá obec se hned zapíše do CSV (nebo do SQLite)
+    # Okres obce (pro SQLite) je parametr xnumnuts přehledové stránky
+    okres = parse_qs(urlsplit(url).query).get('xnumnuts', [None])[0]
+    zapisovac = vytvor_zapisovac(vystup, definice.klic, {kod: okres for kod in obce})
     for i, (kod, info) in enumerate(obce.items(), 1):
         print(f"Zpracovávám ({i}/{len(obce)}) {info['nazev']}")
-        data = zpracuj_obec(info['url'])
+        if stav is None:
+            data = zpracuj_obec(info['url'], definice=definice)
+            vysledek = None
+        else:
+            data, vysledek = obnov_obec(stav, kod, info['url'], definice)
         if data:
-            results[kod] = {
+            zapis_obec(zapisovac, kod, {
                 'nazev': info['nazev'],
                 **data
-            }
-        time.sleep(0.5)  # Respektujme robots.txt
+            })
+            if vysledek in (ZMENENO, NOVA):
+                zapis_obec(zmeny, kod, {'nazev': info['nazev'], **data})
+        # Tempo požadavků hlídá řízení rychlosti sdíleného stahovače (volby.rizeni)
     
-    uloz_csv(results, vystup)
+    dokonci_csv(zapisovac)
+    if stav is not None:
+        stav.ponech(obce)
+        stav.uloz()
+        if zmeny.dokonci():
+            print(f"Změněné obce ({len(stav.zmenene)}) uloženy do: {os.path.abspath(zmeny.vystupni_soubor)}")
+        else:
+            print("Žádná obec se od minulého běhu nezměnila.")
+            if os.path.exists(zmeny.vystupni_soubor):
+                os.remove(zmeny.vystupni_soubor)
+    ziskej_stahovac().vypis_statistiky()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
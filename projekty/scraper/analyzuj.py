@@ -0,0 +1,86 @@
+"""
+analyzuj.py: odvozené ukazatele (účast, podíly, pořadí, součty okresů) nad výstupem scraperu
+
+Načte výstup scraper.py nebo main.py (CSV, .npz, .parquet, .feather,
+.sqlite) do matice obce × strany (volby.analyza), spočítá odvozené
+ukazatele a uloží je vedle původních sloupců. Součty po okresech nebo
+krajích vyžadují výstup .sqlite (jen ten obsahuje okresy obcí).
+
+Použití:
+    python analyzuj.py vysledky.csv vysledky_odvozene.csv
+    python analyzuj.py vysledky.sqlite odvozene.npz --skupiny kraj --souhrn kraje.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from volby.analyza import UROVNE, klice_skupin, nacti, odvozene_sloupce, souhrn_skupin, uloz_odvozene
+
+def uloz_souhrn(vysledky, souhrn, uroven, cesta):
+    """
+    Uloží součty skupin do CSV (počty, účast a hlasy stran).
+
+    Args:
+        vysledky (Vysledky): Výsledky obcí (kvůli názvům stran)
+        souhrn (tuple): Výsledek souhrn_skupin()
+        uroven (str): 'okres' nebo 'kraj' (název prvního sloupce)
+        cesta (str): Výstupní CSV soubor
+    """
+    skupiny, pocet_obci, pocty, hlasy = souhrn
+    with open(cesta, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow([uroven.capitalize(), 'Obcí', 'Voliči v seznamu', 'Vydané obálky', 'Platné hlasy', 'Účast %']
+                        + vysledky.strany)
+        for skupina, obci, (volici, obalky, platne), radek in zip(skupiny, pocet_obci, pocty, hlasy):
+            ucast = f"{100 * obalky / volici:.2f}" if volici else ''
+            writer.writerow([skupina, obci, volici, obalky, platne, ucast] + radek.tolist())
+
+def main():
+    """
+    Spustí výpočet podle argumentů.
+    """
+    parser = argparse.ArgumentParser(description="Odvozené ukazatele nad výsledky voleb.")
+    parser.add_argument("vstup", help="výstup scraperu (.csv, .npz, .parquet, .feather nebo .sqlite)")
+    parser.add_argument("vystup", help="výstupní soubor .csv nebo .npz s původními a odvozenými sloupci")
+    parser.add_argument("--volby", help="klíč voleb u databáze s více volbami (např. ps2017)")
+    parser.add_argument("--skupiny", choices=sorted(UROVNE), help="sečíst obce po okresech nebo krajích (jen .sqlite)")
+    parser.add_argument("--souhrn", metavar="SOUBOR", help="CSV se součty skupin (výchozí jen výpis)")
+    args = parser.parse_args()
+
+    if not args.vystup.endswith(('.csv', '.npz')):
+        print("ERROR: Výstupní soubor musí mít příponu .csv nebo .npz!")
+        sys.exit(1)
+    if args.souhrn and not args.skupiny:
+        print("ERROR: --souhrn vyžaduje --skupiny!")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        vysledky = nacti(args.vstup, args.volby)
+        nacteno = time.perf_counter()
+        odvozene = odvozene_sloupce(vysledky)
+        souhrn = souhrn_skupin(vysledky, klice_skupin(vysledky, args.skupiny)) if args.skupiny else None
+    except (ValueError, ImportError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    spocteno = time.perf_counter()
+    uloz_odvozene(vysledky, odvozene, args.vystup)
+    if souhrn is not None and args.souhrn:
+        uloz_souhrn(vysledky, souhrn, args.skupiny, args.souhrn)
+    konec = time.perf_counter()
+
+    print(f"Obcí: {len(vysledky)}, stran: {len(vysledky.strany)}")
+    print(f"Načtení {(nacteno - start) * 1000:.1f} ms, výpočet {(spocteno - nacteno) * 1000:.1f} ms, "
+          f"zápis {(konec - spocteno) * 1000:.1f} ms")
+    if souhrn is not None:
+        skupiny, pocet_obci, pocty, _ = souhrn
+        print(f"{args.skupiny:<8} {'obcí':>6} {'voliči':>10} {'účast %':>8}")
+        for skupina, obci, (volici, obalky, _) in zip(skupiny, pocet_obci, pocty):
+            print(f"{skupina:<8} {obci:>6} {volici:>10} {100 * obalky / volici if volici else 0:>8.2f}")
+    print(f"Data uložena do: {args.vystup}" + (f" a {args.souhrn}" if args.souhrn and souhrn is not None else ''))
+
+if __name__ == "__main__":
+    main()
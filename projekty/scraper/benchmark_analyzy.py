@@ -0,0 +1,119 @@
+"""
+benchmark_analyzy.py: doba výpočtu odvozených ukazatelů pro celou republiku
+
+Vytvoří syntetická data velikosti celostátních voleb (výchozí 6254 obcí
+ve 77 okresech, 31 stran), uloží je zapisovači scraperu do CSV, .npz
+a .sqlite a změří načtení (volby.analyza.nacti), výpočet účasti, podílů,
+pořadí a vítězů, součty okresů a krajů a zápis odvozených sloupců.
+Pro srovnání změří i stejný výpočet cykly přes slovníky obcí.
+
+Použití:
+    python benchmark_analyzy.py [--obci 6254] [--stran 31] [--opakovani 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from volby.analyza import klice_skupin, nacti, odvozene_sloupce, souhrn_skupin, uloz_odvozene
+from volby.databaze import SqliteZapisovac
+from volby.sloupcove import SloupcovyZapisovac
+from volby.zapis import CsvZapisovac
+
+HLAVICKA = ['Kód obce', 'Název obce', 'Voliči v seznamu', 'Vydané obálky', 'Platné hlasy']
+
+def synteticka_data(obci, stran, okresu=77, seed=1):
+    """
+    Returns:
+        tuple: (seznam slovníků obcí jako z ziskej_data_obce(), slovník {kód obce: kód okresu})
+    """
+    nahoda = random.Random(seed)
+    strany = [f"Strana {i:02d}" for i in range(stran)]
+    obce, okresy = [], {}
+    for i in range(obci):
+        registrovani = nahoda.randint(50, 5000)
+        obalky = int(registrovani * nahoda.uniform(0.4, 0.8))
+        hlasy = {strana: nahoda.randint(0, obalky // 4) for strana in strany}
+        kod = str(500000 + i)
+        obce.append({
+            'kod': kod, 'nazev': f"Obec {i}", 'registrovani': registrovani, 'vydane_obalky': obalky,
+            'platne_hlasy': sum(hlasy.values()), 'strany': hlasy,
+        })
+        okresy[kod] = f"{nahoda.choice((21, 31, 32, 41, 42, 51, 52, 53, 61, 62, 71, 72, 80))}{i % okresu:02d}"
+    return obce, okresy
+
+def smyckami(obce, okresy):
+    """
+    Stejné ukazatele spočítané cykly přes slovníky (dosavadní ad-hoc skripty).
+    """
+    souhrn = {}
+    for obec in obce:
+        ucast = obec['vydane_obalky'] / obec['registrovani']
+        podily = {strana: hlasy / obec['platne_hlasy'] for strana, hlasy in obec['strany'].items()}
+        poradi = {strana: i for i, strana in enumerate(sorted(obec['strany'], key=obec['strany'].get, reverse=True), 1)}
+        skupina = souhrn.setdefault(okresy[obec['kod']], {'obci': 0, 'registrovani': 0, 'strany': {}})
+        skupina['obci'] += 1
+        skupina['registrovani'] += obec['registrovani']
+        for strana, hlasy in obec['strany'].items():
+            skupina['strany'][strana] = skupina['strany'].get(strana, 0) + hlasy
+    return ucast, podily, poradi, souhrn
+
+def zmer(funkce, opakovani):
+    """
+    Returns:
+        float: Nejkratší doba jednoho volání v milisekundách
+    """
+    doby = []
+    for _ in range(opakovani):
+        start = time.perf_counter()
+        funkce()
+        doby.append(time.perf_counter() - start)
+    return min(doby) * 1000
+
+def main():
+    """
+    Spustí měření.
+    """
+    parser = argparse.ArgumentParser(description="Měření výpočtu odvozených ukazatelů pro celou republiku.")
+    parser.add_argument("--obci", type=int, default=6254, help="počet obcí (výchozí 6254)")
+    parser.add_argument("--stran", type=int, default=31, help="počet stran (výchozí 31)")
+    parser.add_argument("--opakovani", type=int, default=5, help="počet opakování, bere se nejlepší (výchozí 5)")
+    args = parser.parse_args()
+
+    obce, okresy = synteticka_data(args.obci, args.stran)
+    print(f"Obcí: {args.obci}, stran: {args.stran}")
+    with tempfile.TemporaryDirectory() as adresar:
+        soubory = {
+            'csv': CsvZapisovac(os.path.join(adresar, 'v.csv'), HLAVICKA, delimiter=';'),
+            'npz': SloupcovyZapisovac(os.path.join(adresar, 'v.npz'), HLAVICKA, 'npz'),
+            'sqlite': SqliteZapisovac(os.path.join(adresar, 'v.sqlite'), 'ps2017', okresy),
+        }
+        for zapisovac in soubory.values():
+            for obec in obce:
+                zapisovac.zapis(
+                    [obec['kod'], obec['nazev'], obec['registrovani'], obec['vydane_obalky'], obec['platne_hlasy']],
+                    obec['strany'],
+                )
+            zapisovac.dokonci()
+
+        for nazev, zapisovac in soubory.items():
+            print(f"načtení {nazev:<8}: {zmer(lambda: nacti(zapisovac.vystupni_soubor), args.opakovani):8.1f} ms")
+
+        vysledky = nacti(soubory['sqlite'].vystupni_soubor)
+        odvozene = odvozene_sloupce(vysledky)
+        mereni = {
+            'ukazatele obcí (numpy)': lambda: odvozene_sloupce(vysledky),
+            'součty okresů (numpy)': lambda: souhrn_skupin(vysledky, klice_skupin(vysledky, 'okres')),
+            'součty krajů (numpy)': lambda: souhrn_skupin(vysledky, klice_skupin(vysledky, 'kraj')),
+            'zápis odvozeného CSV': lambda: uloz_odvozene(vysledky, odvozene, os.path.join(adresar, 'o.csv')),
+            'zápis odvozeného npz': lambda: uloz_odvozene(vysledky, odvozene, os.path.join(adresar, 'o.npz')),
+            'vše cykly přes slovníky': lambda: smyckami(obce, okresy),
+        }
+        for nazev, funkce in mereni.items():
+            print(f"{nazev:<26}: {zmer(funkce, args.opakovani):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+benchmark_extrakce.py: jednoprůchodová extrakce proti hledání v tabulkách
+
+Na uložených stránkách obcí (korpus/ps311*.html) změří dobu, za kterou
+vznikne záznam VysledekObce:
+
+    tabulky (scraper.py) - nacti_tabulky() + vysledek_z_tabulek()
+    tabulky (main.py)    - nacti_tabulky() + data_z_tabulek()
+    extrakce             - volby.extrakce.extrahuj_obec(), jeden průchod podle headers
+
+a ověří, že extrakce dává stejné výsledky jako main.py (jehož pozice
+buněk odpovídají skutečnému rozložení stránky).
+
+Použití:
+    python benchmark_extrakce.py [stranka.html ...] [--opakovani 200]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ADRESAR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ADRESAR, '..'))
+sys.path.insert(0, os.path.join(ADRESAR, '..', 'main'))
+
+from volby.extrakce import extrahuj_obec
+from volby.model import VysledekObce
+from volby.parsery import BACKENDY, nacti_tabulky
+from volby.sber import vysledek_z_tabulek
+from main import data_z_tabulek
+
+def tabulky_scraper(html, backend):
+    return VysledekObce.ze_slovniku(vysledek_z_tabulek('0', 'obec', nacti_tabulky(html, backend)))
+
+def tabulky_main(html, backend):
+    data = data_z_tabulek(nacti_tabulky(html, backend))
+    return VysledekObce.z_hodnot('0', 'obec', data['volici'], data['obalky'], data['platne'], data['strany'])
+
+def extrakce(html, backend):
+    return extrahuj_obec(html, '0', 'obec', backend)
+
+ZPUSOBY = {
+    'tabulky (scraper.py)': tabulky_scraper,
+    'tabulky (main.py)': tabulky_main,
+    'extrakce': extrakce,
+}
+
+def zmer(funkce, backend, stranky, opakovani):
+    """
+    Změří průměrnou dobu zpracování jedné stránky.
+
+    Args:
+        funkce (callable): Funkce (html, backend) -> VysledekObce
+        backend (str): Název backendu
+        stranky (list): Seznam HTML obsahů stránek
+        opakovani (int): Kolikrát se každá stránka zpracuje
+
+    Returns:
+        float: Průměrná doba na stránku v milisekundách
+    """
+    start = time.perf_counter()
+    for _ in range(opakovani):
+        for html in stranky:
+            funkce(html, backend)
+    return (time.perf_counter() - start) / (opakovani * len(stranky)) * 1000
+
+def main():
+    """
+    Spustí porovnání.
+    """
+    parser = argparse.ArgumentParser(description="Porovnání jednoprůchodové extrakce s hledáním v tabulkách.")
+    parser.add_argument("soubory", nargs="*", default=sorted(glob.glob(os.path.join(ADRESAR, 'korpus', 'ps311*.html'))),
+                        help="uložené stránky obcí (výchozí korpus/ps311*.html)")
+    parser.add_argument("--opakovani", type=int, default=200, help="počet opakování (výchozí 200)")
+    args = parser.parse_args()
+
+    stranky = []
+    for soubor in args.soubory:
+        with open(soubor, encoding='utf-8') as f:
+            stranky.append(f.read())
+
+    backendy = []
+    for backend in BACKENDY:
+        try:
+            extrakce(stranky[0], backend)
+        except ImportError as e:
+            print(f"{backend:>8}: přeskočeno ({e})")
+            continue
+        backendy.append(backend)
+
+    for html in stranky:
+        ocekavany = tabulky_main(html, 'bs4')
+        for backend in backendy:
+            if extrakce(html, backend) != ocekavany:
+                print(f"ERROR: Extrakce s backendem {backend} dává jiný výsledek než main.py!")
+                sys.exit(1)
+
+    print(f"Stránek: {len(stranky)}, opakování: {args.opakovani}")
+    for backend in backendy:
+        zaklad = None
+        for nazev, funkce in ZPUSOBY.items():
+            ms = zmer(funkce, backend, stranky, args.opakovani)
+            zaklad = zaklad or ms
+            print(f"{backend:>8} {nazev:<22}: {ms:7.3f} ms/stránka ({zaklad / ms:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+benchmark_pameti.py: paměťová náročnost výsledků obcí
+
+Porovná paměť, kterou zabírají výsledky celé republiky (~6250 obcí) držené
+jako slovníky řetězců (původní podoba ze scraperu) a jako záznamy
+volby.model.VysledekObce. Data jsou syntetická, ale mají stejný tvar
+jako skutečné stránky (26 stran, počty jako text s mezerami).
+
+Použití:
+    python benchmark_pameti.py [--obci 6250] [--stran 26]
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+ADRESAR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ADRESAR, '..'))
+
+from volby.model import VysledekObce
+
+def pocet_jako_text(pocet):
+    """
+    Vrátí počet ve tvaru ze stránky - tisíce oddělené pevnou mezerou.
+    """
+    return f"{pocet:,}".replace(',', '\xa0')
+
+def vytvor_slovniky(obci, stran):
+    """
+    Vytvoří syntetické výsledky obcí jako slovníky řetězců.
+
+    Args:
+        obci (int): Počet obcí
+        stran (int): Počet stran v každé obci
+
+    Returns:
+        list: Slovníky ve tvaru výsledku volby.sber.vysledek_z_tabulek()
+    """
+    nahoda = random.Random(42)
+    vysledky = []
+    for i in range(obci):
+        registrovani = nahoda.randint(50, 20000)
+        platne = registrovani * 6 // 10
+        vysledky.append({
+            # Kódy i názvy vznikají při parsování jako nové řetězce, proto f-string
+            'kod': f"{500000 + i}",
+            'nazev': f"Obec {i}",
+            'registrovani': pocet_jako_text(registrovani),
+            'vydane_obalky': pocet_jako_text(platne + 3),
+            'platne_hlasy': pocet_jako_text(platne),
+            'strany': {f"Strana číslo {s}": pocet_jako_text(nahoda.randint(0, platne // 4)) for s in range(stran)},
+        })
+    return vysledky
+
+def zmer(vytvor):
+    """
+    Změří paměť alokovanou funkcí a ponechanou v jejím výsledku.
+
+    Returns:
+        tuple: (výsledek, počet bajtů)
+    """
+    tracemalloc.start()
+    vysledek = vytvor()
+    aktualni, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return vysledek, aktualni
+
+def main():
+    parser = argparse.ArgumentParser(description="Porovná paměť výsledků obcí jako slovníků a jako VysledekObce.")
+    parser.add_argument('--obci', type=int, default=6250, help="Počet obcí (výchozí 6250)")
+    parser.add_argument('--stran', type=int, default=26, help="Počet stran (výchozí 26)")
+    args = parser.parse_args()
+
+    slovniky, pamet_slovniku = zmer(lambda: vytvor_slovniky(args.obci, args.stran))
+    # Záznamy sdílí řetězce kódu a názvu se slovníky, ty se tedy do jejich paměti nezapočítají
+    # (stejně jako ve scraperu, kde záznam přebírá řetězce z parseru)
+    zaznamy, pamet_zaznamu = zmer(lambda: [VysledekObce.ze_slovniku(data) for data in slovniky])
+
+    # Kontrola, že převod nic neztratil
+    for data, zaznam in zip(slovniky, zaznamy):
+        assert zaznam.jako_slovnik()['strany'] == {
+            strana: int(pocet.replace('\xa0', '')) for strana, pocet in data['strany'].items()
+        }
+
+    print(f"{args.obci} obcí, {args.stran} stran")
+    print(f"slovníky řetězců: {pamet_slovniku / 1024 / 1024:8.2f} MB ({pamet_slovniku / args.obci:6.0f} B/obec)")
+    print(f"VysledekObce:     {pamet_zaznamu / 1024 / 1024:8.2f} MB ({pamet_zaznamu / args.obci:6.0f} B/obec)")
+    print(f"úspora:           {1 - pamet_zaznamu / pamet_slovniku:8.1%}")
+
+if __name__ == "__main__":
+    main()
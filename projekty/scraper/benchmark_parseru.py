@@ -0,0 +1,98 @@
+"""
+benchmark_parseru.py: porovnání backendů pro čtení HTML na uložených stránkách
+
+Pro každý backend z volby.parsery změří průměrnou dobu zpracování jedné
+stránky a ověří, že výsledky (scraper.py i main.py) jsou pro všechny
+backendy stejné.
+
+Použití:
+    python benchmark_parseru.py [korpus/ps311*.html ...] [--opakovani 5]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ADRESAR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ADRESAR, '..'))
+sys.path.insert(0, os.path.join(ADRESAR, '..', 'main'))
+
+from volby.parsery import BACKENDY, nacti_tabulky
+from volby.sber import vysledek_z_tabulek
+from main import data_z_tabulek
+
+def vysledek_nebo_chyba(funkce, *args):
+    """
+    Zavolá funkci a vrátí její výsledek, nebo název vyhozené výjimky.
+    
+    Returns:
+        object: Výsledek funkce nebo název třídy výjimky
+    """
+    try:
+        return funkce(*args)
+    except Exception as e:
+        return type(e).__name__
+
+def zmer(backend, stranky, opakovani):
+    """
+    Změří průměrnou dobu zpracování jedné stránky.
+    
+    Args:
+        backend (str): Název backendu
+        stranky (list): Seznam HTML obsahů stránek
+        opakovani (int): Kolikrát se každá stránka zpracuje
+        
+    Returns:
+        float: Průměrná doba na stránku v milisekundách
+    """
+    start = time.perf_counter()
+    for _ in range(opakovani):
+        for html in stranky:
+            vysledek_z_tabulek('0', 'obec', nacti_tabulky(html, backend))
+    return (time.perf_counter() - start) / (opakovani * len(stranky)) * 1000
+
+def main():
+    """
+    Spustí porovnání backendů.
+    """
+    parser = argparse.ArgumentParser(description="Porovnání backendů pro čtení HTML stránek volby.cz.")
+    parser.add_argument("soubory", nargs="*", default=sorted(glob.glob(os.path.join(ADRESAR, 'korpus', 'ps311*.html'))),
+                        help="uložené stránky obcí (výchozí korpus/ps311*.html)")
+    parser.add_argument("--opakovani", type=int, default=5, help="počet opakování celého korpusu (výchozí 5)")
+    args = parser.parse_args()
+
+    stranky = []
+    for soubor in args.soubory:
+        with open(soubor, encoding='utf-8') as f:
+            stranky.append(f.read())
+
+    backendy = []
+    for backend in BACKENDY:
+        try:
+            nacti_tabulky(stranky[0], backend)
+        except ImportError as e:
+            print(f"{backend:>8}: přeskočeno ({e})")
+            continue
+        backendy.append(backend)
+
+    # Všechny backendy musí dát stejné výsledky jako původní bs4 cesta
+    for html in stranky:
+        tabulky = {backend: nacti_tabulky(html, backend) for backend in backendy}
+        for backend in backendy:
+            if vysledek_z_tabulek('0', 'obec', tabulky[backend]) != vysledek_z_tabulek('0', 'obec', tabulky['bs4']):
+                print(f"ERROR: Backend {backend} dává jiný výsledek (scraper.py) než bs4!")
+                sys.exit(1)
+            if vysledek_nebo_chyba(data_z_tabulek, tabulky[backend]) != vysledek_nebo_chyba(data_z_tabulek, tabulky['bs4']):
+                print(f"ERROR: Backend {backend} dává jiný výsledek (main.py) než bs4!")
+                sys.exit(1)
+
+    print(f"Stránek: {len(stranky)}, opakování: {args.opakovani}")
+    zaklad = None
+    for backend in ('bs4',) + tuple(b for b in backendy if b != 'bs4'):
+        ms = zmer(backend, stranky, args.opakovani)
+        zaklad = zaklad or ms
+        print(f"{backend:>8}: {ms:7.3f} ms/stránka ({zaklad / ms:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+benchmark_scraperu.py: měření scraper.py a main.py bez sítě
+
+Spustí lokalni_server.py s korpusem uložených stránek (se zadaným
+zpožděním, rozptylem a chybovostí) a změří:
+
+    etapy - stahování, zpracování HTML a zápis CSV zvlášť (v tomto procesu),
+            pro každou etapu stránky/s a p50/p99 doby jedné stránky
+    e2e   - celý běh scraper.py a main.py jako samostatný proces:
+            doba běhu, stránky/s, p50/p99 doby požadavku na serveru
+            a maximální RSS procesu
+    start - studený start příkazů (--help, chybné argumenty) s -X importtime:
+            doba procesu, doba importů a načtené těžké knihovny
+            (stejné jako python -m volby bench)
+
+Každý běh používá prázdnou dočasnou cache, takže se měří stahování ze
+serveru. Výsledky lze uložit do JSON (--json) a porovnat mezi změnami.
+
+Použití:
+    python benchmark_scraperu.py [--zpozdeni 0.02] [--jitter 0.01] [--chybovost 0] [--seed 1]
+    python benchmark_scraperu.py --mereni e2e --skripty scraper --scraper-args "--concurrency 8 --rate 50"
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+ADRESAR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ADRESAR, '..'))
+sys.path.insert(0, os.path.join(ADRESAR, '..', 'main'))
+
+from lokalni_server import KORPUS, spust_server
+from main import HLAVICKA, data_z_html
+from volby.model import VysledekObce
+from volby.parsery import BACKENDY, VYCHOZI_BACKEND
+from volby.sber import HLAVICKA_CSV, data_ze_stranky, ziskej_odkazy_obci
+from volby.stahovani import Stahovac, nastav_stahovac, stahni
+from volby.studeny_start import vypis_starty, zmer_starty
+from volby.zapis import CsvZapisovac
+
+SKRIPTY = {
+    'scraper': os.path.join(ADRESAR, 'scraper.py'),
+    'main': os.path.join(ADRESAR, '..', 'main', 'main.py'),
+}
+
+# Okresní přehled Benešova z korpusu - každá obec má vlastní stránku (korpus/ps311-xkraj=2-*.html)
+CESTA_PREHLEDU = '/pls/ps2017nss/ps32?xjazyk=CZ&xkraj=2&xnumnuts=2101'
+
+def percentil(hodnoty, p):
+    """
+    Vrátí percentil metodou nejbližšího pořadí.
+
+    Args:
+        hodnoty (list): Naměřené hodnoty
+        p (float): Percentil 0-100
+
+    Returns:
+        float: Hodnota percentilu (0 pro prázdný seznam)
+    """
+    if not hodnoty:
+        return 0.0
+    serazene = sorted(hodnoty)
+    return serazene[min(len(serazene) - 1, max(0, round(p / 100 * len(serazene)) - 1))]
+
+def souhrn(nazev, doby, celkem):
+    """
+    Shrne doby jednotlivých stránek jedné etapy.
+
+    Args:
+        nazev (str): Název měření
+        doby (list): Doby zpracování jednotlivých stránek v sekundách
+        celkem (float): Celková doba etapy v sekundách
+
+    Returns:
+        dict: Počet stránek, doba, stránky/s, p50 a p99 v ms
+    """
+    return {
+        'nazev': nazev,
+        'stranek': len(doby),
+        'doba_s': round(celkem, 4),
+        'stranek_za_s': round(len(doby) / max(celkem, 1e-9), 1),
+        'p50_ms': round(percentil(doby, 50) * 1000, 3),
+        'p99_ms': round(percentil(doby, 99) * 1000, 3),
+    }
+
+def zmer_kazdou(funkce, polozky):
+    """
+    Zavolá funkci pro každou položku a změří dobu každého volání.
+
+    Returns:
+        tuple: (výsledky, doby jednotlivých volání, celková doba)
+    """
+    vysledky, doby = [], []
+    start = time.perf_counter()
+    for polozka in polozky:
+        zacatek = time.perf_counter()
+        vysledky.append(funkce(polozka))
+        doby.append(time.perf_counter() - zacatek)
+    return vysledky, doby, time.perf_counter() - start
+
+def zmer_etapy(url, skripty, parser):
+    """
+    Změří stahování, zpracování a zápis odděleně.
+
+    Args:
+        url (str): URL okresní přehledové stránky na lokálním serveru
+        skripty (list): Měřené skripty ('scraper', 'main')
+        parser (str): Backend pro čtení HTML
+
+    Returns:
+        list: Souhrny etap (viz souhrn())
+    """
+    nastav_stahovac(Stahovac(cache=None))
+    with contextlib.redirect_stdout(io.StringIO()):
+        obce = ziskej_odkazy_obci(url)
+    kody = list(obce)
+
+    # Stahování mají oba skripty společné (volby.stahovani)
+    html, doby, celkem = zmer_kazdou(lambda kod: stahni(obce[kod]['url']).text, kody)
+    vysledky = [souhrn('stahování', doby, celkem)]
+    stranky = dict(zip(kody, html))
+
+    with tempfile.TemporaryDirectory() as adresar:
+        if 'scraper' in skripty:
+            zaznamy, doby, celkem = zmer_kazdou(
+                lambda kod: VysledekObce.ze_slovniku(data_ze_stranky(kod, obce[kod]['nazev'], stranky[kod], parser)),
+                kody,
+            )
+            vysledky.append(souhrn('scraper.py zpracování', doby, celkem))
+            zapisovac = CsvZapisovac(os.path.join(adresar, 'scraper.csv'), HLAVICKA_CSV, delimiter=';')
+            _, doby, celkem = zmer_kazdou(zapisovac.zapis_vysledek, zaznamy)
+            zacatek = time.perf_counter()
+            zapisovac.dokonci()
+            vysledky.append(souhrn('scraper.py zápis', doby, celkem + time.perf_counter() - zacatek))
+
+        if 'main' in skripty:
+            data, doby, celkem = zmer_kazdou(lambda kod: data_z_html(stranky[kod], parser), kody)
+            vysledky.append(souhrn('main.py zpracování', doby, celkem))
+            zaznamy = [
+                VysledekObce.z_hodnot(kod, obce[kod]['nazev'], info['volici'], info['obalky'], info['platne'],
+                                      info['strany'])
+                for kod, info in zip(kody, data)
+            ]
+            zapisovac = CsvZapisovac(os.path.join(adresar, 'main.csv'), HLAVICKA, delimiter=';')
+            _, doby, celkem = zmer_kazdou(zapisovac.zapis_vysledek, zaznamy)
+            zacatek = time.perf_counter()
+            zapisovac.dokonci()
+            vysledky.append(souhrn('main.py zápis', doby, celkem + time.perf_counter() - zacatek))
+
+    return vysledky
+
+def zmer_e2e(server, url, skript, argumenty):
+    """
+    Spustí skript jako samostatný proces a změří celý běh.
+
+    Args:
+        server (ThreadingHTTPServer): Běžící lokální server (kvůli statistikám požadavků)
+        url (str): URL přehledové stránky
+        skript (str): 'scraper' nebo 'main'
+        argumenty (list): Další argumenty skriptu
+
+    Returns:
+        dict: Doba běhu, stránky/s, p50/p99 doby požadavku, chyby serveru a max. RSS v MB
+    """
+    statistiky = server.statistiky
+    with tempfile.TemporaryDirectory() as adresar:
+        # Vlastní HOME = prázdná výchozí cache (~/.cache/volby) pro každý běh
+        prostredi = dict(os.environ, HOME=adresar)
+        prikaz = [sys.executable, SKRIPTY[skript], url, os.path.join(adresar, 'vystup.csv')] + argumenty
+        pred_pozadavky, pred_chyby = statistiky['pozadavky'], statistiky['chyby']
+        pred_doby = len(statistiky['doby'])
+        with open(os.path.join(adresar, 'vystup.log'), 'wb') as log:
+            start = time.perf_counter()
+            proces = subprocess.Popen(prikaz, cwd=adresar, env=prostredi, stdout=log, stderr=subprocess.STDOUT)
+            # wait4 vrací využití prostředků právě tohoto procesu (ru_maxrss v kB)
+            _, stav, vyuziti = os.wait4(proces.pid, 0)
+            doba = time.perf_counter() - start
+        proces.returncode = os.waitstatus_to_exitcode(stav)
+
+    doby = statistiky['doby'][pred_doby:]
+    pozadavky = statistiky['pozadavky'] - pred_pozadavky
+    return {
+        'nazev': f"{os.path.basename(SKRIPTY[skript])} e2e",
+        'navratovy_kod': proces.returncode,
+        'stranek': pozadavky,
+        'chyb_serveru': statistiky['chyby'] - pred_chyby,
+        'doba_s': round(doba, 3),
+        'stranek_za_s': round(pozadavky / max(doba, 1e-9), 1),
+        'p50_ms': round(percentil(doby, 50) * 1000, 3),
+        'p99_ms': round(percentil(doby, 99) * 1000, 3),
+        'max_rss_mb': round(vyuziti.ru_maxrss / 1024, 1),
+    }
+
+def vypis(vysledky):
+    """
+    Vypíše výsledky jako tabulku.
+    """
+    print(f"{'měření':<24} {'stránek':>8} {'doba s':>9} {'str/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8}")
+    for vysledek in vysledky:
+        rss = vysledek.get('max_rss_mb')
+        print(f"{vysledek['nazev']:<24} {vysledek['stranek']:>8} {vysledek['doba_s']:>9.3f} "
+              f"{vysledek['stranek_za_s']:>9.1f} {vysledek['p50_ms']:>9.2f} {vysledek['p99_ms']:>9.2f} "
+              f"{'' if rss is None else rss:>8}")
+        if vysledek.get('navratovy_kod'):
+            print(f"  ! proces skončil s kódem {vysledek['navratovy_kod']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Měření scraper.py a main.py proti lokálnímu serveru.")
+    parser.add_argument("--korpus", default=KORPUS, help="složka s uloženými stránkami (výchozí korpus/)")
+    parser.add_argument("--zpozdeni", type=float, default=0.02, help="zpoždění odpovědi serveru v s (výchozí 0.02)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="rozptyl zpoždění ± v s (výchozí 0.01)")
+    parser.add_argument("--chybovost", type=float, default=0.0, help="podíl chybových odpovědí (výchozí 0)")
+    parser.add_argument("--kod-chyby", type=int, default=503, help="HTTP kód chybových odpovědí (výchozí 503)")
+    parser.add_argument("--seed", type=int, default=1, help="seed náhody serveru (výchozí 1)")
+    parser.add_argument("--parser", choices=sorted(BACKENDY), default=VYCHOZI_BACKEND, help="backend pro etapy")
+    parser.add_argument("--mereni", nargs='+', choices=('etapy', 'e2e', 'start'),
+                        default=['etapy', 'e2e', 'start'])
+    parser.add_argument("--skripty", nargs='+', choices=sorted(SKRIPTY), default=['scraper', 'main'])
+    parser.add_argument("--scraper-args", default='', help="další argumenty scraper.py (např. \"--concurrency 8\")")
+    parser.add_argument("--json", help="uložit výsledky do JSON souboru")
+    args = parser.parse_args()
+
+    server = spust_server(
+        korpus=args.korpus, zpozdeni=args.zpozdeni, jitter=args.jitter, chybovost=args.chybovost,
+        kod_chyby=args.kod_chyby, seed=args.seed,
+    )
+    url = f"http://127.0.0.1:{server.server_address[1]}{CESTA_PREHLEDU}"
+    print(f"Server: {url} (zpoždění {args.zpozdeni} ± {args.jitter} s, chybovost {args.chybovost:.1%})")
+
+    vysledky = []
+    try:
+        if 'etapy' in args.mereni:
+            vysledky.extend(zmer_etapy(url, args.skripty, args.parser))
+        if 'e2e' in args.mereni:
+            for skript in args.skripty:
+                argumenty = shlex.split(args.scraper_args) if skript == 'scraper' else []
+                vysledky.append(zmer_e2e(server, url, skript, argumenty))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    vypis(vysledky)
+    starty = None
+    if 'start' in args.mereni:
+        starty = zmer_starty()
+        vypis_starty(starty)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'parametry': vars(args), 'vysledky': vysledky, 'start': starty}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+dotaz.py: souhrnné dotazy nad výsledky uloženými do SQLite (scraper.py --format sqlite)
+
+Dotazy používají indexy databáze (volby.databaze), takže se nečte celý
+soubor jako u CSV.
+
+Použití:
+    python dotaz.py vysledky.sqlite strany [--volby ps2017] [--okres 7103]
+    python dotaz.py vysledky.sqlite strana "ANO 2011" [--volby ps2017] [--okres 7103]
+    python dotaz.py vysledky.sqlite okresy [--volby ps2017]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from volby.databaze import existuje_strana, hlasy_strany, soucty_okresu, soucty_stran
+
+def procenta(cast, celek):
+    """
+    Returns:
+        str: Podíl v procentech na dvě desetinná místa, nebo '' pokud celek chybí
+    """
+    return f"{100 * cast / celek:.2f}" if celek else ''
+
+def vypis_strany(db, args):
+    """
+    Vypíše součty hlasů stran a jejich podíl na platných hlasech.
+    """
+    radky = soucty_stran(db, args.volby, args.okres)
+    celkem = {}
+    for volby, _, hlasy in radky:
+        celkem[volby] = celkem.get(volby, 0) + hlasy
+    print(f"{'volby':<8} {'strana':<60} {'hlasy':>10} {'%':>7}")
+    for volby, strana, hlasy in radky:
+        print(f"{volby:<8} {strana[:60]:<60} {hlasy:>10} {procenta(hlasy, celkem[volby]):>7}")
+
+def vypis_stranu(db, args):
+    """
+    Vypíše hlasy jedné strany po obcích a jejich součet.
+    """
+    radky = hlasy_strany(db, args.strana, args.volby, args.okres)
+    if not radky:
+        if not existuje_strana(db, args.strana):
+            print(f"ERROR: Strana '{args.strana}' v databázi není!")
+            sys.exit(1)
+        print(f"Filtru (--volby, --okres) neodpovídá žádná obec se stranou '{args.strana}'.")
+        return
+    print(f"{'volby':<8} {'kód':<8} {'obec':<30} {'okres':<8} {'hlasy':>8} {'%':>7}")
+    for volby, kod, nazev, okres, hlasy, platne in radky:
+        print(f"{volby:<8} {kod:<8} {nazev[:30]:<30} {okres or '':<8} {hlasy:>8} {procenta(hlasy, platne):>7}")
+    print(f"Celkem {len(radky)} obcí, {sum(radek[4] for radek in radky)} hlasů")
+
+def vypis_okresy(db, args):
+    """
+    Vypíše počty obcí, voličů, obálek a platných hlasů po okresech.
+    """
+    print(f"{'volby':<8} {'okres':<8} {'obcí':>6} {'voliči':>10} {'obálky':>10} {'platné':>10} {'účast %':>8}")
+    for volby, okres, obci, volici, obalky, platne in soucty_okresu(db, args.volby):
+        print(f"{volby:<8} {okres or '':<8} {obci:>6} {volici or 0:>10} {obalky or 0:>10} {platne or 0:>10} "
+              f"{procenta(obalky or 0, volici):>8}")
+
+def main():
+    """
+    Spustí dotaz podle argumentů.
+    """
+    parser = argparse.ArgumentParser(description="Souhrnné dotazy nad výsledky voleb v SQLite.")
+    parser.add_argument("databaze", help="soubor .sqlite ze scraper.py --format sqlite")
+    prikazy = parser.add_subparsers(dest="prikaz", required=True)
+
+    strany = prikazy.add_parser("strany", help="součty hlasů všech stran")
+    strana = prikazy.add_parser("strana", help="hlasy jedné strany po obcích")
+    strana.add_argument("strana", help="přesný název strany")
+    okresy = prikazy.add_parser("okresy", help="součty voličů a hlasů po okresech")
+    for podrizeny in (strany, strana, okresy):
+        podrizeny.add_argument("--volby", help="jen zadané volby (např. ps2017)")
+    for podrizeny in (strany, strana):
+        podrizeny.add_argument("--okres", help="jen obce okresu (kód z parametru xnumnuts, např. 7103)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.databaze):
+        print(f"ERROR: Databáze {args.databaze} neexistuje!")
+        sys.exit(1)
+
+    db = sqlite3.connect(f"file:{args.databaze}?mode=ro", uri=True)
+    try:
+        {'strany': vypis_strany, 'strana': vypis_stranu, 'okresy': vypis_okresy}[args.prikaz](db, args)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
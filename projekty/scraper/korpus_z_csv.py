@@ -0,0 +1,187 @@
+"""
+korpus_z_csv.py: stránky okresu pro korpus lokálního serveru z uložených výsledků (bez sítě)
+
+Z výsledků okresu ve formátu CSV (main.py, např. main/vysledky.csv pro
+okres Benešov) vytvoří přehled okresu (ps32) a stránku každé obce (ps311)
+v rozložení skutečných stránek volby.cz. Šablonou jsou stránky uložené
+v korpusu (korpus/ps32.html a korpus/ps311.html), takže se zachová celé
+HTML včetně tří tabulek přehledu, doplňovacích řádků s '-' a dvou tabulek
+stran. Počty voličů, obálek a hlasů jsou skutečné výsledky z CSV, procenta
+se z nich dopočítají. Počty okrsků v CSV nejsou, stránky uvádějí 1 z 1.
+
+Soubory pojmenuje podle lokalni_server.nazev_souboru(), server je tedy
+obslouží podle kódu obce. Se sítí je lepší uložit skutečné stránky
+skriptem uloz_korpus.py.
+
+Použití:
+    python korpus_z_csv.py ../main/vysledky.csv --kraj 2 --nazev-kraje "Středočeský kraj" --okres 2101 --nazev-okresu Benešov
+"""
+import argparse
+import csv
+import html
+import os
+import re
+
+from lokalni_server import KORPUS, nazev_souboru
+
+# Tabulka přehledu okresu a datový řádek v ní
+_TABULKA = re.compile(r'(<table class="table">.*?</tr>\s*<tr>.*?</tr>\s*)(.*?)(</table>)', re.S)
+_RADEK = re.compile(r'<tr>\s*<td.*?</tr>\s*', re.S)
+# Řádek strany: název, počet hlasů a procento ve stejné tabulce stran
+_STRANA = re.compile(r'(headers="(t\d)sa1 \2sb2">)([^<]*)(</td>\s*<td[^>]*headers="\2sa2 \2sb3">)[^<]*'
+                     r'(</td>\s*<td[^>]*headers="\2sa2 \2sb4">)[^<]*', re.S)
+
+def formatuj_cislo(cislo):
+    """
+    Returns:
+        str: Počet s oddělovačem tisíců jako na volby.cz (např. '13&nbsp;104')
+    """
+    return f"{cislo:,}".replace(',', '&nbsp;')
+
+def formatuj_procenta(cast, celek):
+    """
+    Returns:
+        str: Podíl v procentech na dvě desetinná místa s desetinnou čárkou
+    """
+    return f"{100 * cast / celek:.2f}".replace('.', ',') if celek else '0,00'
+
+def nahrad_bunku(stranka, headers, hodnota):
+    """
+    Nahradí obsah první buňky <td> s daným atributem headers.
+    """
+    vzor = re.compile(r'(<td[^>]*headers="' + re.escape(headers) + r'"[^>]*>)[^<]*(</td>)')
+    return vzor.sub(lambda m: m[1] + hodnota + m[2], stranka, count=1)
+
+class Sablona:
+    """
+    Uložená stránka volby.cz a územní celek, ke kterému patří.
+    """
+
+    def __init__(self, cesta):
+        with open(cesta, encoding='utf-8') as f:
+            self.text = f.read()
+        self.kraj = re.search(r'Kraj: (.*)', self.text)[1].strip()
+        self.okres = re.search(r'Okres: (.*)', self.text)[1].strip()
+        obec = re.search(r'Obec: (.*)', self.text)
+        self.obec = obec[1].strip() if obec else None
+        odkaz = re.search(r'xkraj=(\d+)(?:&amp;)xnumnuts=(\d+)', self.text)
+        if odkaz is None:
+            odkaz = re.search(r'xkraj=(\d+)&amp;xobec=\d+&amp;xvyber=(\d+)', self.text)
+        self.cislo_kraje, self.kod_okresu = odkaz[1], odkaz[2]
+
+    def pro_okres(self, cislo_kraje, nazev_kraje, kod_okresu, nazev_okresu):
+        """
+        Returns:
+            str: Text šablony s jiným krajem a okresem
+        """
+        text = self.text.replace(f'Kraj: {self.kraj}', f'Kraj: {nazev_kraje}')
+        text = text.replace(f'Okres: {self.okres}', f'Okres: {html.escape(nazev_okresu)}')
+        text = text.replace(f'Okres&nbsp;{self.okres}', f'Okres&nbsp;{html.escape(nazev_okresu)}')
+        text = text.replace(f'xkraj={self.cislo_kraje}&amp;', f'xkraj={cislo_kraje}&amp;')
+        text = text.replace(f'xnumnuts={self.kod_okresu}', f'xnumnuts={kod_okresu}')
+        return text.replace(f'xvyber={self.kod_okresu}', f'xvyber={kod_okresu}')
+
+def stranka_obce(sablona, text, radek, strany):
+    """
+    Vytvoří stránku obce (ps311) z řádku CSV.
+
+    Args:
+        sablona (Sablona): Šablona stránky obce
+        text (str): Text šablony upravený pro okres (Sablona.pro_okres)
+        radek (list): Kód, název, voliči, obálky, platné hlasy a hlasy stran
+        strany (list): Názvy stran ve sloupcích CSV
+
+    Returns:
+        str: HTML stránky obce
+    """
+    kod, nazev = radek[0], html.escape(radek[1])
+    registrovani, obalky, platne = (int(hodnota) for hodnota in radek[2:5])
+    hlasy = dict(zip(strany, (int(hodnota) for hodnota in radek[5:])))
+
+    text = text.replace(f'Obec: {sablona.obec}', f'Obec: {nazev}')
+    text = text.replace(f'Obec&nbsp;{sablona.obec}', f'Obec&nbsp;{nazev}')
+    for headers, hodnota in (
+        ('sa2', formatuj_cislo(registrovani)),
+        ('sa3', formatuj_cislo(obalky)),
+        ('sa4', formatuj_procenta(obalky, registrovani)),
+        ('sa5', formatuj_cislo(obalky)),
+        ('sa6', formatuj_cislo(platne)),
+        ('sa7', formatuj_procenta(platne, obalky)),
+    ):
+        text = nahrad_bunku(text, headers, hodnota)
+
+    def strana(m):
+        pocet = hlasy[html.unescape(m[3])]
+        return m[1] + m[3] + m[4] + formatuj_cislo(pocet) + m[5] + formatuj_procenta(pocet, platne)
+
+    return _STRANA.sub(strana, text), kod
+
+def prehled_okresu(text, obce, cislo_kraje, kod_okresu):
+    """
+    Vytvoří přehled okresu (ps32) - obce rozdělené do tabulek šablony.
+
+    Args:
+        text (str): Text šablony přehledu upravený pro okres (Sablona.pro_okres)
+        obce (list): Dvojice (kód, název) v pořadí CSV
+        cislo_kraje (str): Číslo kraje v odkazech (xkraj)
+        kod_okresu (str): Kód okresu v odkazech (xvyber)
+
+    Returns:
+        str: HTML přehledu okresu
+    """
+    tabulky = list(_TABULKA.finditer(text))
+    velikost = -(-len(obce) // len(tabulky))
+    casti = []
+    posledni = 0
+    for index, tabulka in enumerate(tabulky, start=1):
+        t = f't{index}'
+        radky = []
+        for kod, nazev in obce[(index - 1) * velikost:index * velikost]:
+            odkaz = f'ps311?xjazyk=CZ&amp;xkraj={cislo_kraje}&amp;xobec={kod}&amp;xvyber={kod_okresu}'
+            radky.append(
+                f'<tr>\n<td class="cislo" headers="{t}sa1 {t}sb1"><a href="{odkaz}">{kod}</a></td>\n'
+                f'<td class="overflow_name" headers="{t}sa1 {t}sb2">{html.escape(nazev)}</td>\n'
+                f'<td class="center" headers="{t}sa2"><a href="{odkaz}">X</a></td>\n</tr>\n'
+            )
+        # Kratší tabulky volby.cz doplňuje prázdnými řádky s '-'
+        radky.extend(
+            f'<tr>\n<td class="hidden_td" headers="{t}sa1 {t}sb1">-</td>\n'
+            f'<td class="hidden_td" headers="{t}sa1 {t}sb2">-</td>\n'
+            f'<td class="hidden_td" headers="{t}sa2">-</td>\n</tr>\n'
+            for _ in range(velikost - len(radky))
+        )
+        casti += [text[posledni:tabulka.start()], tabulka[1], ''.join(radky), tabulka[3]]
+        posledni = tabulka.end()
+    return ''.join(casti) + text[posledni:]
+
+def main():
+    parser = argparse.ArgumentParser(description="Vytvoří stránky okresu pro korpus z výsledků v CSV.")
+    parser.add_argument("csv", help="výsledky okresu z main.py (středník, kód, název, tři počty, strany)")
+    parser.add_argument("--kraj", required=True, help="číslo kraje v odkazech volby.cz (xkraj), např. 2")
+    parser.add_argument("--nazev-kraje", required=True, help="název kraje, např. 'Středočeský kraj'")
+    parser.add_argument("--okres", required=True, help="kód okresu (xnumnuts), např. 2101")
+    parser.add_argument("--nazev-okresu", required=True, help="název okresu, např. Benešov")
+    parser.add_argument("--korpus", default=KORPUS, help="složka korpusu se šablonami a pro výstup (výchozí korpus/)")
+    args = parser.parse_args()
+
+    with open(args.csv, encoding='utf-8-sig', newline='') as f:
+        radky = list(csv.reader(f, delimiter=';'))
+    strany = radky[0][5:]
+
+    sablona = Sablona(os.path.join(args.korpus, 'ps311.html'))
+    text = sablona.pro_okres(args.kraj, args.nazev_kraje, args.okres, args.nazev_okresu)
+    for radek in radky[1:]:
+        stranka, kod = stranka_obce(sablona, text, radek, strany)
+        dotaz = f'xkraj={args.kraj}&xobec={kod}&xvyber={args.okres}'
+        with open(os.path.join(args.korpus, nazev_souboru('ps311', dotaz)), 'w', encoding='utf-8') as f:
+            f.write(stranka)
+
+    prehled = Sablona(os.path.join(args.korpus, 'ps32.html'))
+    text = prehled.pro_okres(args.kraj, args.nazev_kraje, args.okres, args.nazev_okresu)
+    nazev = nazev_souboru('ps32', f'xkraj={args.kraj}&xnumnuts={args.okres}')
+    with open(os.path.join(args.korpus, nazev), 'w', encoding='utf-8') as f:
+        f.write(prehled_okresu(text, [(radek[0], radek[1]) for radek in radky[1:]], args.kraj, args.okres))
+    print(f"Uloženo: {nazev} a {len(radky) - 1} stránek obcí")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+lokalni_server.py: lokální zástupce webu volby.cz pro testování scraperu bez sítě
+
+Stránky se obsluhují z korpusu uložených stránek (složka korpus/). Soubor
+se hledá nejdřív podle skriptu a parametrů požadavku (např.
+ps311-xkraj=12-xobec=506761-xvyber=7103.html, viz nazev_souboru()), potom
+jen podle skriptu (ps311.html). Detailní stránka okrsku (ps33) se bez
+vlastního souboru obslouží stejně jako stránka obce (ps311).
+
+Okres Benešov (xkraj=2, xnumnuts=2101) má v korpusu přehled se třemi
+tabulkami obcí a vlastní stránku každé ze 114 obcí (vytvořené skriptem
+korpus_z_csv.py z main/vysledky.csv), takže se stahují různé stránky.
+Ostatní kódy obcí dostanou obecnou stránku ps311.html.
+
+Každá odpověď je zpožděná o zadaný čas s náhodným rozptylem (jitter)
+a zadaný podíl požadavků skončí chybou, aby se simulovala skutečná síť.
+Server posílá hlavičky ETag a Last-Modified a na podmíněné požadavky
+odpovídá 304 Not Modified. Počet obsloužených požadavků a jejich doby
+jsou v server.statistiky (pro benchmark_scraperu.py).
+
+Použití:
+    python lokalni_server.py [--port 8000] [--zpozdeni 0.2] [--jitter 0.05] [--chybovost 0.01]
+    python scraper.py "http://127.0.0.1:8000/pls/ps2017nss/ps32?xjazyk=CZ&xkraj=2&xnumnuts=2101" vysledky.csv
+    python scraper.py "http://127.0.0.1:8000/pls/ps2017nss/ps3?xjazyk=CZ" vysledky.csv --concurrency 8 --rate 50
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+ADRESAR = os.path.dirname(os.path.abspath(__file__))
+KORPUS = os.path.join(ADRESAR, 'korpus')
+
+# Skripty, které se bez vlastního souboru obslouží stránkou jiného skriptu
+NAHRADNI_SKRIPTY = {'ps33': 'ps311'}
+
+def nazev_souboru(skript, dotaz=''):
+    """
+    Vrátí název souboru korpusu pro požadavek.
+
+    Args:
+        skript (str): Název skriptu z cesty URL (např. 'ps311')
+        dotaz (str): Query string požadavku, '' = obecný soubor skriptu
+
+    Returns:
+        str: Název souboru, např. 'ps311-xkraj=12-xobec=506761-xvyber=7103.html'
+    """
+    # Jazyk stránky na obsah výsledků nemá vliv, parametry řadíme kvůli stálému názvu
+    parametry = sorted((klic, hodnota) for klic, hodnota in parse_qsl(dotaz) if klic != 'xjazyk')
+    return '-'.join([skript] + [f"{klic}={hodnota}" for klic, hodnota in parametry]) + '.html'
+
+class Korpus:
+    """
+    Uložené stránky načtené ze složky korpusu.
+    """
+
+    def __init__(self, adresar=KORPUS):
+        """
+        Args:
+            adresar (str): Složka se soubory *.html pojmenovanými podle nazev_souboru()
+        """
+        self.stranky = {}
+        for nazev in os.listdir(adresar):
+            if nazev.endswith('.html'):
+                with open(os.path.join(adresar, nazev), 'rb') as f:
+                    self.stranky[nazev] = f.read()
+
+    def najdi(self, cesta):
+        """
+        Najde stránku pro cestu požadavku.
+
+        Args:
+            cesta (str): Cesta s query stringem, např. '/pls/ps2017nss/ps311?xobec=506761'
+
+        Returns:
+            bytes: Obsah stránky, nebo None pokud v korpusu není
+        """
+        url = urlsplit(cesta)
+        skript = url.path.rsplit('/', 1)[-1]
+        for kandidat in (skript, NAHRADNI_SKRIPTY.get(skript)):
+            if kandidat is None:
+                continue
+            for nazev in (nazev_souboru(kandidat, url.query), nazev_souboru(kandidat)):
+                if nazev in self.stranky:
+                    return self.stranky[nazev]
+        return None
+
+def vytvor_handler(korpus, zpozdeni, jitter=0.0, chybovost=0.0, kod_chyby=503, seed=None, statistiky=None):
+    """
+    Vytvoří třídu handleru, která obsluhuje stránky z korpusu.
+
+    Args:
+        korpus (Korpus): Uložené stránky
+        zpozdeni (float): Průměrné zpoždění každé odpovědi v sekundách
+        jitter (float): Největší náhodná odchylka zpoždění (±) v sekundách
+        chybovost (float): Podíl požadavků (0-1), které skončí chybou
+        kod_chyby (int): HTTP kód chybové odpovědi (např. 503 nebo 429)
+        seed (int): Seed generátoru náhody pro opakovatelné běhy, None = náhodný
+        statistiky (dict): Slovník, do kterého se zapisují počty a doby požadavků
+
+    Returns:
+        type: Třída odvozená od BaseHTTPRequestHandler
+    """
+    last_modified = formatdate(usegmt=True)
+    nahoda = random.Random(seed)
+    zamek = threading.Lock()
+    if statistiky is None:
+        statistiky = {}
+    statistiky.update({'pozadavky': 0, 'chyby': 0, 'doby': []})
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = time.perf_counter()
+            with zamek:
+                prodleva = max(0.0, zpozdeni + nahoda.uniform(-jitter, jitter))
+                chyba = nahoda.random() < chybovost
+            time.sleep(prodleva)
+            try:
+                self._odpovez(chyba)
+            finally:
+                with zamek:
+                    statistiky['pozadavky'] += 1
+                    statistiky['chyby'] += chyba
+                    statistiky['doby'].append(time.perf_counter() - start)
+
+        def _odpovez(self, chyba):
+            if chyba:
+                self.send_error(kod_chyby)
+                return
+            obsah = korpus.najdi(self.path)
+            if obsah is None:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.md5(obsah).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(obsah)))
+            self.end_headers()
+            self.wfile.write(obsah)
+
+        def log_message(self, format, *args):
+            # Výpis každého požadavku by zkresloval měření
+            pass
+
+    return Handler
+
+def spust_server(port=0, korpus=KORPUS, zpozdeni=0.2, jitter=0.0, chybovost=0.0, kod_chyby=503, seed=None):
+    """
+    Spustí server ve vlákně na pozadí (pro benchmarky a testy).
+
+    Args:
+        port (int): Port serveru, 0 = libovolný volný port
+        korpus (str): Složka korpusu uložených stránek
+        zpozdeni, jitter, chybovost, kod_chyby, seed: Viz vytvor_handler()
+
+    Returns:
+        ThreadingHTTPServer: Běžící server (adresa v server.server_address,
+                             statistiky požadavků v server.statistiky),
+                             zastaví se metodou shutdown()
+    """
+    statistiky = {}
+    handler = vytvor_handler(Korpus(korpus), zpozdeni, jitter, chybovost, kod_chyby, seed, statistiky)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.statistiky = statistiky
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    """
+    Spustí lokální server.
+    """
+    parser = argparse.ArgumentParser(description="Lokální zástupce webu volby.cz s uloženými stránkami.")
+    parser.add_argument("--port", type=int, default=8000, help="port serveru (výchozí 8000)")
+    parser.add_argument("--korpus", default=KORPUS, help="složka s uloženými stránkami (výchozí korpus/)")
+    parser.add_argument("--zpozdeni", type=float, default=0.2, help="zpoždění odpovědi v sekundách (výchozí 0.2)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="náhodná odchylka zpoždění ± v sekundách (výchozí 0)")
+    parser.add_argument("--chybovost", type=float, default=0.0, help="podíl požadavků, které skončí chybou (výchozí 0)")
+    parser.add_argument("--kod-chyby", type=int, default=503, help="HTTP kód chybové odpovědi (výchozí 503)")
+    parser.add_argument("--seed", type=int, default=None, help="seed náhody pro opakovatelné běhy")
+    args = parser.parse_args()
+
+    handler = vytvor_handler(
+        Korpus(args.korpus), args.zpozdeni, args.jitter, args.chybovost, args.kod_chyby, args.seed
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    print(f"Server běží na http://127.0.0.1:{args.port}/pls/ps2017nss/ "
+          f"(zpoždění {args.zpozdeni} ± {args.jitter} s, chybovost {args.chybovost:.1%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+uloz_korpus.py: uložení stránek z volby.cz do korpusu pro lokalni_server.py
+
+Stáhne přehledovou stránku (ps3 nebo ps32), u celostátní stránky i stránky
+okresů, a detailní stránky obcí. Soubory pojmenuje podle
+lokalni_server.nazev_souboru(), takže je server potom obslouží bez sítě.
+Obecný soubor skriptu (např. ps311.html) se přepíše jen s --vychozi.
+
+Použití:
+    python uloz_korpus.py "https://www.volby.cz/pls/ps2017nss/ps32?xjazyk=CZ&xkraj=12&xnumnuts=7103" [--obci 20]
+    python uloz_korpus.py "https://www.volby.cz/pls/ps2017nss/ps3?xjazyk=CZ" --korpus /tmp/korpus --obci 0
+"""
+import argparse
+import os
+import sys
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from lokalni_server import KORPUS, nazev_souboru
+from volby.sber import je_celostatni_stranka, ziskej_obce_vsech_okresu, ziskej_odkazy_obci, ziskej_okresy
+from volby.stahovani import stahni
+
+def uloz_stranku(url, korpus, vychozi=False):
+    """
+    Stáhne stránku a uloží ji do korpusu.
+
+    Args:
+        url (str): URL adresa stránky
+        korpus (str): Složka korpusu
+        vychozi (bool): Uložit stránku i jako obecný soubor skriptu
+
+    Returns:
+        str: Název uloženého souboru
+    """
+    response = stahni(url)
+    response.raise_for_status()
+    adresa = urlsplit(url)
+    skript = adresa.path.rsplit('/', 1)[-1]
+    nazvy = [nazev_souboru(skript, adresa.query)] + ([nazev_souboru(skript)] if vychozi else [])
+    for nazev in nazvy:
+        with open(os.path.join(korpus, nazev), 'wb') as f:
+            f.write(response.content)
+    return nazvy[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Uloží stránky z volby.cz do korpusu lokálního serveru.")
+    parser.add_argument("url", help="URL celostátní (ps3) nebo okresní (ps32) přehledové stránky")
+    parser.add_argument("--korpus", default=KORPUS, help="cílová složka (výchozí korpus/)")
+    parser.add_argument("--obci", type=int, default=20, help="počet uložených stránek obcí, 0 = všechny (výchozí 20)")
+    parser.add_argument("--vychozi", action="store_true", help="uložit první stránky i jako obecné soubory skriptů")
+    args = parser.parse_args()
+
+    os.makedirs(args.korpus, exist_ok=True)
+    print(f"Uloženo: {uloz_stranku(args.url, args.korpus, args.vychozi)}")
+
+    if je_celostatni_stranka(args.url):
+        okresy = ziskej_okresy(args.url)
+        for i, okres in enumerate(okresy):
+            print(f"Uloženo: {uloz_stranku(okres['url'], args.korpus, args.vychozi and i == 0)}")
+        obce = ziskej_obce_vsech_okresu(okresy, 1)
+    else:
+        obce = ziskej_odkazy_obci(args.url)
+
+    vybrane = list(obce.values())[:args.obci or None]
+    for i, obec in enumerate(vybrane):
+        try:
+            print(f"Uloženo: {uloz_stranku(obec['url'], args.korpus, args.vychozi and i == 0)}")
+        except Exception as e:
+            print(f"ERROR: Stránku obce {obec['nazev']} se nepodařilo uložit: {e}")
+    print(f"Korpus: {args.korpus} ({len(vybrane)} obcí)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+ai.py: perfect-play computer opponent for Tic Tac Toe
+
+The game is solved once with negamax and alpha-beta pruning over the
+bitboard core. Positions are keyed by a canonical hash: the position is
+mapped through all 8 symmetries of the square (4 rotations, 4 reflections)
+and the smallest key wins, so symmetric positions share one entry. For
+every reachable position the table stores its value and the best move in
+the canonical orientation; the move is mapped back through the inverse
+symmetry when it is played.
+
+The table (765 canonical positions, 627 of them with a move to make) is
+saved as JSON to ~/.cache/tic_tac_toe/perfect_play.json on first use and
+loaded on the next start, so choosing a move is a dictionary lookup.
+
+Values are from the point of view of the player to move: 0 is a draw,
+a win is 1 + the number of empty cells left after it (faster wins score
+higher, slower losses are preferred).
+
+Usage:
+    python ai.py [--rebuild] [--table FILE]
+"""
+import argparse
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from board import CELLS, FULL_MASK, MARKS, SIZE, Bitboard
+
+TABLE_VERSION = 1
+DEFAULT_TABLE = os.path.join(os.path.expanduser("~"), ".cache", "tic_tac_toe", "perfect_play.json")
+
+# Cell permutations of the 8 symmetries: cell i moves to SYMMETRIES[s][i]
+_TRANSFORMS = (
+    lambda row, col: (row, col),                        # identity
+    lambda row, col: (col, SIZE - 1 - row),             # rotation by 90 degrees
+    lambda row, col: (SIZE - 1 - row, SIZE - 1 - col),  # rotation by 180 degrees
+    lambda row, col: (SIZE - 1 - col, row),             # rotation by 270 degrees
+    lambda row, col: (row, SIZE - 1 - col),             # mirror left-right
+    lambda row, col: (SIZE - 1 - row, col),             # mirror top-bottom
+    lambda row, col: (col, row),                        # main diagonal
+    lambda row, col: (SIZE - 1 - col, SIZE - 1 - row),  # anti-diagonal
+)
+SYMMETRIES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(row * SIZE + col for row, col in (transform(cell // SIZE, cell % SIZE) for cell in range(CELLS)))
+    for transform in _TRANSFORMS
+)
+INVERSES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(symmetry.index(cell) for cell in range(CELLS)) for symmetry in SYMMETRIES
+)
+# Player mask mapped through each symmetry, precomputed for all 512 masks
+_MASK_MAPS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(sum(1 << symmetry[cell] for cell in range(CELLS) if mask >> cell & 1) for mask in range(FULL_MASK + 1))
+    for symmetry in SYMMETRIES
+)
+
+# Exact value, lower bound (fail high) and upper bound (fail low) entries
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def canonical(board: Bitboard) -> Tuple[int, int]:
+    """Return the canonical key of a position and the symmetry that produces it.
+
+    Args:
+        board: The position.
+
+    Returns:
+        (key, symmetry index), key = X mask | O mask << 9 of the transformed board.
+    """
+    x_mask, o_mask = board.masks
+    best_key, best_symmetry = -1, 0
+    for symmetry, mask_map in enumerate(_MASK_MAPS):
+        key = mask_map[x_mask] | mask_map[o_mask] << CELLS
+        if best_key < 0 or key < best_key:
+            best_key, best_symmetry = key, symmetry
+    return best_key, best_symmetry
+
+
+def _empty_cells(board: Bitboard) -> int:
+    return CELLS - len(board.history)
+
+
+def negamax(board: Bitboard, alpha: int, beta: int, table: Dict[int, Tuple[int, int]]) -> int:
+    """Search a position with alpha-beta pruning and a transposition table.
+
+    Args:
+        board: The position, restored to its original state on return.
+        alpha: Lower bound of the search window.
+        beta: Upper bound of the search window.
+        table: Transposition table {canonical key: (value, bound type)}, filled in.
+
+    Returns:
+        Value of the position for the player to move (exact inside the window).
+    """
+    if board.winner is not None:
+        # The player who just moved won
+        return -(1 + _empty_cells(board))
+    if board.masks[0] | board.masks[1] == FULL_MASK:
+        return 0
+
+    key, _ = canonical(board)
+    entry = table.get(key)
+    if entry is not None:
+        value, bound = entry
+        if bound == EXACT:
+            return value
+        if bound == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    original_alpha = alpha
+    best = -CELLS - 1
+    for cell in board.legal_moves():
+        board.play(cell)
+        value = -negamax(board, -beta, -alpha, table)
+        board.undo()
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if best <= original_alpha:
+        table[key] = (best, UPPER)
+    elif best >= beta:
+        table[key] = (best, LOWER)
+    else:
+        table[key] = (best, EXACT)
+    return best
+
+
+def best_move(board: Bitboard, table: Dict[int, Tuple[int, int]]) -> Tuple[int, int]:
+    """Search all moves of a position with a full window.
+
+    Args:
+        board: A position that is not over.
+        table: Transposition table shared between searches.
+
+    Returns:
+        (value, cell) of the first best move in cell order.
+    """
+    alpha, beta = -CELLS - 1, CELLS + 1
+    best_value, best_cell = alpha, -1
+    for cell in board.legal_moves():
+        board.play(cell)
+        value = -negamax(board, -beta, -alpha, table)
+        board.undo()
+        if value > best_value:
+            best_value, best_cell = value, cell
+            alpha = value
+    return best_value, best_cell
+
+
+def build_table() -> Dict[int, Tuple[int, int]]:
+    """Solve every reachable position that is not over.
+
+    Returns:
+        {canonical key: (value, best cell in the canonical orientation)}
+    """
+    search_table: Dict[int, Tuple[int, int]] = {}
+    moves: Dict[int, Tuple[int, int]] = {}
+    seen = set()
+
+    def visit(board: Bitboard) -> None:
+        key, symmetry = canonical(board)
+        if key in seen:
+            return
+        seen.add(key)
+        if board.is_over():
+            return
+        value, cell = best_move(board, search_table)
+        moves[key] = (value, SYMMETRIES[symmetry][cell])
+        for cell in board.legal_moves():
+            board.play(cell)
+            visit(board)
+            board.undo()
+
+    visit(Bitboard())
+    return moves
+
+
+def save_table(moves: Dict[int, Tuple[int, int]], path: str) -> None:
+    """Save the move table as JSON (through a temporary file, so a crash does not corrupt it)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"version": TABLE_VERSION, "moves": {str(key): list(entry) for key, entry in moves.items()}}, f)
+    os.replace(temporary, path)
+
+
+def load_table(path: str) -> Optional[Dict[int, Tuple[int, int]]]:
+    """Load the move table saved by save_table().
+
+    Returns:
+        The table, or None if the file is missing, unreadable or of another version.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != TABLE_VERSION:
+        return None
+    return {int(key): (value, cell) for key, (value, cell) in data["moves"].items()}
+
+
+class PerfectPlayer:
+    """Computer player that never loses, backed by the precomputed move table."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_TABLE) -> None:
+        """Load the move table, building and saving it if needed.
+
+        Args:
+            path: Table file, None = build in memory without saving.
+        """
+        moves = load_table(path) if path is not None else None
+        if moves is None:
+            moves = build_table()
+            if path is not None:
+                save_table(moves, path)
+        self.moves: Dict[int, Tuple[int, int]] = moves
+
+    def evaluate(self, board: Bitboard) -> int:
+        """Return the value of a position that is not over for the player to move."""
+        return self.moves[canonical(board)[0]][0]
+
+    def choose_move(self, board: Bitboard) -> int:
+        """Return the best cell (0-8) for the player to move.
+
+        Args:
+            board: A position that is not over.
+
+        Raises:
+            ValueError: If the board is not the classic 3 x 3, three in a row.
+            KeyError: If the position is over or unreachable in a real game.
+        """
+        if (board.size, board.win_length) != (SIZE, SIZE):
+            raise ValueError("The move table only covers the 3x3 board with three in a row.")
+        key, symmetry = canonical(board)
+        return INVERSES[symmetry][self.moves[key][1]]
+
+
+def main() -> None:
+    """Build or load the table and print a summary."""
+    parser = argparse.ArgumentParser(description="Perfect-play Tic Tac Toe table.")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help=f"table file (default {DEFAULT_TABLE})")
+    parser.add_argument("--rebuild", action="store_true", help="solve the game again and overwrite the table")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.table):
+        os.remove(args.table)
+    player = PerfectPlayer(args.table)
+    board = Bitboard()
+    print(f"Table {args.table}: {len(player.moves)} positions with a move")
+    print(f"Empty board: value {player.evaluate(board)}, best move {player.choose_move(board) + 1}")
+    while not board.is_over():
+        board.play(player.choose_move(board))
+    print(f"Perfect play: {' '.join(str(cell + 1) for cell in board.history)} -> "
+          f"{'draw' if board.winner is None else MARKS[board.winner] + ' wins'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+benchmark_board.py: micro-benchmark of the bitboard core against the list board
+
+Generates random positions from random games and measures, in checks per
+second, the previous list-based implementation (List[str], win lines
+rebuilt on every call, any/all over cells) against board.Bitboard:
+
+    win   - has the player who moved last won
+            (list: check_winner, bitboard: incremental winner and a full
+            is_winning scan of the mask)
+    draw  - is the board full (list: all cells, bitboard: one comparison)
+    move  - place a mark, check the winner and take the mark back
+            (list: assignment + check_winner, bitboard: play + undo)
+
+Both implementations are checked to agree on every position first.
+
+Usage:
+    python benchmark_board.py [--positions 2000] [--repeat 5] [--seed 1] [--json results.json]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from board import CELLS, EMPTY_CELL, MARKS, SIDES, Bitboard, is_winning
+
+
+def legacy_check_winner(board: List[str], player: str) -> bool:
+    """check_winner() of the list-based TicTacToe before the bitboard core."""
+    win_conditions = [
+        [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Horizontal
+        [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Vertical
+        [0, 4, 8], [2, 4, 6],             # Diagonal
+    ]
+    return any(all(board[i] == player for i in condition) for condition in win_conditions)
+
+
+def legacy_is_draw(board: List[str]) -> bool:
+    """is_draw() of the list-based TicTacToe before the bitboard core."""
+    return all(cell != EMPTY_CELL for cell in board)
+
+
+def random_positions(count: int, seed: int) -> List[Tuple[List[str], Bitboard, str]]:
+    """Play random games and keep a random prefix of each.
+
+    Args:
+        count: Number of positions.
+        seed: Seed of the random generator.
+
+    Returns:
+        List of (list board, bitboard, player who moved last).
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Bitboard()
+        for _ in range(rng.randint(1, CELLS)):
+            board.play(rng.choice(board.legal_moves()))
+            if board.is_over():
+                break
+        last = MARKS[1 - board.side_to_move]
+        positions.append((board.cells(), board, last))
+    return positions
+
+
+def rate(function: Callable[[], int], repeat: int) -> float:
+    """Run a benchmark loop several times and return the best rate.
+
+    Args:
+        function: Loop that returns the number of checks it made.
+        repeat: Number of runs.
+
+    Returns:
+        Checks per second of the fastest run.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        checks = function()
+        best = max(best, checks / (time.perf_counter() - start))
+    return best
+
+
+def verify(positions: List[Tuple[List[str], Bitboard, str]]) -> None:
+    """Check that both implementations agree on win, draw and move/undo.
+
+    Raises:
+        AssertionError: If they disagree on any position.
+    """
+    for cells, board, last in positions:
+        assert legacy_check_winner(cells, last) == (board.winner == SIDES[last]), cells
+        assert legacy_check_winner(cells, last) == is_winning(board.masks[SIDES[last]]), cells
+        assert legacy_is_draw(cells) == board.is_full(), cells
+        if not board.is_over():
+            mover = MARKS[board.side_to_move]
+            for cell in board.legal_moves():
+                cells[cell] = mover
+                expected = legacy_check_winner(cells, mover)
+                cells[cell] = EMPTY_CELL
+                assert board.play(cell) == expected, (cells, cell)
+                board.undo()
+                assert board.cells() == cells, cells
+
+
+def run(positions: List[Tuple[List[str], Bitboard, str]], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measure all checks on the positions.
+
+    Returns:
+        {check: {implementation: checks per second}}
+    """
+    open_positions = [(cells, board, MARKS[board.side_to_move]) for cells, board, _ in positions
+                      if not board.is_over()]
+
+    def list_win() -> int:
+        for cells, _, last in positions:
+            legacy_check_winner(cells, last)
+        return len(positions)
+
+    def bitboard_win() -> int:
+        for _, board, last in positions:
+            board.winner == SIDES[last]
+        return len(positions)
+
+    def bitboard_scan() -> int:
+        for _, board, last in positions:
+            is_winning(board.masks[SIDES[last]])
+        return len(positions)
+
+    def list_draw() -> int:
+        for cells, _, _ in positions:
+            legacy_is_draw(cells)
+        return len(positions)
+
+    def bitboard_draw() -> int:
+        for _, board, _ in positions:
+            board.is_full()
+        return len(positions)
+
+    def list_move() -> int:
+        checks = 0
+        for cells, _, mover in open_positions:
+            for cell in range(CELLS):
+                if cells[cell] == EMPTY_CELL:
+                    cells[cell] = mover
+                    legacy_check_winner(cells, mover)
+                    cells[cell] = EMPTY_CELL
+                    checks += 1
+        return checks
+
+    def bitboard_move() -> int:
+        checks = 0
+        for _, board, _ in open_positions:
+            for cell in board.legal_moves():
+                board.play(cell)
+                board.undo()
+                checks += 1
+        return checks
+
+    return {
+        'win': {'list': rate(list_win, repeat), 'bitboard': rate(bitboard_win, repeat),
+                'bitboard scan': rate(bitboard_scan, repeat)},
+        'draw': {'list': rate(list_draw, repeat), 'bitboard': rate(bitboard_draw, repeat)},
+        'move': {'list': rate(list_move, repeat), 'bitboard': rate(bitboard_move, repeat)},
+    }
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    """Print checks per second and the speed-up against the list board."""
+    print(f"{'check':<6} {'implementation':<15} {'checks/s':>14} {'speed-up':>9}")
+    for check, rates in results.items():
+        for implementation, checks_per_second in rates.items():
+            print(f"{check:<6} {implementation:<15} {checks_per_second:>14,.0f} "
+                  f"{checks_per_second / rates['list']:>8.1f}x")
+
+
+def main() -> None:
+    """Parse arguments, verify both implementations and print the benchmark."""
+    parser = argparse.ArgumentParser(description="Bitboard core vs list board: checks per second.")
+    parser.add_argument("--positions", type=int, default=2000, help="number of random positions (default 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each check, the fastest counts (default 5)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random games (default 1)")
+    parser.add_argument("--json", metavar="FILE", help="save the results to a JSON file")
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions, args.seed)
+    verify(positions)
+    results = run(positions, args.repeat)
+    print(f"{len(positions)} positions, both implementations agree")
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+board.py: shared Tic Tac Toe core (bitboard) for the console and GUI games
+
+The board is N x N (3 x 3 by default, 15 x 15 for gomoku) and a player
+wins with K marks in a row (3 by default, 5 in gomoku). It is stored as
+two integers, one mask per player, where bit i is cell i (row by row).
+
+Win detection is incremental. Every window of K consecutive cells in a
+row, column or diagonal has a counter of marks per player, and a move
+only increments the counters of the windows through its cell (at most
+4 * K of them), so the cost of a move and of the win check does not grow
+with the board. On 3 x 3 the windows are exactly the 8 lines. The counters
+are also what the search engine (engine.py) evaluates. Moves are kept on
+a stack and can be undone, which is what search and self-play need.
+
+The string board (List[str] of "X", "O" and " ") is still available as a
+thin read-only view through `cells()`.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Player marks and their indexes into Bitboard.masks
+PLAYER_X = "X"
+PLAYER_O = "O"
+EMPTY_CELL = " "
+MARKS: Tuple[str, str] = (PLAYER_X, PLAYER_O)
+SIDES = {PLAYER_X: 0, PLAYER_O: 1}
+
+# Classic 3 x 3 board
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL_MASK = (1 << CELLS) - 1
+
+WIN_LINES: Tuple[Tuple[int, ...], ...] = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Horizontal
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Vertical
+    (0, 4, 8), (2, 4, 6),             # Diagonal
+)
+WIN_MASKS: Tuple[int, ...] = tuple(sum(1 << cell for cell in line) for line in WIN_LINES)
+
+# Row and column steps of the four line directions
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def is_winning(mask: int) -> bool:
+    """Check if a 3 x 3 player mask contains a complete line.
+
+    Args:
+        mask: Bit mask of one player's marks.
+
+    Returns:
+        True if any win mask is fully covered, False otherwise.
+    """
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return True
+    return False
+
+
+def default_win_length(size: int) -> int:
+    """Return the usual number of marks in a row for a board size (3 on 3 x 3, at most 5)."""
+    return min(size, 5)
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int, win_length: int) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]:
+    """Precompute the windows of a board, shared by all boards of the same shape.
+
+    Args:
+        size: Number of rows and columns.
+        win_length: Number of marks in a row that wins.
+
+    Returns:
+        (windows, through): cells of every window of win_length consecutive
+        cells, and for every cell the indexes of the windows through it.
+
+    Raises:
+        ValueError: If win_length is not between 1 and size.
+    """
+    if not 1 <= win_length <= size:
+        raise ValueError(f"Win length must be between 1 and {size}, got {win_length}.")
+    windows = []
+    for row_step, col_step in DIRECTIONS:
+        for row in range(size):
+            for col in range(size):
+                end_row = row + row_step * (win_length - 1)
+                end_col = col + col_step * (win_length - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    windows.append(tuple((row + row_step * i) * size + col + col_step * i for i in range(win_length)))
+    if win_length == 1:
+        # A single cell lies on the same window in every direction
+        windows = list(dict.fromkeys(windows))
+    through: List[List[int]] = [[] for _ in range(size * size)]
+    for index, window in enumerate(windows):
+        for cell in window:
+            through[cell].append(index)
+    return tuple(windows), tuple(tuple(indexes) for indexes in through)
+
+
+class Bitboard:
+    """N x N, K-in-a-row position as two bit masks with incremental move and undo."""
+
+    __slots__ = ("size", "win_length", "cell_count", "full_mask", "windows", "through",
+                 "masks", "counts", "history", "winner", "win_ply")
+
+    def __init__(self, size: int = SIZE, win_length: Optional[int] = None) -> None:
+        """Initialize an empty board with X to move.
+
+        Args:
+            size: Number of rows and columns.
+            win_length: Number of marks in a row that wins, None = default_win_length(size).
+
+        Raises:
+            ValueError: If the size is smaller than 1 or the win length does not fit the board.
+        """
+        if size < 1:
+            raise ValueError(f"Board size must be at least 1, got {size}.")
+        self.size = size
+        self.win_length = default_win_length(size) if win_length is None else win_length
+        self.cell_count = size * size
+        self.full_mask = (1 << self.cell_count) - 1
+        self.windows, self.through = geometry(size, self.win_length)
+        self.masks: List[int] = [0, 0]
+        self.counts: List[List[int]] = [[0] * len(self.windows), [0] * len(self.windows)]
+        self.history: List[int] = []
+        self.winner: Optional[int] = None
+        self.win_ply = 0
+
+    def reset(self) -> None:
+        """Clear the board."""
+        self.masks[0] = self.masks[1] = 0
+        for counts in self.counts:
+            counts[:] = [0] * len(self.windows)
+        self.history.clear()
+        self.winner = None
+        self.win_ply = 0
+
+    def copy(self) -> "Bitboard":
+        """Return an independent copy of the position."""
+        board = Bitboard(self.size, self.win_length)
+        board.masks[:] = self.masks
+        board.counts = [counts[:] for counts in self.counts]
+        board.history[:] = self.history
+        board.winner = self.winner
+        board.win_ply = self.win_ply
+        return board
+
+    @property
+    def occupied(self) -> int:
+        """Bit mask of all occupied cells."""
+        return self.masks[0] | self.masks[1]
+
+    @property
+    def side_to_move(self) -> int:
+        """Index of the player to move (0 = X, 1 = O), X always starts."""
+        return len(self.history) & 1
+
+    def is_empty(self, cell: int) -> bool:
+        """Check if a cell is empty.
+
+        Args:
+            cell: Cell index (0 to size * size - 1).
+
+        Returns:
+            True if neither player has a mark there, False otherwise.
+        """
+        return not (self.masks[0] | self.masks[1]) >> cell & 1
+
+    def legal_moves(self) -> List[int]:
+        """Return empty cells in ascending order (none once the game is won)."""
+        if self.winner is not None:
+            return []
+        free = self.full_mask & ~(self.masks[0] | self.masks[1])
+        return [cell for cell in range(self.cell_count) if free >> cell & 1]
+
+    def play(self, cell: int, side: Optional[int] = None) -> bool:
+        """Place a mark and update the counters of the windows through the cell.
+
+        The cell must be empty, the caller checks it (is_empty, legal_moves).
+
+        Args:
+            cell: Cell index (0 to size * size - 1).
+            side: Player index (0 = X, 1 = O), None = side_to_move.
+
+        Returns:
+            True if the move completed a line, False otherwise.
+        """
+        history = self.history
+        if side is None:
+            side = len(history) & 1
+        self.masks[side] |= 1 << cell
+        history.append(cell)
+        counts = self.counts[side]
+        win_length = self.win_length
+        won = False
+        for window in self.through[cell]:
+            count = counts[window] + 1
+            counts[window] = count
+            if count == win_length:
+                won = True
+        if won and self.winner is None:
+            self.winner = side
+            self.win_ply = len(history)
+        return won
+
+    def undo(self) -> int:
+        """Take back the last move.
+
+        Returns:
+            The cell that was freed.
+
+        Raises:
+            IndexError: If there is no move to undo.
+        """
+        cell = self.history.pop()
+        bit = 1 << cell
+        side = 0 if self.masks[0] & bit else 1
+        self.masks[side] &= ~bit
+        counts = self.counts[side]
+        for window in self.through[cell]:
+            counts[window] -= 1
+        if self.winner is not None and len(self.history) < self.win_ply:
+            self.winner = None
+        return cell
+
+    def is_full(self) -> bool:
+        """Check if all cells are occupied."""
+        return self.masks[0] | self.masks[1] == self.full_mask
+
+    def is_draw(self) -> bool:
+        """Check if the board is full and there is no winner."""
+        return self.winner is None and self.masks[0] | self.masks[1] == self.full_mask
+
+    def is_over(self) -> bool:
+        """Check if the game is won or drawn."""
+        return self.winner is not None or self.masks[0] | self.masks[1] == self.full_mask
+
+    def cell(self, cell: int) -> str:
+        """Return the mark in a cell ("X", "O" or " ")."""
+        bit = 1 << cell
+        if self.masks[0] & bit:
+            return PLAYER_X
+        if self.masks[1] & bit:
+            return PLAYER_O
+        return EMPTY_CELL
+
+    def cells(self) -> List[str]:
+        """Return the board as a list of marks (a new list, changes are not written back)."""
+        return [self.cell(cell) for cell in range(self.cell_count)]
+
+    @classmethod
+    def from_cells(cls, cells: List[str], win_length: Optional[int] = None) -> "Bitboard":
+        """Build a position from a list of size * size marks.
+
+        The move history is reconstructed in cell order, X and O alternating
+        where possible, so undo works but does not replay the real game.
+
+        Args:
+            cells: List of marks ("X", "O" or " "), row by row.
+            win_length: Number of marks in a row that wins, None = default_win_length(size).
+
+        Returns:
+            The position.
+
+        Raises:
+            ValueError: If the list is not a square or contains an unknown mark.
+        """
+        size = round(len(cells) ** 0.5)
+        if size * size != len(cells) or size < 1:
+            raise ValueError(f"Expected a square number of cells, got {len(cells)}.")
+        for cell, mark in enumerate(cells):
+            if mark not in (PLAYER_X, PLAYER_O, EMPTY_CELL):
+                raise ValueError(f"Unknown mark {mark!r} in cell {cell}.")
+        board = cls(size, win_length)
+        x_cells = [cell for cell, mark in enumerate(cells) if mark == PLAYER_X]
+        o_cells = [cell for cell, mark in enumerate(cells) if mark == PLAYER_O]
+        for i in range(max(len(x_cells), len(o_cells))):
+            if i < len(x_cells):
+                board.play(x_cells[i], 0)
+            if i < len(o_cells):
+                board.play(o_cells[i], 1)
+        return board
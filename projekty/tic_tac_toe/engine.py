@@ -0,0 +1,277 @@
+"""
+engine.py: time-limited search player for N x N, K-in-a-row boards
+
+Negamax with alpha-beta pruning, deepened one ply at a time until the
+per-move time budget runs out; the move of the last completed depth is
+played. Positions are stored in a transposition table keyed by a Zobrist
+hash (one random 64-bit number per cell and player, XORed in and out as
+moves are played and undone).
+
+Only empty cells near existing marks are searched. They are ordered by
+the best move stored in the transposition table first and then by how
+much the move changes the evaluation, and on large boards only the best
+`max_moves` of them are kept.
+
+The evaluation is read from the board's window counters (see board.py):
+every window of K cells that only one player has marks in is worth
+window_weights()[count] to that player. It is updated incrementally from the
+windows through the played cell, like the win check.
+
+Usage:
+    python engine.py [--size 15] [--win-length 5] [--time-limit 1.0]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from board import MARKS, Bitboard
+
+WIN_SCORE = 1_000_000_000
+
+# Exact value, lower bound (fail high) and upper bound (fail low) entries
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _Timeout(Exception):
+    """The time budget of the move ran out during the search."""
+
+
+def window_weights(win_length: int) -> List[int]:
+    """Return the value of a window with 0 to win_length marks of one player only.
+
+    Each extra mark is worth 8 times more and a complete window is a win.
+    """
+    return [0] + [8 ** (count - 1) for count in range(1, win_length)] + [WIN_SCORE]
+
+
+class SearchPlayer:
+    """Computer player with iterative deepening alpha-beta under a time budget."""
+
+    def __init__(self, time_limit: float = 1.0, max_depth: int = 64, max_moves: int = 12,
+                 radius: int = 2, table_size: int = 1_000_000, seed: int = 0) -> None:
+        """
+        Args:
+            time_limit: Seconds per move (the depth being searched is abandoned when it runs out).
+            max_depth: Maximum search depth in plies.
+            max_moves: Moves searched in each position on boards where more are possible.
+            radius: Only empty cells at most this far from a mark are searched.
+            table_size: Transposition table entries kept before it is cleared.
+            seed: Seed of the Zobrist numbers.
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.max_moves = max_moves
+        self.radius = radius
+        self.table_size = table_size
+        self.seed = seed
+        self.table: Dict[int, Tuple[int, int, int, int]] = {}
+        self.last_search: Dict[str, float] = {}
+        self._shape: Tuple[int, int] = (0, 0)
+        self._zobrist: Tuple[List[int], List[int]] = ([], [])
+        self._neighbours: List[Tuple[int, ...]] = []
+        self._weights: List[int] = []
+        self._deadline = 0.0
+        self._nodes = 0
+
+    def _prepare(self, board: Bitboard) -> None:
+        """Build the Zobrist numbers, neighbourhoods and weights for the board shape."""
+        shape = (board.size, board.win_length)
+        if shape == self._shape:
+            return
+        rng = random.Random(self.seed)
+        self._zobrist = tuple([rng.getrandbits(64) for _ in range(board.cell_count)] for _ in range(2))
+        size, radius = board.size, self.radius
+        self._neighbours = [
+            tuple(r * size + c
+                  for r in range(max(0, row - radius), min(size, row + radius + 1))
+                  for c in range(max(0, col - radius), min(size, col + radius + 1))
+                  if (r, c) != (row, col))
+            for row, col in (divmod(cell, size) for cell in range(board.cell_count))
+        ]
+        self._weights = window_weights(board.win_length)
+        self._shape = shape
+        self.table.clear()
+
+    def hash(self, board: Bitboard) -> int:
+        """Return the Zobrist hash of a position."""
+        self._prepare(board)
+        value = 0
+        for side in (0, 1):
+            mask, numbers = board.masks[side], self._zobrist[side]
+            for cell in range(board.cell_count):
+                if mask >> cell & 1:
+                    value ^= numbers[cell]
+        return value
+
+    def evaluate(self, board: Bitboard) -> int:
+        """Return the static evaluation for X (positive = good for X) from all window counters."""
+        self._prepare(board)
+        weights = self._weights
+        score = 0
+        for x_count, o_count in zip(*board.counts):
+            if not o_count:
+                score += weights[x_count]
+            elif not x_count:
+                score -= weights[o_count]
+        return score
+
+    def _gain(self, board: Bitboard, cell: int, side: int) -> int:
+        """Return how much placing side's mark on cell changes the evaluation for side."""
+        weights = self._weights
+        mine, theirs = board.counts[side], board.counts[1 - side]
+        gain = 0
+        for window in board.through[cell]:
+            other = theirs[window]
+            if not other:
+                count = mine[window]
+                gain += weights[count + 1] - weights[count]
+            elif not mine[window]:
+                # Blocking takes the window away from the opponent
+                gain += weights[other]
+        return gain
+
+    def _candidates(self, board: Bitboard) -> List[int]:
+        """Return empty cells near marks (all empty cells on an empty or small board)."""
+        if not board.history:
+            return [board.cell_count // 2]
+        occupied = board.masks[0] | board.masks[1]
+        if board.size <= 2 * self.radius + 1:
+            return [cell for cell in range(board.cell_count) if not occupied >> cell & 1]
+        seen = set()
+        for cell in board.history:
+            for neighbour in self._neighbours[cell]:
+                if not occupied >> neighbour & 1:
+                    seen.add(neighbour)
+        return list(seen)
+
+    def _ordered_moves(self, board: Bitboard, side: int, best: int) -> List[Tuple[int, int]]:
+        """Return (gain, cell) of the moves to search, best first."""
+        moves = sorted(((self._gain(board, cell, side), cell) for cell in self._candidates(board)), reverse=True)
+        if len(moves) > self.max_moves:
+            del moves[self.max_moves:]
+        if best >= 0:
+            for index, (_, cell) in enumerate(moves):
+                if cell == best:
+                    moves.insert(0, moves.pop(index))
+                    break
+            else:
+                if board.is_empty(best):
+                    moves.insert(0, (self._gain(board, best, side), best))
+        return moves
+
+    def _negamax(self, board: Bitboard, depth: int, alpha: int, beta: int, key: int, score: int, ply: int) -> int:
+        """Search a position, score is the evaluation for the player to move.
+
+        Raises:
+            _Timeout: If the time budget ran out.
+        """
+        self._nodes += 1
+        if self._nodes & 63 == 0 and time.perf_counter() > self._deadline:
+            raise _Timeout
+        if board.winner is not None:
+            return -(WIN_SCORE - ply)
+        if board.masks[0] | board.masks[1] == board.full_mask:
+            return 0
+        if depth == 0:
+            return score
+
+        entry = self.table.get(key)
+        best_cell = -1
+        if entry is not None:
+            entry_depth, value, bound, best_cell = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return value
+                if bound == LOWER and value >= beta:
+                    return value
+                if bound == UPPER and value <= alpha:
+                    return value
+
+        side = len(board.history) & 1
+        numbers = self._zobrist[side]
+        original_alpha = alpha
+        best = -WIN_SCORE - 1
+        for gain, cell in self._ordered_moves(board, side, best_cell):
+            board.play(cell, side)
+            try:
+                value = -self._negamax(board, depth - 1, -beta, -alpha, key ^ numbers[cell], -(score + gain), ply + 1)
+            finally:
+                board.undo()
+            if value > best:
+                best, best_cell = value, cell
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        bound = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, best, bound, best_cell)
+        return best
+
+    def choose_move(self, board: Bitboard) -> int:
+        """Return the cell to play for the player to move within the time budget.
+
+        Args:
+            board: A position that is not over (it is restored before returning).
+
+        Returns:
+            Cell index (0 to size * size - 1).
+
+        Raises:
+            ValueError: If the game is already over.
+        """
+        if board.is_over():
+            raise ValueError("The game is over, there is no move to make.")
+        self._prepare(board)
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit
+        self._nodes = 0
+        key = self.hash(board)
+        side = board.side_to_move
+        score = self.evaluate(board) * (1 if side == 0 else -1)
+        empty = board.cell_count - len(board.history)
+
+        moves = self._ordered_moves(board, side, -1)
+        best_cell, best_value, depth_reached = moves[0][1], 0, 0
+        for depth in range(1, min(self.max_depth, empty) + 1):
+            try:
+                value = self._negamax(board, depth, -WIN_SCORE - 1, WIN_SCORE + 1, key, score, 0)
+            except _Timeout:
+                break
+            entry = self.table.get(key)
+            if entry is not None and entry[3] >= 0:
+                best_cell = entry[3]
+            best_value, depth_reached = value, depth
+            if abs(value) >= WIN_SCORE - self.max_depth:
+                # A forced win or loss was found, deeper search changes nothing
+                break
+        self.last_search = {'depth': depth_reached, 'nodes': self._nodes, 'value': best_value,
+                            'seconds': time.perf_counter() - start}
+        return best_cell
+
+
+def main() -> None:
+    """Let the engine play one game against itself and print the moves."""
+    parser = argparse.ArgumentParser(description="Time-limited N x N, K-in-a-row search engine.")
+    parser.add_argument("--size", type=int, default=15, help="board size (default 15)")
+    parser.add_argument("--win-length", type=int, help="marks in a row to win (default min(size, 5))")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="seconds per move (default 1.0)")
+    args = parser.parse_args()
+
+    board = Bitboard(args.size, args.win_length)
+    player = SearchPlayer(args.time_limit)
+    while not board.is_over():
+        cell = player.choose_move(board)
+        board.play(cell)
+        search = player.last_search
+        print(f"{MARKS[board.winner if board.winner is not None else 1 - board.side_to_move]} "
+              f"{cell // board.size + 1},{cell % board.size + 1}: depth {search['depth']}, "
+              f"{search['nodes']} nodes in {search['seconds']:.2f} s, value {search['value']}")
+    print("Draw" if board.winner is None else f"{MARKS[board.winner]} wins")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,54 @@ author: Adam Seifert
 email: seifert.promotion@gmail.com
 """
 
-from typing import List
+import argparse
+from typing import List, Optional
 from colorama import Fore, init
 
+from ai import PerfectPlayer
+from board import PLAYER_O, PLAYER_X, SIDES, SIZE, Bitboard
+from engine import SearchPlayer
+
 # Initialize colorama
 init(autoreset=True)
 
 # Constants
-PLAYER_X = "X"
-PLAYER_O = "O"
-EMPTY_CELL = " "
 SEPARATOR = f"{Fore.CYAN}{'=' * 40}"
 
 
 class TicTacToe:
     """Class representing the game logic of Tic Tac Toe."""
 
-    def __init__(self) -> None:
-        """Initialize a new Tic Tac Toe game."""
-        self.board: List[str] = [EMPTY_CELL] * 9
+    def __init__(self, size: int = SIZE, win_length: Optional[int] = None) -> None:
+        """Initialize a new Tic Tac Toe game.
+
+        Args:
+            size: Number of rows and columns (3 for Tic Tac Toe, 15 for gomoku).
+            win_length: Marks in a row needed to win, None = 3 on 3x3, at most 5.
+        """
+        self.core: Bitboard = Bitboard(size, win_length)
+        self.size: int = size
+        self.win_length: int = self.core.win_length
         self.current_player: str = PLAYER_X
 
+    @property
+    def board(self) -> List[str]:
+        """The board as a list of size * size marks (a read-only view of the bitboard)."""
+        return self.core.cells()
+
     def display_board(self) -> None:
-        """Display the current state of the board."""
-        print(f"{Fore.MAGENTA}+---+---+---+")
-        for i in range(0, 9, 3):
-            print(
-                f"{Fore.MAGENTA}| {self.colorize_mark(self.board[i])} "
-                f"{Fore.MAGENTA}| {self.colorize_mark(self.board[i+1])} "
-                f"{Fore.MAGENTA}| {self.colorize_mark(self.board[i+2])} {Fore.MAGENTA}|"
-            )
-            print(f"{Fore.MAGENTA}+---+---+---+")
+        """Display the current state of the board.
+
+        On boards larger than 3x3 the moves of each row are shown next to it.
+        """
+        board = self.board
+        border = f"{Fore.MAGENTA}{'+---' * self.size}+"
+        print(border)
+        for i in range(0, self.size * self.size, self.size):
+            row = "".join(f"{Fore.MAGENTA}| {self.colorize_mark(mark)} " for mark in board[i:i + self.size])
+            moves = f"  {i + 1}-{i + self.size}" if self.size > SIZE else ""
+            print(f"{row}{Fore.MAGENTA}|{Fore.WHITE}{moves}")
+            print(border)
 
     @staticmethod
     def colorize_mark(mark: str) -> str:
@@ -49,20 +66,20 @@ class TicTacToe:
         """Check if the move is valid.
 
         Args:
-            move: The player's move as an integer (1-9).
+            move: The player's move as an integer (1 to size * size).
 
         Returns:
             True if the move is valid, False otherwise.
         """
-        return 1 <= move <= 9 and self.board[move - 1] == EMPTY_CELL
+        return 1 <= move <= self.size * self.size and self.core.is_empty(move - 1)
 
     def make_move(self, move: int) -> None:
         """Place the current player's mark on the board.
 
         Args:
-            move: The player's move as an integer (1-9).
+            move: The player's move as an integer (1 to size * size).
         """
-        self.board[move - 1] = self.current_player
+        self.core.play(move - 1, SIDES[self.current_player])
 
     def switch_player(self) -> None:
         """Switch to the other player."""
@@ -74,12 +91,7 @@ class TicTacToe:
         Returns:
             True if the current player has won, False otherwise.
         """
-        win_conditions = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Horizontal
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Vertical
-            [0, 4, 8], [2, 4, 6],             # Diagonal
-        ]
-        return any(all(self.board[i] == self.current_player for i in condition) for condition in win_conditions)
+        return self.core.winner == SIDES[self.current_player]
 
     def is_draw(self) -> bool:
         """Check if the game is a draw.
@@ -87,17 +99,17 @@ class TicTacToe:
         Returns:
             True if the board is full and there is no winner, False otherwise.
         """
-        return all(cell != EMPTY_CELL for cell in self.board)
+        return self.core.is_draw()
 
 
-def display_welcome() -> None:
+def display_welcome(size: int = SIZE, win_length: int = SIZE) -> None:
     """Display the welcome message and game rules."""
     print(f"{Fore.BLUE}Welcome to Tic Tac Toe")
     print(SEPARATOR)
     print(f"{Fore.MAGENTA}GAME RULES:")
     print(f"{Fore.WHITE}Each player can place one mark ({Fore.RED}X{Fore.WHITE} or {Fore.BLUE}O{Fore.WHITE})")
-    print(f"per turn on the {Fore.MAGENTA}3x3 grid.{Fore.WHITE} The {Fore.GREEN}WINNER {Fore.WHITE}is")
-    print(f"who {Fore.GREEN}succeeds {Fore.WHITE}in placing three of their")
+    print(f"per turn on the {Fore.MAGENTA}{size}x{size} grid.{Fore.WHITE} The {Fore.GREEN}WINNER {Fore.WHITE}is")
+    print(f"who {Fore.GREEN}succeeds {Fore.WHITE}in placing {'three' if win_length == 3 else win_length} of their")
     print(f"marks in a:")
     print(f"{Fore.GREEN}* {Fore.MAGENTA}Horizontal row")
     print(f"{Fore.GREEN}* {Fore.MAGENTA}Vertical row")
@@ -107,28 +119,69 @@ def display_welcome() -> None:
     print(SEPARATOR)
 
 
-def play_game() -> None:
-    """Main function to play Tic Tac Toe."""
-    display_welcome()
-    game = TicTacToe()
+def choose_opponent() -> Optional[str]:
+    """Ask whether to play against a second player or the computer.
+
+    Returns:
+        The computer's mark (X or O), or None for two players.
+    """
+    while True:
+        mode = input(f"{Fore.WHITE}Play against {Fore.GREEN}(1){Fore.WHITE} a second player or "
+                     f"{Fore.GREEN}(2){Fore.WHITE} the computer? ").strip()
+        if mode == "1":
+            return None
+        if mode == "2":
+            break
+        print(f"{Fore.RED}Please enter 1 or 2.")
+    while True:
+        mark = input(f"{Fore.WHITE}Do you want to play as {Fore.RED}X{Fore.WHITE} (first) "
+                     f"or {Fore.BLUE}O{Fore.WHITE}? ").strip().upper()
+        if mark in (PLAYER_X, PLAYER_O):
+            return PLAYER_O if mark == PLAYER_X else PLAYER_X
+        print(f"{Fore.RED}Please enter X or O.")
+
+
+def play_game(size: int = SIZE, win_length: Optional[int] = None, time_limit: float = 1.0) -> None:
+    """Main function to play Tic Tac Toe.
+
+    Args:
+        size: Number of rows and columns.
+        win_length: Marks in a row needed to win, None = 3 on 3x3, at most 5.
+        time_limit: Seconds per move of the computer on boards other than 3x3.
+    """
+    game = TicTacToe(size, win_length)
+    display_welcome(game.size, game.win_length)
+    computer = choose_opponent()
+    ai = None
+    if computer is not None:
+        # The classic game is solved, larger boards are searched within the time limit
+        ai = PerfectPlayer() if (game.size, game.win_length) == (SIZE, SIZE) else SearchPlayer(time_limit)
+    print(SEPARATOR)
 
     while True:
         game.display_board()
         print(SEPARATOR)
 
-        try:
-            move = int(input(f"Player {Fore.GREEN}{game.current_player}{Fore.WHITE}, please enter your move {Fore.GREEN}(1-9): "))
-            if not game.is_valid_move(move):
-                raise ValueError("Invalid move. The cell is occupied or out of range.")
-        except ValueError as e:
-            print(f"{Fore.RED}{e} Please try again.")
-            continue
+        if game.current_player == computer:
+            move = ai.choose_move(game.core) + 1
+            print(f"Computer {game.colorize_mark(computer)}{Fore.WHITE} plays {Fore.GREEN}{move}")
+        else:
+            try:
+                move = int(input(f"Player {Fore.GREEN}{game.current_player}{Fore.WHITE}, please enter your move {Fore.GREEN}(1-{game.size * game.size}): "))
+                if not game.is_valid_move(move):
+                    raise ValueError("Invalid move. The cell is occupied or out of range.")
+            except ValueError as e:
+                print(f"{Fore.RED}{e} Please try again.")
+                continue
 
         game.make_move(move)
 
         if game.check_winner():
             game.display_board()
-            print(f"{Fore.GREEN}Congratulations! Player {game.colorize_mark(game.current_player)} wins!")
+            if game.current_player == computer:
+                print(f"{Fore.RED}The computer {game.colorize_mark(computer)}{Fore.RED} wins!")
+            else:
+                print(f"{Fore.GREEN}Congratulations! Player {game.colorize_mark(game.current_player)} wins!")
             break
 
         if game.is_draw():
@@ -140,4 +193,10 @@ def play_game() -> None:
 
 
 if __name__ == "__main__":
-    play_game()
+    parser = argparse.ArgumentParser(description="Tic Tac Toe in the terminal, also on larger boards (gomoku).")
+    parser.add_argument("--size", type=int, default=SIZE, help="number of rows and columns (default 3)")
+    parser.add_argument("--win-length", type=int, help="marks in a row needed to win (default 3 on 3x3, at most 5)")
+    parser.add_argument("--time-limit", type=float, default=1.0,
+                        help="seconds per computer move on boards other than 3x3 (default 1.0)")
+    args = parser.parse_args()
+    play_game(args.size, args.win_length, args.time_limit)
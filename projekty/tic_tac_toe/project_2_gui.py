@@ -1,78 +1,123 @@
+import argparse
 import tkinter as tk
 from tkinter import messagebox
 from colorama import Fore, init
 
+from ai import PerfectPlayer
+from board import EMPTY_CELL, PLAYER_O, PLAYER_X, SIDES, SIZE, Bitboard
+from engine import SearchPlayer
+
 # Initialize colorama
 init(autoreset=True)
 
 # Constants
-PLAYER_X = "X"
-PLAYER_O = "O"
-EMPTY_CELL = " "
 BG_COLOR = "#f0f0f0"
+COMPUTER = PLAYER_O
 
 class TicTacToeGUI:
-    def __init__(self, root):
+    def __init__(self, root, size=SIZE, win_length=None, time_limit=1.0):
         self.root = root
         self.root.title("Tic Tac Toe")
         self.root.configure(bg=BG_COLOR)
         
         self.current_player = PLAYER_X
-        self.board = [EMPTY_CELL] * 9
+        self.core = Bitboard(size, win_length)
+        self.size = size
+        self.time_limit = time_limit
+        self.ai = None
+        self.vs_computer = tk.BooleanVar(value=False)
         
         self.buttons = []
         self.create_board()
         
     def create_board(self):
         """Create the game board with buttons."""
-        for i in range(9):
-            btn = tk.Button(self.root, text=EMPTY_CELL, font=("Arial", 20), height=2, width=5, 
-                            bg="white", fg="black",
+        # Larger boards get small buttons so that they fit on the screen
+        small = self.size > SIZE
+        for i in range(self.size * self.size):
+            btn = tk.Button(self.root, text=EMPTY_CELL, font=("Arial", 10 if small else 20), height=1 if small else 2,
+                            width=2 if small else 5, bg="white", fg="black",
                             command=lambda i=i: self.on_click(i))
-            btn.grid(row=i//3, column=i%3, padx=5, pady=5)
+            btn.grid(row=i//self.size, column=i%self.size, padx=0 if small else 5, pady=0 if small else 5)
             self.buttons.append(btn)
+        tk.Checkbutton(self.root, text=f"vs computer ({COMPUTER})", variable=self.vs_computer, bg=BG_COLOR,
+                       command=self.on_mode_change).grid(row=self.size, column=0, columnspan=self.size, pady=5)
         
     def on_click(self, index):
         """Handle button click for player moves."""
-        if self.board[index] == EMPTY_CELL:
-            self.board[index] = self.current_player
-            color = Fore.RED if self.current_player == PLAYER_X else Fore.BLUE
-            self.buttons[index].config(text=self.current_player, state=tk.DISABLED, fg="red" if self.current_player == PLAYER_X else "blue")
-            
-            if self.check_winner():
-                messagebox.showinfo("Game Over", f"{color}Player {self.current_player} wins!")
-                self.reset_board()
-            elif self.is_draw():
-                messagebox.showinfo("Game Over", "It's a draw!")
-                self.reset_board()
-            else:
-                self.switch_player()
+        if self.core.is_empty(index) and not self.is_computer_turn():
+            if self.place(index) and self.is_computer_turn():
+                self.computer_move()
+    
+    def on_mode_change(self):
+        """Let the computer move right away if it is switched on during its turn."""
+        if self.is_computer_turn():
+            self.computer_move()
+    
+    def is_computer_turn(self):
+        """Check if the computer is on and should make the next move."""
+        return self.vs_computer.get() and self.current_player == COMPUTER
+    
+    def computer_move(self):
+        """Play the computer's move (the player is created on first use)."""
+        if self.ai is None:
+            # The classic game is solved, larger boards are searched within the time limit
+            classic = (self.core.size, self.core.win_length) == (SIZE, SIZE)
+            self.ai = PerfectPlayer() if classic else SearchPlayer(self.time_limit)
+        self.place(self.ai.choose_move(self.core))
+    
+    def place(self, index):
+        """Place the current player's mark and end the game or switch players.
+        
+        Returns:
+            True if the game goes on, False if it ended (and the board was reset).
+        """
+        self.core.play(index, SIDES[self.current_player])
+        color = Fore.RED if self.current_player == PLAYER_X else Fore.BLUE
+        self.buttons[index].config(text=self.current_player, state=tk.DISABLED, fg="red" if self.current_player == PLAYER_X else "blue")
+        
+        if self.check_winner():
+            messagebox.showinfo("Game Over", f"{color}Player {self.current_player} wins!")
+            self.reset_board()
+            return False
+        if self.is_draw():
+            messagebox.showinfo("Game Over", "It's a draw!")
+            self.reset_board()
+            return False
+        self.switch_player()
+        return True
     
     def switch_player(self):
         """Switch to the other player."""
         self.current_player = PLAYER_O if self.current_player == PLAYER_X else PLAYER_X
     
+    @property
+    def board(self):
+        """The board as a list of size * size marks (a read-only view of the bitboard)."""
+        return self.core.cells()
+    
     def check_winner(self):
         """Check if the current player has won the game."""
-        win_conditions = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Horizontal
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Vertical
-            [0, 4, 8], [2, 4, 6],             # Diagonal
-        ]
-        return any(all(self.board[i] == self.current_player for i in condition) for condition in win_conditions)
+        return self.core.winner == SIDES[self.current_player]
     
     def is_draw(self):
         """Check if the game is a draw."""
-        return all(cell != EMPTY_CELL for cell in self.board)
+        return self.core.is_draw()
     
     def reset_board(self):
         """Reset the game board."""
-        self.board = [EMPTY_CELL] * 9
+        self.core.reset()
         self.current_player = PLAYER_X
         for btn in self.buttons:
             btn.config(text=EMPTY_CELL, state=tk.NORMAL, fg="black", bg="white")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tic Tac Toe window, also on larger boards (gomoku).")
+    parser.add_argument("--size", type=int, default=SIZE, help="number of rows and columns (default 3)")
+    parser.add_argument("--win-length", type=int, help="marks in a row needed to win (default 3 on 3x3, at most 5)")
+    parser.add_argument("--time-limit", type=float, default=1.0,
+                        help="seconds per computer move on boards other than 3x3 (default 1.0)")
+    args = parser.parse_args()
     root = tk.Tk()
-    game = TicTacToeGUI(root)
+    game = TicTacToeGUI(root, args.size, args.win_length, args.time_limit)
     root.mainloop()
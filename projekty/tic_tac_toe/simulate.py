@@ -0,0 +1,320 @@
+"""
+simulate.py: headless batch self-play between pluggable policies
+
+Plays many games without input() between two policies and reports the
+X win / O win / draw rates, a histogram of game lengths (in plies) and the
+throughput in games per second, so that engine changes can be compared.
+
+Policies (POLICIES) take a position and a random generator and return
+the cell to play:
+
+    random    - uniformly random empty cell
+    heuristic - win if possible, otherwise block, otherwise the cell on
+                most windows still open for the player (random tie-break)
+    perfect   - the solved move table of ai.py (3x3 only)
+    search    - engine.SearchPlayer with --time-limit per move
+
+Games are split into chunks that run on a process pool; each worker
+reuses one Bitboard and returns only aggregated counts for its chunk.
+Random against random is vectorized with numpy when it is installed:
+a random game is a random order of all cells cut off at the first
+completed window, so a whole batch is one argsort and a few array
+reductions over the windows.
+
+Usage:
+    python simulate.py --x random --o perfect --games 1000000
+    python simulate.py --x heuristic --o random --size 15 --games 2000 --json results.json
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board import MARKS, SIZE, Bitboard, default_win_length, geometry
+
+Policy = Callable[[Bitboard, random.Random], int]
+
+# Window cells (games * windows * win length) per numpy batch, keeps the arrays small
+_BATCH_CELLS = 1_000_000
+
+
+def random_policy(board: Bitboard, rng: random.Random) -> int:
+    """Play a uniformly random empty cell."""
+    return rng.choice(board.legal_moves())
+
+
+def heuristic_policy(board: Bitboard, rng: random.Random) -> int:
+    """Win, block, or take the cell on the most windows still open for the player.
+
+    On 3x3 this prefers the centre (4 open lines), then corners (3), then edges (2).
+    """
+    side = board.side_to_move
+    mine, theirs = board.counts[side], board.counts[1 - side]
+    need = board.win_length - 1
+    block = -1
+    best_score, best_cells = -1, []
+    for cell in board.legal_moves():
+        score = 0
+        for window in board.through[cell]:
+            if not theirs[window]:
+                if mine[window] == need:
+                    return cell
+                score += 1
+            elif not mine[window] and theirs[window] == need:
+                block = cell
+        if score > best_score:
+            best_score, best_cells = score, [cell]
+        elif score == best_score:
+            best_cells.append(cell)
+    if block >= 0:
+        return block
+    return rng.choice(best_cells)
+
+
+def _perfect_policy(time_limit: float) -> Policy:
+    from ai import PerfectPlayer
+
+    player = PerfectPlayer()
+    return lambda board, rng: player.choose_move(board)
+
+
+def _search_policy(time_limit: float) -> Policy:
+    from engine import SearchPlayer
+
+    player = SearchPlayer(time_limit)
+    return lambda board, rng: player.choose_move(board)
+
+
+# Policy name -> factory(time limit per move), called once in each worker process
+POLICIES: Dict[str, Callable[[float], Policy]] = {
+    "random": lambda time_limit: random_policy,
+    "heuristic": lambda time_limit: heuristic_policy,
+    "perfect": _perfect_policy,
+    "search": _search_policy,
+}
+
+_policy_cache: Dict[Tuple[str, float], Policy] = {}
+
+
+def _policy(name: str, time_limit: float) -> Policy:
+    """Return the policy of a worker process, created on first use."""
+    policy = _policy_cache.get((name, time_limit))
+    if policy is None:
+        policy = _policy_cache[(name, time_limit)] = POLICIES[name](time_limit)
+    return policy
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated outcome of a batch of games (X is the first player)."""
+
+    games: int = 0
+    x_wins: int = 0
+    o_wins: int = 0
+    draws: int = 0
+    lengths: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+
+    def add(self, other: "SimulationResult") -> None:
+        """Add the counts of another result (the time is not added)."""
+        self.games += other.games
+        self.x_wins += other.x_wins
+        self.o_wins += other.o_wins
+        self.draws += other.draws
+        self.lengths.update(other.lengths)
+
+    @property
+    def games_per_second(self) -> float:
+        """Throughput of the whole run."""
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def rates(self) -> Dict[str, float]:
+        """Return the X win, O win and draw rates (0-1)."""
+        games = self.games or 1
+        return {"x_wins": self.x_wins / games, "o_wins": self.o_wins / games, "draws": self.draws / games}
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return the result as a JSON-serializable dictionary."""
+        return {
+            "games": self.games, "x_wins": self.x_wins, "o_wins": self.o_wins, "draws": self.draws,
+            "rates": self.rates(), "lengths": {str(plies): count for plies, count in sorted(self.lengths.items())},
+            "seconds": self.seconds, "games_per_second": self.games_per_second,
+        }
+
+
+def _play_chunk(task: Tuple[str, str, int, int, int, int, float]) -> SimulationResult:
+    """Play one chunk of games move by move (runs in a worker process).
+
+    Args:
+        task: (X policy, O policy, games, size, win length, seed, time limit per move).
+
+    Returns:
+        Counts of the chunk.
+    """
+    x_name, o_name, games, size, win_length, seed, time_limit = task
+    policies = (_policy(x_name, time_limit), _policy(o_name, time_limit))
+    rng = random.Random(seed)
+    board = Bitboard(size, win_length)
+    result = SimulationResult()
+    outcomes = [0, 0]
+    draws = 0
+    lengths = result.lengths
+    for _ in range(games):
+        board.reset()
+        while board.winner is None and not board.is_full():
+            board.play(policies[len(board.history) & 1](board, rng))
+        if board.winner is None:
+            draws += 1
+        else:
+            outcomes[board.winner] += 1
+        lengths[len(board.history)] += 1
+    result.games, result.x_wins, result.o_wins, result.draws = games, outcomes[0], outcomes[1], draws
+    return result
+
+
+def _play_random_chunk(task: Tuple[str, str, int, int, int, int, float]) -> SimulationResult:
+    """Play one chunk of random games at once with numpy (runs in a worker process).
+
+    Every game is a random order of all cells. The ply at which a player
+    completes a window is the latest ply of its cells if they all have
+    that player's parity; the game ends at the earliest such ply.
+    """
+    import numpy as np
+
+    _, _, games, size, win_length, seed, _ = task
+    windows = np.array(geometry(size, win_length)[0], dtype=np.int64)
+    cells = size * size
+    rng = np.random.default_rng(seed)
+    result = SimulationResult(games=games)
+    batch = max(1, _BATCH_CELLS // (windows.size or 1))
+    for start in range(0, games, batch):
+        count = min(batch, games - start)
+        # ply[g, cell] = ply (0-based) at which the cell is played in game g
+        ply = np.argsort(rng.random((count, cells)), axis=1).argsort(axis=1)
+        window_plies = ply[:, windows]
+        parity = window_plies & 1
+        complete = parity.min(axis=2) == parity.max(axis=2)
+        finish = np.where(complete, window_plies.max(axis=2), cells).min(axis=1)
+        won = finish < cells
+        x_wins = int(np.count_nonzero(won & (finish % 2 == 0)))
+        result.x_wins += x_wins
+        result.o_wins += int(np.count_nonzero(won)) - x_wins
+        result.draws += count - int(np.count_nonzero(won))
+        plies, frequency = np.unique(np.where(won, finish + 1, cells), return_counts=True)
+        result.lengths.update(dict(zip(plies.tolist(), frequency.tolist())))
+    return result
+
+
+def simulate(x_policy: str, o_policy: str, games: int, size: int = SIZE, win_length: Optional[int] = None,
+             workers: Optional[int] = None, chunk_size: Optional[int] = None, seed: int = 0,
+             time_limit: float = 0.01, vectorize: bool = True) -> SimulationResult:
+    """Play games between two policies on a process pool.
+
+    Args:
+        x_policy: Name of the first player's policy (key of POLICIES).
+        o_policy: Name of the second player's policy.
+        games: Number of games.
+        size: Number of rows and columns.
+        win_length: Marks in a row needed to win, None = default_win_length(size).
+        workers: Worker processes, None = number of CPUs, 1 = play in this process.
+        chunk_size: Games per task, None = split the games evenly, at most 100000 per task.
+        seed: Seed of the first chunk (chunk i uses seed + i).
+        time_limit: Seconds per move of the search policy.
+        vectorize: Play random against random with numpy when it is installed.
+
+    Returns:
+        Aggregated result with the wall-clock time of the run.
+
+    Raises:
+        ValueError: If a policy is unknown or does not support the board.
+    """
+    for name in (x_policy, o_policy):
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy {name!r}, choose from {', '.join(POLICIES)}.")
+    win_length = default_win_length(size) if win_length is None else win_length
+    geometry(size, win_length)
+    if "perfect" in (x_policy, o_policy):
+        if (size, win_length) != (SIZE, SIZE):
+            raise ValueError("The perfect policy only plays the 3x3 board with three in a row.")
+        # Build and save the move table once, before the workers load it
+        _policy("perfect", time_limit)
+
+    play_chunk = _play_chunk
+    if vectorize and x_policy == o_policy == "random":
+        try:
+            import numpy  # noqa: F401
+            play_chunk = _play_random_chunk
+        except ImportError:
+            pass
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(100_000, -(-games // (workers * 4))))
+    tasks: List[Tuple[str, str, int, int, int, int, float]] = [
+        (x_policy, o_policy, min(chunk_size, games - start), size, win_length, seed + index, time_limit)
+        for index, start in enumerate(range(0, games, chunk_size))
+    ]
+
+    result = SimulationResult()
+    start = time.perf_counter()
+    if workers == 1:
+        for chunk in map(play_chunk, tasks):
+            result.add(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(play_chunk, tasks):
+                result.add(chunk)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def print_result(result: SimulationResult, x_policy: str, o_policy: str) -> None:
+    """Print outcome rates, the game length histogram and the throughput."""
+    rates = result.rates()
+    print(f"{result.games:,} games, {MARKS[0]} = {x_policy}, {MARKS[1]} = {o_policy}")
+    print(f"  {MARKS[0]} wins {result.x_wins:>12,} {rates['x_wins']:>7.2%}")
+    print(f"  {MARKS[1]} wins {result.o_wins:>12,} {rates['o_wins']:>7.2%}")
+    print(f"  draws  {result.draws:>12,} {rates['draws']:>7.2%}")
+    print("Game length (plies):")
+    most = max(result.lengths.values(), default=1)
+    for plies, count in sorted(result.lengths.items()):
+        print(f"  {plies:>4} {count:>12,} {'#' * round(40 * count / most)}")
+    print(f"{result.seconds:.2f} s, {result.games_per_second:,.0f} games/s")
+
+
+def main() -> None:
+    """Parse arguments, run the simulation and print or save the result."""
+    parser = argparse.ArgumentParser(description="Headless Tic Tac Toe self-play between policies.")
+    parser.add_argument("--x", default="random", choices=list(POLICIES), help="policy of X, the first player")
+    parser.add_argument("--o", default="random", choices=list(POLICIES), help="policy of O")
+    parser.add_argument("--games", type=int, default=100_000, help="number of games (default 100000)")
+    parser.add_argument("--workers", type=int, help="worker processes (default number of CPUs, 1 = no pool)")
+    parser.add_argument("--chunk-size", type=int, help="games per task (default games split evenly)")
+    parser.add_argument("--size", type=int, default=SIZE, help="number of rows and columns (default 3)")
+    parser.add_argument("--win-length", type=int, help="marks in a row needed to win (default 3 on 3x3, at most 5)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first chunk (default 0)")
+    parser.add_argument("--time-limit", type=float, default=0.01,
+                        help="seconds per move of the search policy (default 0.01)")
+    parser.add_argument("--no-vectorize", action="store_true", help="play random games move by move even with numpy")
+    parser.add_argument("--json", metavar="FILE", help="save the result to a JSON file")
+    args = parser.parse_args()
+
+    try:
+        result = simulate(args.x, args.o, args.games, args.size, args.win_length, args.workers, args.chunk_size,
+                          args.seed, args.time_limit, not args.no_vectorize)
+    except ValueError as e:
+        parser.error(str(e))
+    print_result(result, args.x, args.o)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"x": args.x, "o": args.o, "size": args.size, **result.to_dict()}, f, indent=2)
+        print(f"Result saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
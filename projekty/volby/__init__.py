@@ -0,0 +1,6 @@
+"""
+volby: sdílené moduly pro scrapery výsledků voleb z webu volby.cz
+
+Balíček používají oba scrapery (projekty/main/main.py a projekty/scraper/scraper.py).
+Stahování, export a měření startu spouští i přímo: python -m volby {crawl,export,bench}.
+"""
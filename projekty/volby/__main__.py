@@ -0,0 +1,6 @@
+"""
+Spuštění balíčku jako programu: python -m volby {crawl,export,bench,index} ...
+"""
+from .cli import main
+
+main()
@@ -0,0 +1,358 @@
+"""
+analyza.py: vektorové výpočty odvozených ukazatelů nad staženými výsledky
+
+Výsledky ze kteréhokoli výstupu scraperu (CSV, .npz, Parquet, Feather,
+SQLite) se načtou do matice hlasů obce × strany (numpy int64) a tří
+sloupců počtů. Nad nimi se bez cyklů přes obce spočítá:
+
+    ucast()          - vydané obálky / voliči v seznamu
+    podily()         - podíl hlasů strany na platných hlasech obce
+    poradi()         - pořadí stran v každé obci (1 = nejvíce hlasů)
+    souhrn_skupin()  - součty po okresech nebo krajích
+
+Chybějící počet je -1 (jako v .npz), odvozené hodnoty jsou pak NaN.
+Vyžaduje knihovnu numpy, Parquet a Feather navíc pyarrow.
+"""
+import csv
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("Modul analyza vyžaduje knihovnu numpy (pip install numpy)") from None
+
+# Sloupce počtů v pořadí výstupů scraperu (za kódem a názvem obce)
+POCTY = ('registrovani', 'vydane_obalky', 'platne_hlasy')
+
+# Úroveň seskupení -> počet znaků kódu okresu (xnumnuts, např. 7103), kraj jsou první dvě číslice
+UROVNE = {'okres': 4, 'kraj': 2}
+
+@dataclass
+class Vysledky:
+    """
+    Výsledky všech obcí jako pole numpy (jeden řádek = jedna obec).
+    """
+    kody: np.ndarray
+    nazvy: np.ndarray
+    registrovani: np.ndarray
+    vydane_obalky: np.ndarray
+    platne_hlasy: np.ndarray
+    strany: list
+    hlasy: np.ndarray
+    okresy: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.kody)
+
+
+def _pocet(hodnota):
+    # Text z CSV ('1 234', '') -> int, chybějící -> -1
+    hodnota = hodnota.replace('\xa0', '').replace(' ', '')
+    return int(hodnota) if hodnota.isdigit() else -1
+
+def _cisla(radky, sloupcu):
+    # Převod textu na čísla najednou v numpy; jen pokud nejde (prázdné buňky, mezery), po buňkách
+    try:
+        return np.array(radky, dtype=np.int64).reshape(len(radky), sloupcu)
+    except ValueError:
+        return np.array([[_pocet(hodnota) for hodnota in radek] for radek in radky],
+                        dtype=np.int64).reshape(len(radky), sloupcu)
+
+def nacti_csv(cesta, oddelovac=';'):
+    """
+    Načte široké CSV (scraper.py, main.py): kód, název, tři počty a sloupce stran.
+
+    Args:
+        cesta (str): Cesta k CSV souboru
+        oddelovac (str): Oddělovač sloupců
+
+    Returns:
+        Vysledky: Načtené výsledky
+    """
+    with open(cesta, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=oddelovac)
+        hlavicka = next(reader)
+        radky = list(reader)
+    if not radky:
+        raise ValueError(f"Soubor {cesta} neobsahuje žádné obce")
+
+    pocty = _cisla([radek[2:5] for radek in radky], 3)
+    hlasy = np.maximum(_cisla([radek[5:] for radek in radky], len(hlavicka) - 5), 0)
+    return Vysledky(
+        kody=np.array([radek[0] for radek in radky]),
+        nazvy=np.array([radek[1] for radek in radky]),
+        registrovani=pocty[:, 0],
+        vydane_obalky=pocty[:, 1],
+        platne_hlasy=pocty[:, 2],
+        strany=hlavicka[5:],
+        hlasy=hlasy,
+    )
+
+def nacti_npz(cesta):
+    """
+    Načte výsledky uložené formátem npz (volby.sloupcove).
+
+    Returns:
+        Vysledky: Načtené výsledky
+    """
+    with np.load(cesta) as data:
+        return Vysledky(
+            kody=data['kod'].astype(str),
+            nazvy=data['nazvy'][data['nazev_index']],
+            registrovani=data['registrovani'],
+            vydane_obalky=data['vydane_obalky'],
+            platne_hlasy=data['platne_hlasy'],
+            strany=list(data['strany']),
+            hlasy=data['hlasy'],
+        )
+
+def nacti_arrow(cesta):
+    """
+    Načte výsledky uložené ve formátu Parquet nebo Feather (volby.sloupcove).
+
+    Returns:
+        Vysledky: Načtené výsledky
+    """
+    try:
+        import pyarrow.compute as pc
+    except ImportError:
+        raise ImportError("Parquet a Feather vyžadují knihovnu pyarrow (pip install pyarrow)") from None
+    from .sloupcove import nacti_vysledky
+
+    tabulka = nacti_vysledky(cesta)
+    sloupce = [pc.fill_null(tabulka.column(i), -1).to_numpy() for i in range(2, 5)]
+    strany = tabulka.column_names[5:]
+    hlasy = np.column_stack([tabulka.column(strana).to_numpy() for strana in strany]) if strany \
+        else np.zeros((tabulka.num_rows, 0), dtype=np.int64)
+    return Vysledky(
+        kody=tabulka.column(0).to_numpy(zero_copy_only=False).astype(str),
+        nazvy=tabulka.column(1).cast('string').to_numpy(zero_copy_only=False).astype(str),
+        registrovani=sloupce[0].astype(np.int64),
+        vydane_obalky=sloupce[1].astype(np.int64),
+        platne_hlasy=sloupce[2].astype(np.int64),
+        strany=list(strany),
+        hlasy=hlasy.astype(np.int64),
+    )
+
+def nacti_sqlite(cesta, volby=None):
+    """
+    Načte výsledky jedněch voleb z databáze SQLite (volby.databaze) včetně okresů obcí.
+
+    Args:
+        cesta (str): Cesta k souboru .sqlite
+        volby (str): Klíč voleb, None = jediné volby v databázi
+
+    Returns:
+        Vysledky: Načtené výsledky
+
+    Raises:
+        ValueError: Pokud databáze obsahuje více voleb a žádné nejsou vybrané
+    """
+    db = sqlite3.connect(f"file:{cesta}?mode=ro", uri=True)
+    try:
+        if volby is None:
+            klice = [radek[0] for radek in db.execute('SELECT DISTINCT volby FROM obce')]
+            if len(klice) != 1:
+                raise ValueError(f"Databáze obsahuje volby {', '.join(klice)}, vyberte jedny")
+            volby = klice[0]
+        obce = db.execute(
+            'SELECT kod, nazev, okres, IFNULL(registrovani, -1), IFNULL(vydane_obalky, -1), '
+            'IFNULL(platne_hlasy, -1) FROM obce WHERE volby = ? ORDER BY rowid', (volby,)
+        ).fetchall()
+        strany = db.execute('SELECT id, nazev FROM strany ORDER BY nazev').fetchall()
+        # Hlasy obce jako jeden text "strana hlasy strana hlasy ..." - SQLite je složí při čtení
+        # tabulky (seřazené podle obce), v Pythonu se pak nevytváří objekt pro každý hlas
+        hlasy = db.execute(
+            "SELECT kod_obce, COUNT(*), group_concat(strana || ' ' || hlasy, ' ') FROM hlasy "
+            "WHERE volby = ? GROUP BY kod_obce", (volby,)
+        ).fetchall()
+    finally:
+        db.close()
+
+    kody = np.array([radek[0] for radek in obce])
+    # Matici sestavíme naráz: řádek podle kódu obce (binární hledání), sloupec podle id strany
+    matice = np.zeros((len(obce), len(strany)), dtype=np.int64)
+    if hlasy:
+        kody_hlasu, pocty_hlasu, texty = zip(*hlasy)
+        dvojice = np.fromstring(' '.join(texty), dtype=np.int64, sep=' ').reshape(-1, 2)
+        serazene = np.argsort(kody)
+        radky = serazene[np.searchsorted(kody[serazene], np.array(kody_hlasu))]
+        sloupec_strany = np.zeros(max(id_strany for id_strany, _ in strany) + 1, dtype=np.intp)
+        sloupec_strany[[id_strany for id_strany, _ in strany]] = np.arange(len(strany))
+        matice[np.repeat(radky, pocty_hlasu), sloupec_strany[dvojice[:, 0]]] = dvojice[:, 1]
+
+    pocty = np.array([radek[3:] for radek in obce], dtype=np.int64).reshape(-1, 3)
+    return Vysledky(
+        kody=kody,
+        nazvy=np.array([radek[1] for radek in obce]),
+        registrovani=pocty[:, 0],
+        vydane_obalky=pocty[:, 1],
+        platne_hlasy=pocty[:, 2],
+        strany=[nazev for _, nazev in strany],
+        hlasy=matice,
+        okresy=np.array([radek[2] or '' for radek in obce]),
+    )
+
+def nacti(cesta, volby=None):
+    """
+    Načte výsledky podle přípony souboru (.csv, .npz, .parquet, .feather, .sqlite).
+
+    Args:
+        cesta (str): Cesta k výstupu scraperu
+        volby (str): Klíč voleb (jen u .sqlite s více volbami)
+
+    Returns:
+        Vysledky: Načtené výsledky
+    """
+    pripona = os.path.splitext(cesta)[1]
+    if pripona == '.csv':
+        return nacti_csv(cesta)
+    if pripona == '.npz':
+        return nacti_npz(cesta)
+    if pripona in ('.parquet', '.feather'):
+        return nacti_arrow(cesta)
+    if pripona == '.sqlite':
+        return nacti_sqlite(cesta, volby)
+    raise ValueError(f"Neznámá přípona souboru: {cesta}")
+
+
+def _podil(citatel, jmenovatel):
+    # Podíl po prvcích, chybějící (-1) nebo nulový jmenovatel -> NaN
+    citatel = np.asarray(citatel, dtype=np.float64)
+    jmenovatel = np.asarray(jmenovatel, dtype=np.float64)
+    platny = (jmenovatel > 0) & (citatel >= 0)
+    return np.divide(citatel, jmenovatel, out=np.full(np.broadcast(citatel, jmenovatel).shape, np.nan),
+                     where=platny)
+
+def ucast(vysledky):
+    """
+    Returns:
+        np.ndarray: Volební účast obcí (vydané obálky / voliči, 0-1, NaN pokud počet chybí)
+    """
+    return _podil(vysledky.vydane_obalky, vysledky.registrovani)
+
+def podily(vysledky):
+    """
+    Returns:
+        np.ndarray: Matice podílů stran na platných hlasech obce (obce × strany, 0-1)
+    """
+    return _podil(vysledky.hlasy, vysledky.platne_hlasy[:, None])
+
+def poradi(vysledky):
+    """
+    Returns:
+        np.ndarray: Matice pořadí stran v obcích (1 = nejvíce hlasů, shoda podle pořadí stran)
+    """
+    serazene = np.argsort(-vysledky.hlasy, axis=1, kind='stable')
+    vysledek = np.empty_like(serazene)
+    np.put_along_axis(vysledek, serazene, np.arange(1, vysledky.hlasy.shape[1] + 1)[None, :], axis=1)
+    return vysledek
+
+def vitezove(vysledky):
+    """
+    Returns:
+        np.ndarray: Název strany s nejvíce hlasy v každé obci ('' u obce bez hlasů)
+    """
+    if not vysledky.strany:
+        return np.full(len(vysledky), '', dtype=object)
+    nazvy = np.array(vysledky.strany, dtype=object)
+    return np.where(vysledky.hlasy.max(axis=1) > 0, nazvy[vysledky.hlasy.argmax(axis=1)], '')
+
+def klice_skupin(vysledky, uroven='okres'):
+    """
+    Returns:
+        np.ndarray: Klíč skupiny každé obce - kód okresu, nebo kraje (první dvě číslice kódu okresu)
+
+    Raises:
+        ValueError: Pokud výsledky neobsahují okresy obcí (jen výstup .sqlite)
+    """
+    if vysledky.okresy is None:
+        raise ValueError("Výsledky neobsahují okresy obcí (uložte je s --format sqlite)")
+    return vysledky.okresy.astype(f'U{UROVNE[uroven]}')
+
+def souhrn_skupin(vysledky, klice):
+    """
+    Sečte počty a hlasy obcí po skupinách (jedním průchodem přes seřazené řádky).
+
+    Args:
+        vysledky (Vysledky): Výsledky obcí
+        klice (np.ndarray): Klíč skupiny pro každou obec (viz klice_skupin)
+
+    Returns:
+        tuple: (klíče skupin, počet obcí ve skupině, součty počtů (skupiny × 3), součty hlasů (skupiny × strany));
+               chybějící počty se do součtů nezapočítají
+    """
+    skupiny, inverzni, pocet_obci = np.unique(klice, return_inverse=True, return_counts=True)
+    poradi_radku = np.argsort(inverzni, kind='stable')
+    zacatky = np.concatenate(([0], np.cumsum(pocet_obci)[:-1]))
+    pocty = np.column_stack([vysledky.registrovani, vysledky.vydane_obalky, vysledky.platne_hlasy])
+    soucty_poctu = np.add.reduceat(np.maximum(pocty, 0)[poradi_radku], zacatky, axis=0)
+    soucty_hlasu = np.add.reduceat(vysledky.hlasy[poradi_radku], zacatky, axis=0) if vysledky.strany \
+        else np.zeros((len(skupiny), 0), dtype=np.int64)
+    return skupiny, pocet_obci, soucty_poctu, soucty_hlasu
+
+def odvozene_sloupce(vysledky):
+    """
+    Spočítá všechny odvozené ukazatele obcí.
+
+    Returns:
+        dict: {'ucast': pole, 'podily': matice, 'poradi': matice, 'vitez': pole}
+    """
+    return {
+        'ucast': ucast(vysledky),
+        'podily': podily(vysledky),
+        'poradi': poradi(vysledky),
+        'vitez': vitezove(vysledky),
+    }
+
+# Texty všech procent 0.00-100.00 a na konci prázdný text pro NaN - formátování je pak jen indexace
+_TEXTY_PROCENT = np.array([f"{i / 100:.2f}" for i in range(10001)] + [''])
+
+def _procenta(hodnoty):
+    # Podíl 0-1 -> text procent na dvě desetinná místa, NaN jako prázdná buňka
+    index = np.rint(np.nan_to_num(hodnoty, nan=-1.0) * 10000).astype(np.intp)
+    return _TEXTY_PROCENT[np.where((index < 0) | (index > 10000), 10001, index)]
+
+def uloz_odvozene(vysledky, odvozene, cesta):
+    """
+    Uloží původní sloupce spolu s odvozenými (CSV nebo .npz podle přípony).
+
+    V CSV jsou za počty sloupce účasti a vítěze, za hlasy stran jejich
+    podíly v procentech. Soubor .npz obsahuje všechna pole včetně matice
+    pořadí stran.
+
+    Args:
+        vysledky (Vysledky): Výsledky obcí
+        odvozene (dict): Výsledek odvozene_sloupce()
+        cesta (str): Výstupní soubor .csv nebo .npz
+    """
+    if cesta.endswith('.npz'):
+        pole = {
+            'kod': vysledky.kody, 'nazev': vysledky.nazvy, 'strany': np.array(vysledky.strany),
+            'registrovani': vysledky.registrovani, 'vydane_obalky': vysledky.vydane_obalky,
+            'platne_hlasy': vysledky.platne_hlasy, 'hlasy': vysledky.hlasy,
+            'ucast': odvozene['ucast'], 'podily': odvozene['podily'], 'poradi': odvozene['poradi'],
+            'vitez': odvozene['vitez'].astype(str),
+        }
+        if vysledky.okresy is not None:
+            pole['okres'] = vysledky.okresy
+        np.savez(cesta, **pole)
+        return
+
+    hlavicka = ['Kód obce', 'Název obce', 'Voliči v seznamu', 'Vydané obálky', 'Platné hlasy', 'Účast %', 'Vítěz']
+    hlavicka += vysledky.strany + [f"{strana} %" for strana in vysledky.strany]
+    # Tabulku textů složíme po sloupcích, řádky se pak jen zapíší
+    sloupce = [
+        vysledky.kody, vysledky.nazvy,
+        *(np.where(pocet < 0, '', pocet.astype(str)) for pocet in
+          (vysledky.registrovani, vysledky.vydane_obalky, vysledky.platne_hlasy)),
+        _procenta(odvozene['ucast']), odvozene['vitez'].astype(str),
+    ]
+    tabulka = np.column_stack(sloupce + [vysledky.hlasy.astype(str), _procenta(odvozene['podily'])])
+    with open(cesta, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(hlavicka)
+        writer.writerows(tabulka.tolist())
@@ -0,0 +1,205 @@
+"""
+cache.py: disková cache HTTP odpovědí pro stránky z webu volby.cz
+
+Obsah stránek se ukládá komprimovaný (gzip) podle SHA-256 hashe obsahu,
+takže stejné stránky na různých URL zabírají místo jen jednou. Index
+v SQLite mapuje URL na hash obsahu a uchovává validátory ETag
+a Last-Modified pro podmíněné ověření platnosti. Při překročení
+maximální velikosti se mažou nejdéle nepoužité záznamy (LRU).
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+VYCHOZI_ADRESAR = os.path.join(os.path.expanduser('~'), '.cache', 'volby')
+VYCHOZI_MAX_VELIKOST = 200 * 1024 * 1024
+
+class DiskovaCache:
+    """
+    Disková cache odpovědí s LRU mazáním a komprimovaným úložištěm.
+    
+    Instanci lze bezpečně sdílet mezi vlákny.
+    """
+
+    def __init__(self, adresar=VYCHOZI_ADRESAR, max_velikost=VYCHOZI_MAX_VELIKOST, jen_offline=False):
+        """
+        Args:
+            adresar (str): Adresář cache
+            max_velikost (int): Maximální velikost uložených (komprimovaných) dat v bajtech
+            jen_offline (bool): Pokud True, stránky se berou jen z cache a na server se nechodí
+        """
+        self.adresar = adresar
+        self.max_velikost = max_velikost
+        self.jen_offline = jen_offline
+        os.makedirs(os.path.join(adresar, 'objekty'), exist_ok=True)
+
+        self.zamek = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(adresar, 'index.sqlite'), check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS odpovedi (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                kodovani TEXT,
+                velikost INTEGER NOT NULL,
+                pristup REAL NOT NULL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS odpovedi_pristup ON odpovedi (pristup)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS odpovedi_hash ON odpovedi (hash)')
+        self.db.commit()
+        # Průběžný součet velikostí uložených objektů - uloz() nemusí pokaždé sčítat celý index
+        self.celkem = self._velikost()
+
+    def _cesta(self, hash_obsahu):
+        return os.path.join(self.adresar, 'objekty', hash_obsahu[:2], hash_obsahu + '.gz')
+
+    def nacti(self, url):
+        """
+        Najde uloženou odpověď pro URL.
+        
+        Args:
+            url (str): URL adresa stránky
+            
+        Returns:
+            dict: Záznam s klíči 'obsah', 'etag', 'last_modified', 'content_type', 'kodovani',
+                  nebo None, pokud URL v cache není
+        """
+        with self.zamek:
+            radek = self.db.execute(
+                'SELECT hash, etag, last_modified, content_type, kodovani FROM odpovedi WHERE url = ?', (url,)
+            ).fetchone()
+        if radek is None:
+            return None
+
+        try:
+            with gzip.open(self._cesta(radek[0]), 'rb') as f:
+                obsah = f.read()
+        except (OSError, EOFError):
+            # Soubor s obsahem zmizel nebo je poškozený - záznam zahodíme
+            self.odstran(url)
+            return None
+
+        self.oznac_pouziti(url)
+        return {
+            'obsah': obsah,
+            'etag': radek[1],
+            'last_modified': radek[2],
+            'content_type': radek[3],
+            'kodovani': radek[4],
+        }
+
+    def oznac_pouziti(self, url):
+        """
+        Zaznamená použití záznamu pro účely LRU mazání.
+        
+        Args:
+            url (str): URL adresa stránky
+        """
+        with self.zamek:
+            self.db.execute('UPDATE odpovedi SET pristup = ? WHERE url = ?', (time.time(), url))
+            self.db.commit()
+
+    def uloz(self, url, obsah, etag=None, last_modified=None, content_type=None, kodovani=None):
+        """
+        Uloží odpověď do cache a případně uvolní místo.
+        
+        Args:
+            url (str): URL adresa stránky
+            obsah (bytes): Tělo odpovědi
+            etag (str): Hodnota hlavičky ETag
+            last_modified (str): Hodnota hlavičky Last-Modified
+            content_type (str): Hodnota hlavičky Content-Type
+            kodovani (str): Kódování textu odpovědi
+        """
+        hash_obsahu = hashlib.sha256(obsah).hexdigest()
+        komprimovany = gzip.compress(obsah)
+        cesta = self._cesta(hash_obsahu)
+
+        # Zápis objektu, kontrola jeho existence i INSERT musí proběhnout pod jedním zámkem,
+        # jinak by _uvolni_misto() mohl sdílený objekt smazat těsně před vložením záznamu
+        with self.zamek:
+            novy = self.db.execute('SELECT 1 FROM odpovedi WHERE hash = ? LIMIT 1', (hash_obsahu,)).fetchone() is None
+            if not os.path.exists(cesta):
+                os.makedirs(os.path.dirname(cesta), exist_ok=True)
+                docasna = f"{cesta}.{threading.get_ident()}.tmp"
+                with open(docasna, 'wb') as f:
+                    f.write(komprimovany)
+                os.replace(docasna, cesta)
+            velikost = os.path.getsize(cesta)
+
+            stary = self.db.execute('SELECT hash, velikost FROM odpovedi WHERE url = ?', (url,)).fetchone()
+            self.db.execute(
+                'INSERT OR REPLACE INTO odpovedi VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, hash_obsahu, etag, last_modified, content_type, kodovani, velikost, time.time()),
+            )
+            if novy:
+                self.celkem += velikost
+            if stary and stary[0] != hash_obsahu and self._smaz_objekt_pokud_nepouzity(stary[0]):
+                self.celkem -= stary[1]
+            self._uvolni_misto()
+            self.db.commit()
+
+    def odstran(self, url):
+        """
+        Odstraní záznam pro URL z cache.
+        
+        Args:
+            url (str): URL adresa stránky
+        """
+        with self.zamek:
+            radek = self.db.execute('SELECT hash, velikost FROM odpovedi WHERE url = ?', (url,)).fetchone()
+            if radek:
+                self.db.execute('DELETE FROM odpovedi WHERE url = ?', (url,))
+                if self._smaz_objekt_pokud_nepouzity(radek[0]):
+                    self.celkem -= radek[1]
+                self.db.commit()
+
+    def velikost(self):
+        """
+        Returns:
+            int: Celková velikost uložených dat v bajtech (každý obsah se počítá jednou)
+        """
+        with self.zamek:
+            return self._velikost()
+
+    def _velikost(self):
+        radek = self.db.execute(
+            'SELECT SUM(velikost) FROM (SELECT DISTINCT hash, velikost FROM odpovedi)'
+        ).fetchone()
+        return radek[0] or 0
+
+    def _smaz_objekt_pokud_nepouzity(self, hash_obsahu):
+        # Obsah může sdílet více URL - soubor mažeme, až když na něj nic neodkazuje
+        if self.db.execute('SELECT 1 FROM odpovedi WHERE hash = ? LIMIT 1', (hash_obsahu,)).fetchone():
+            return False
+        try:
+            os.remove(self._cesta(hash_obsahu))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _uvolni_misto(self):
+        # Mažeme nejdéle nepoužité záznamy, dokud se nevejdeme do limitu
+        if self.celkem <= self.max_velikost:
+            return
+        # Cache mohl mezitím měnit jiný proces - před mazáním průběžný součet srovnáme s indexem
+        velikost = self._velikost()
+        if velikost <= self.max_velikost:
+            self.celkem = velikost
+            return
+        radky = self.db.execute('SELECT url, hash, velikost FROM odpovedi ORDER BY pristup').fetchall()
+        for url, hash_obsahu, velikost_objektu in radky:
+            self.db.execute('DELETE FROM odpovedi WHERE url = ?', (url,))
+            if self._smaz_objekt_pokud_nepouzity(hash_obsahu):
+                velikost -= velikost_objektu
+            if velikost <= self.max_velikost:
+                break
+        self.celkem = velikost
@@ -0,0 +1,149 @@
+"""
+cli.py: jednotný příkazový řádek balíčku volby (python -m volby)
+
+Podpříkazy:
+    crawl  - stažení výsledků z volby.cz (stejné argumenty jako scraper.py)
+    export - vytvoření výstupu ze žurnálu hotových obcí, bez stahování
+    bench  - měření studeného startu příkazů (python -X importtime)
+    index  - sestavení a prohledání rejstříku obcí voleb (volby.rejstrik)
+
+Parser sestaví jen lehké moduly. Knihovny pro stahování a zpracování
+(requests, bs4, asyncio) se načtou až v etapě, která je použije, takže
+--help i chybné argumenty skončí rychle.
+
+Použití (ze složky projekty/):
+    python -m volby crawl "https://volby.cz/pls/ps2017nss/ps32?xjazyk=CZ&xkraj=12&xnumnuts=7103" vysledky.csv --journal zurnal.jsonl
+    python -m volby export zurnal.jsonl vysledky.parquet --format parquet
+    python -m volby bench [--opakovani 5] [--json start.json]
+    python -m volby index "https://volby.cz/pls/ps2017nss/ps3?xjazyk=CZ" [--hledej Brno] [--okres 7103]
+"""
+import argparse
+import json
+import os
+import sys
+
+from . import sber
+from .definice import VOLBY, VYCHOZI_VOLBY, najdi_volby
+
+def vytvor_parser():
+    """
+    Returns:
+        argparse.ArgumentParser: Parser s podpříkazy crawl, export, bench a index
+    """
+    parser = argparse.ArgumentParser(prog="python -m volby", description="Výsledky voleb z webu volby.cz.")
+    prikazy = parser.add_subparsers(dest="prikaz", required=True)
+
+    crawl = prikazy.add_parser("crawl", help="stáhnout výsledky obcí", description=sber.POPIS)
+    sber.pridej_argumenty(crawl)
+
+    export = prikazy.add_parser("export", help="vytvořit výstup ze žurnálu hotových obcí (bez stahování)")
+    export.add_argument("zurnal", help="žurnál z crawl/scraper.py (--journal, výchozí žurnál se po úspěšném běhu smaže)")
+    export.add_argument("vystupni_soubor", help="výstupní soubor s příponou podle --format")
+    export.add_argument("--format", choices=sber.VYSTUPNI_FORMATY, default="csv", help="formát výstupu (výchozí csv)")
+    export.add_argument("--volby", choices=list(VOLBY), default=VYCHOZI_VOLBY,
+                        help=f"klíč voleb pro výstup sqlite (výchozí {VYCHOZI_VOLBY})")
+
+    bench = prikazy.add_parser("bench", help="změřit studený start příkazů (python -X importtime)")
+    bench.add_argument("--opakovani", type=int, default=5, metavar="N",
+                       help="počet spuštění každého příkazu, bere se nejkratší (výchozí 5)")
+    bench.add_argument("--json", metavar="SOUBOR", help="uložit výsledky do JSON souboru")
+
+    index = prikazy.add_parser("index", help="sestavit nebo prohledat rejstřík obcí voleb")
+    index.add_argument("url", nargs="?",
+                       help="celostátní (ps3) nebo okresní (ps32) stránka, jejíž obce se do rejstříku doplní")
+    index.add_argument("--volby", choices=list(VOLBY),
+                       help=f"klíč voleb bez URL (výchozí podle URL, jinak {VYCHOZI_VOLBY})")
+    index.add_argument("--index", metavar="SOUBOR", help="soubor rejstříku (výchozí <cache>/rejstrik_<volby>.json, u jiného serveru s jeho názvem)")
+    index.add_argument("--znovu", action="store_true", help="sestavit rejstřík znovu od začátku")
+    index.add_argument("--concurrency", type=int, default=4, metavar="N",
+                       help="počet souběžně stahovaných přehledů okresů (výchozí 4)")
+    index.add_argument("--kod", help="vypsat obec s daným kódem")
+    index.add_argument("--hledej", metavar="NAZEV", help="vypsat obce, jejichž název tak začíná")
+    index.add_argument("--okres", help="vypsat obce okresu (kód z parametru xnumnuts)")
+    return parser
+
+def crawl(args):
+    """
+    Stáhne výsledky podle argumentů (viz volby.sber).
+    """
+    sber.proved(sber.over_argumenty(args))
+
+def export(args):
+    """
+    Zapíše obce ze žurnálu do výstupu ve zvoleném formátu, v pořadí z přehledové stránky.
+    """
+    if not os.path.exists(args.zurnal):
+        print(f"ERROR: Žurnál {args.zurnal} neexistuje!")
+        sys.exit(1)
+    pripona = sber.PRIPONY_VYSTUPU[args.format]
+    if not args.vystupni_soubor.endswith(pripona):
+        print(f"ERROR: Výstupní soubor musí mít příponu {pripona}!")
+        sys.exit(1)
+
+    from .model import VysledekObce
+    from .zurnal import nacti_zurnal
+
+    obce = nacti_zurnal(args.zurnal, VysledekObce.ze_slovniku)
+    if not sber.uloz_do_csv(obce.values(), args.vystupni_soubor, args.format, args.volby):
+        sys.exit(1)
+    print(f"Exportováno {len(obce)} obcí.")
+
+def bench(args):
+    """
+    Změří studený start příkazů a vypíše tabulku, případně ji uloží do JSON.
+    """
+    from .studeny_start import vypis_starty, zmer_starty
+
+    vysledky = zmer_starty(args.opakovani)
+    vypis_starty(vysledky)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(vysledky, f, ensure_ascii=False, indent=2)
+        print(f"Výsledky uloženy do souboru: {args.json}")
+
+def index(args):
+    """
+    Doplní rejstřík obcí z přehledových stránek a vypíše vyhledané obce.
+    """
+    from .rejstrik import RejstrikObci, cesta_rejstriku
+
+    if args.url and not args.url.startswith(sber.POVOLENE_URL):
+        print("ERROR: URL adresa musí být z webu volby.cz!")
+        sys.exit(1)
+    definice = najdi_volby(args.url) if args.url else None
+    klic = args.volby or (definice or VOLBY[VYCHOZI_VOLBY]).klic
+    cesta = args.index or cesta_rejstriku(klic, url=args.url)
+    if args.znovu and os.path.exists(cesta):
+        os.remove(cesta)
+
+    rejstrik = RejstrikObci(cesta, klic)
+    if args.url:
+        sber.nacti_obce(args.url, args.concurrency, rejstrik)
+        rejstrik.uloz()
+    print(f"Rejstřík {cesta}: {len(rejstrik.okresy)} okresů, {len(rejstrik)} obcí")
+
+    kody = []
+    if args.kod:
+        kody.append(args.kod)
+    if args.hledej:
+        kody.extend(rejstrik.hledej(args.hledej))
+    if args.okres:
+        kody.extend(rejstrik.okresy.get(args.okres, {}).get('obce', []))
+    for kod in kody:
+        obec = rejstrik.obec(kod)
+        if obec is None:
+            print(f"{kod:<8} (není v rejstříku)")
+        else:
+            print(f"{kod:<8} {obec['nazev'][:30]:<30} {obec['okres']:<6} {obec['url']}")
+
+PRIKAZY = {'crawl': crawl, 'export': export, 'bench': bench, 'index': index}
+
+def main(argv=None):
+    """
+    Spustí podpříkaz podle argumentů.
+
+    Args:
+        argv (list): Argumenty příkazové řádky, None = sys.argv
+    """
+    args = vytvor_parser().parse_args(argv)
+    PRIKAZY[args.prikaz](args)
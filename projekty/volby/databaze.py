@@ -0,0 +1,255 @@
+"""
+databaze.py: ukládání výsledků do SQLite s normalizovanými tabulkami
+
+Místo širokého CSV, kterému s každou stranou přibývá sloupec, se výsledky
+ukládají do tří tabulek:
+
+    obce   (volby, kod, nazev, okres, registrovani, vydane_obalky, platne_hlasy)
+    strany (id, nazev)
+    hlasy  (volby, kod_obce, strana, hlasy)
+
+Řádky se během stahování sbírají do dávek a zapisují se příkazem
+executemany v jedné transakci na dávku. Indexy podle kódu obce, okresu
+a strany se vytvoří až po vložení všech dat (rychlejší než je udržovat
+při každém vložení), takže dotaz typu "hlasy strany X ve všech obcích
+okresu Y" nemusí číst celý soubor. Dotazy pro součty jsou ve funkcích
+soucty_stran(), hlasy_strany() a soucty_okresu() (příkazová řádka
+v scraper/dotaz.py).
+"""
+import os
+import sqlite3
+
+from .model import na_cislo
+
+PRIPONA_SQLITE = '.sqlite'
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS obce (
+        volby TEXT NOT NULL,
+        kod TEXT NOT NULL,
+        nazev TEXT NOT NULL,
+        okres TEXT,
+        registrovani INTEGER,
+        vydane_obalky INTEGER,
+        platne_hlasy INTEGER,
+        PRIMARY KEY (volby, kod)
+    );
+    CREATE TABLE IF NOT EXISTS strany (
+        id INTEGER PRIMARY KEY,
+        nazev TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS hlasy (
+        volby TEXT NOT NULL,
+        kod_obce TEXT NOT NULL,
+        strana INTEGER NOT NULL REFERENCES strany (id),
+        hlasy INTEGER NOT NULL,
+        PRIMARY KEY (volby, kod_obce, strana)
+    ) WITHOUT ROWID;
+'''
+
+INDEXY = '''
+    CREATE INDEX IF NOT EXISTS obce_kod ON obce (kod);
+    CREATE INDEX IF NOT EXISTS obce_okres ON obce (okres, volby);
+    CREATE INDEX IF NOT EXISTS hlasy_obec ON hlasy (kod_obce);
+    CREATE INDEX IF NOT EXISTS hlasy_strana ON hlasy (strana, volby);
+'''
+
+class SqliteZapisovac:
+    """
+    Zapisovač výsledků obcí do databáze SQLite.
+
+    Má stejné rozhraní jako volby.zapis.CsvZapisovac (zapis, zapis_vysledek, dokonci),
+    takže ho scrapery mohou použít místo CSV. Data se zapisují do
+    rozpracovaného souboru <vystup>.part, který se při dokončení přesune
+    na místo výstupního souboru.
+    """
+
+    def __init__(self, vystupni_soubor, volby='', okresy=None, davka=500):
+        """
+        Args:
+            vystupni_soubor (str): Název výstupního souboru (.sqlite)
+            volby (str): Klíč voleb ukládaný ke každé obci (např. 'ps2017')
+            okresy (dict): Slovník {kód obce: kód okresu}, None = okres neznámý
+            davka (int): Počet obcí zapsaných jednou transakcí
+        """
+        self.vystupni_soubor = vystupni_soubor
+        self.rozpracovany_soubor = vystupni_soubor + '.part'
+        self.volby = volby
+        self.okresy = okresy or {}
+        self.davka = davka
+        self.pocet_obci = 0
+        self.id_stran = {}
+        self.radky_obci = []
+        self.radky_hlasu = []
+
+        if os.path.exists(self.rozpracovany_soubor):
+            os.remove(self.rozpracovany_soubor)
+        self.db = sqlite3.connect(self.rozpracovany_soubor)
+        # Soubor vzniká vždy znovu, při pádu se zahodí celý - žurnál není potřeba
+        self.db.execute('PRAGMA journal_mode=OFF')
+        self.db.execute('PRAGMA synchronous=OFF')
+        self.db.executescript(SCHEMA)
+
+    def _id_strany(self, nazev):
+        id_strany = self.id_stran.get(nazev)
+        if id_strany is None:
+            id_strany = self.id_stran[nazev] = len(self.id_stran) + 1
+            self.db.execute('INSERT INTO strany (id, nazev) VALUES (?, ?)', (id_strany, nazev))
+        return id_strany
+
+    def zapis(self, zakladni_hodnoty, hlasy, volby=None):
+        """
+        Přidá obec do dávky, plná dávka se zapíše do databáze.
+
+        Args:
+            zakladni_hodnoty (list): Kód, název a tři počty (jako text nebo čísla)
+            hlasy (dict | list): Slovník {název strany: počet} nebo seznam dvojic
+            volby (str): Klíč voleb, None = volby zadané v konstruktoru
+        """
+        kod, nazev, registrovani, obalky, platne = zakladni_hodnoty
+        volby = self.volby if volby is None else volby
+        self.radky_obci.append((
+            volby, kod, nazev, self.okresy.get(kod), na_cislo(registrovani), na_cislo(obalky), na_cislo(platne),
+        ))
+        polozky = hlasy.items() if isinstance(hlasy, dict) else hlasy
+        for strana, pocet in polozky:
+            pocet = na_cislo(pocet)
+            if pocet is not None:
+                self.radky_hlasu.append((volby, kod, self._id_strany(strana), pocet))
+        self.pocet_obci += 1
+        if len(self.radky_obci) >= self.davka:
+            self._zapis_davku()
+
+    def zapis_vysledek(self, vysledek, volby=None):
+        """
+        Přidá obec ze záznamu volby.model.VysledekObce.
+
+        Args:
+            vysledek (VysledekObce): Výsledky obce
+            volby (str): Klíč voleb, None = volby zadané v konstruktoru
+        """
+        self.zapis(
+            [vysledek.kod, vysledek.nazev, vysledek.registrovani, vysledek.vydane_obalky, vysledek.platne_hlasy],
+            vysledek.strany(),
+            volby,
+        )
+
+    def _zapis_davku(self):
+        # Jedna transakce na dávku; INSERT OR REPLACE kvůli opakovanému zápisu obce
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO obce VALUES (?, ?, ?, ?, ?, ?, ?)', self.radky_obci)
+            self.db.executemany('INSERT OR REPLACE INTO hlasy VALUES (?, ?, ?, ?)', self.radky_hlasu)
+        self.radky_obci.clear()
+        self.radky_hlasu.clear()
+
+    def dokonci(self):
+        """
+        Zapíše poslední dávku, vytvoří indexy a přesune soubor na místo výstupu.
+
+        Returns:
+            int: Počet zapsaných obcí (0 znamená, že se nic nezapsalo)
+        """
+        if self.db is None:
+            return self.pocet_obci
+        self._zapis_davku()
+        if self.pocet_obci:
+            self.db.executescript(INDEXY)
+            self.db.execute('ANALYZE')
+        self.db.close()
+        self.db = None
+
+        if not self.pocet_obci:
+            os.remove(self.rozpracovany_soubor)
+            return 0
+        os.replace(self.rozpracovany_soubor, self.vystupni_soubor)
+        return self.pocet_obci
+
+
+def _podminky(volby=None, okres=None):
+    # Společné filtry dotazů nad tabulkou obce (alias o)
+    podminky, parametry = [], []
+    if volby is not None:
+        podminky.append('o.volby = ?')
+        parametry.append(volby)
+    if okres is not None:
+        podminky.append('o.okres = ?')
+        parametry.append(okres)
+    return (' AND ' + ' AND '.join(podminky)) if podminky else '', parametry
+
+def soucty_stran(db, volby=None, okres=None):
+    """
+    Sečte hlasy stran (celkem, případně za volby a okres).
+
+    Args:
+        db (sqlite3.Connection): Otevřená databáze ze SqliteZapisovac
+        volby (str): Klíč voleb, None = všechny
+        okres (str): Kód okresu, None = všechny
+
+    Returns:
+        list: Trojice (volby, název strany, součet hlasů) seřazené podle hlasů sestupně
+    """
+    filtr, parametry = _podminky(volby, okres)
+    return db.execute(f'''
+        SELECT h.volby, s.nazev, SUM(h.hlasy) AS celkem
+        FROM hlasy h
+        JOIN obce o ON o.volby = h.volby AND o.kod = h.kod_obce
+        JOIN strany s ON s.id = h.strana
+        WHERE 1 = 1{filtr}
+        GROUP BY h.volby, h.strana
+        ORDER BY h.volby, celkem DESC
+    ''', parametry).fetchall()
+
+def hlasy_strany(db, strana, volby=None, okres=None):
+    """
+    Vrátí hlasy jedné strany ve všech obcích (případně jen v okrese).
+
+    Args:
+        db (sqlite3.Connection): Otevřená databáze ze SqliteZapisovac
+        strana (str): Název strany
+        volby (str): Klíč voleb, None = všechny
+        okres (str): Kód okresu, None = všechny
+
+    Returns:
+        list: Řádky (volby, kód obce, název obce, okres, hlasy, platné hlasy obce)
+    """
+    filtr, parametry = _podminky(volby, okres)
+    return db.execute(f'''
+        SELECT h.volby, o.kod, o.nazev, o.okres, h.hlasy, o.platne_hlasy
+        FROM hlasy h
+        JOIN obce o ON o.volby = h.volby AND o.kod = h.kod_obce
+        WHERE h.strana = (SELECT id FROM strany WHERE nazev = ?){filtr}
+        ORDER BY h.volby, o.kod
+    ''', [strana] + parametry).fetchall()
+
+def existuje_strana(db, strana):
+    """
+    Zjistí, jestli je strana v databázi (v jakýchkoli volbách a obcích).
+
+    Args:
+        db (sqlite3.Connection): Otevřená databáze ze SqliteZapisovac
+        strana (str): Název strany
+
+    Returns:
+        bool: True pokud je strana v tabulce stran
+    """
+    return db.execute('SELECT 1 FROM strany WHERE nazev = ?', (strana,)).fetchone() is not None
+
+def soucty_okresu(db, volby=None):
+    """
+    Sečte voliče, obálky a platné hlasy po okresech.
+
+    Args:
+        db (sqlite3.Connection): Otevřená databáze ze SqliteZapisovac
+        volby (str): Klíč voleb, None = všechny
+
+    Returns:
+        list: Řádky (volby, okres, počet obcí, voliči, obálky, platné hlasy)
+    """
+    filtr, parametry = _podminky(volby)
+    return db.execute(f'''
+        SELECT o.volby, o.okres, COUNT(*), SUM(o.registrovani), SUM(o.vydane_obalky), SUM(o.platne_hlasy)
+        FROM obce o
+        WHERE 1 = 1{filtr}
+        GROUP BY o.volby, o.okres
+        ORDER BY o.volby, o.okres
+    ''', parametry).fetchall()
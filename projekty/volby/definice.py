@@ -0,0 +1,97 @@
+"""
+definice.py: definice podporovaných voleb jako data
+
+Každé volby do Poslanecké sněmovny mají na volby.cz vlastní adresář
+(ps2013, ps2017nss, ps2021). Skripty stránek (ps3, ps32, ps311) a jejich
+parametry jsou ve všech ročnících stejné, liší se jen základní URL.
+Lokátory buněk (atribut headers, viz extrakce.py) a pozice sloupců
+v souhrnné tabulce jsou uvedeny pro každé volby zvlášť, aby šlo případnou
+změnu rozložení stránky opravit jen úpravou dat.
+"""
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from .extrakce import LOKATORY
+
+@dataclass(frozen=True)
+class DefiniceVoleb:
+    """
+    Popis jedněch voleb na webu volby.cz.
+    """
+    klic: str
+    nazev: str
+    zaklad_url: str
+    # Hodnota atributu headers -> pole výsledku (viz extrakce.LOKATORY)
+    lokatory: dict = field(default_factory=lambda: dict(LOKATORY), hash=False)
+    # Pozice buněk td voličů, obálek a platných hlasů v souhrnném řádku (záložní hledání v tabulkách)
+    sloupce_souhrnu: tuple = (3, 4, 7)
+
+    @property
+    def adresar(self):
+        """
+        Returns:
+            str: Adresář voleb v cestě URL (např. 'ps2017nss')
+        """
+        return urlsplit(self.zaklad_url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+VOLBY = {
+    definice.klic: definice
+    for definice in (
+        DefiniceVoleb('ps2013', "Poslanecká sněmovna 2013", "https://www.volby.cz/pls/ps2013/"),
+        DefiniceVoleb('ps2017', "Poslanecká sněmovna 2017", "https://www.volby.cz/pls/ps2017nss/"),
+        DefiniceVoleb('ps2021', "Poslanecká sněmovna 2021", "https://www.volby.cz/pls/ps2021/"),
+    )
+}
+VYCHOZI_VOLBY = 'ps2017'
+
+# Lokální zástupný server pro testování bez sítě (scraper/lokalni_server.py)
+LOKALNI_URL = ("http://127.0.0.1:", "http://localhost:")
+
+def povolene_url():
+    """
+    Returns:
+        tuple: Povolené začátky URL - adresáře všech voleb na volby.cz (i bez www) a lokální server
+    """
+    zacatky = []
+    for definice in VOLBY.values():
+        zacatky.append(definice.zaklad_url)
+        zacatky.append(definice.zaklad_url.replace('://www.', '://'))
+    return tuple(zacatky) + LOKALNI_URL
+
+def najdi_volby(url):
+    """
+    Určí volby podle adresáře v cestě URL (funguje i pro lokální server).
+
+    Args:
+        url (str): URL adresa stránky
+
+    Returns:
+        DefiniceVoleb: Definice voleb, nebo None pokud adresář neodpovídá žádným volbám
+    """
+    casti = urlsplit(url).path.split('/')
+    for definice in VOLBY.values():
+        if definice.adresar in casti:
+            return definice
+    return None
+
+def prepis_url(url, definice):
+    """
+    Převede URL stránky jedněch voleb na stejnou stránku jiných voleb.
+
+    Args:
+        url (str): URL adresa stránky (např. ps32 okresu ve volbách 2017)
+        definice (DefiniceVoleb): Cílové volby
+
+    Returns:
+        str: URL se zaměněným adresářem voleb
+
+    Raises:
+        ValueError: Pokud v URL není adresář žádných známých voleb
+    """
+    puvodni = najdi_volby(url)
+    if puvodni is None:
+        raise ValueError(f"URL neobsahuje adresář známých voleb: {url}")
+    adresa = urlsplit(url)
+    cesta = '/'.join(definice.adresar if cast == puvodni.adresar else cast for cast in adresa.path.split('/'))
+    return adresa._replace(path=cesta).geturl()
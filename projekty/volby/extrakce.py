@@ -0,0 +1,153 @@
+"""
+extrakce.py: jednoprůchodové čtení výsledků obce z detailní stránky (ps311)
+
+Místo převodu celé stránky na tabulky a jejich opakovaného procházení
+se stránka projde jednou a všímá si jen buněk <td>, jejichž atribut
+headers je v tabulce lokátorů. Text každé takové buňky se spočítá právě
+jednou. Lokátory odpovídají stálému rozložení stránek volby.cz:
+
+    sa2, sa3, sa6          - voliči v seznamu, vydané obálky, platné hlasy
+    t1sa1 t1sb2 (t2...)    - název strany v první (druhé) tabulce stran
+    t1sa2 t1sb3 (t2...)    - počet hlasů strany
+
+Backendy:
+    'stream' - jeden průchod předkompilovaným regulárním výrazem přes buňky
+               <td headers="..."> (bez závislostí, ostatní HTML se neparsuje)
+    'lxml'   - lxml.html (volitelná závislost)
+    'bs4'    - BeautifulSoup s html.parser
+"""
+import re
+from html import unescape
+
+from .model import VysledekObce
+from .parsery import VYCHOZI_BACKEND
+
+# Hodnota atributu headers -> pole výsledku
+LOKATORY = {
+    'sa2': 'registrovani',
+    'sa3': 'vydane_obalky',
+    'sa6': 'platne_hlasy',
+    't1sa1 t1sb2': 'strana',
+    't2sa1 t2sb2': 'strana',
+    't1sa2 t1sb3': 'hlasy',
+    't2sa2 t2sb3': 'hlasy',
+}
+
+class _Sber:
+    """
+    Skládá hodnoty nalezených buněk do výsledku obce.
+    """
+    __slots__ = ('hodnoty', 'strany', 'strana')
+
+    def __init__(self):
+        self.hodnoty = {}
+        self.strany = {}
+        self.strana = None
+
+    def pridej(self, pole, text):
+        text = text.strip()
+        if pole == 'strana':
+            self.strana = text
+        elif pole == 'hlasy':
+            # Počet hlasů patří k názvu strany ze stejného řádku
+            if self.strana:
+                self.strany[self.strana] = text
+            self.strana = None
+        elif pole not in self.hodnoty:
+            self.hodnoty[pole] = text
+
+    def jako_slovnik(self, kod_obce, nazev_obce):
+        return {
+            'kod': kod_obce,
+            'nazev': nazev_obce,
+            'registrovani': self.hodnoty.get('registrovani'),
+            'vydane_obalky': self.hodnoty.get('vydane_obalky'),
+            'platne_hlasy': self.hodnoty.get('platne_hlasy'),
+            'strany': self.strany,
+        }
+
+
+# Buňka <td ... headers="..."> a její obsah; volby.cz buňky vždy uzavírá
+_BUNKA = re.compile(r'<td\b[^>]*?\bheaders="([^"]*)"[^>]*>(.*?)</td\s*>', re.S | re.I)
+_ZNACKA = re.compile(r'<[^>]*>')
+
+def _extrahuj_stream(html, lokatory, sber):
+    # Jeden průchod předkompilovaným výrazem přes buňky, ostatní HTML se neparsuje
+    for bunka in _BUNKA.finditer(html):
+        pole = lokatory.get(bunka[1])
+        if pole is None:
+            continue
+        text = bunka[2]
+        if '<' in text:
+            text = _ZNACKA.sub('', text)
+        if '&' in text:
+            text = unescape(text)
+        sber.pridej(pole, text)
+
+def _extrahuj_lxml(html, lokatory, sber):
+    try:
+        import lxml.html
+    except ImportError:
+        raise ImportError("Backend 'lxml' vyžaduje knihovnu lxml (pip install lxml)") from None
+
+    for bunka in lxml.html.fromstring(html).iter('td'):
+        pole = lokatory.get(bunka.get('headers'))
+        if pole is not None:
+            sber.pridej(pole, bunka.text_content())
+
+def _extrahuj_bs4(html, lokatory, sber):
+    from bs4 import BeautifulSoup
+
+    for bunka in BeautifulSoup(html, 'html.parser').find_all('td', headers=True):
+        # BeautifulSoup vrací headers jako seznam (víceslovný atribut)
+        headers = bunka['headers']
+        pole = lokatory.get(headers if isinstance(headers, str) else ' '.join(headers))
+        if pole is not None:
+            sber.pridej(pole, bunka.text)
+
+BACKENDY = {
+    'stream': _extrahuj_stream,
+    'lxml': _extrahuj_lxml,
+    'bs4': _extrahuj_bs4,
+}
+
+def extrahuj_data_obce(html, kod_obce, nazev_obce, backend=VYCHOZI_BACKEND, lokatory=LOKATORY):
+    """
+    Přečte výsledky obce z detailní stránky jedním průchodem.
+
+    Args:
+        html (str): HTML obsah detailní stránky obce
+        kod_obce (str): Kód obce
+        nazev_obce (str): Název obce
+        backend (str): Název backendu ('stream', 'lxml' nebo 'bs4')
+        lokatory (dict): Slovník {hodnota atributu headers: pole výsledku}
+
+    Returns:
+        dict: Slovník ve tvaru VysledekObce.ze_slovniku() (počty jako text ze stránky),
+              nebo None pokud stránka nemá hledané buňky (jiné rozložení stránky)
+
+    Raises:
+        ValueError: Pokud backend neexistuje
+    """
+    try:
+        funkce = BACKENDY[backend]
+    except KeyError:
+        raise ValueError(f"Neznámý parser '{backend}', dostupné: {', '.join(BACKENDY)}") from None
+    sber = _Sber()
+    funkce(html, lokatory, sber)
+    if not sber.hodnoty and not sber.strany:
+        return None
+    return sber.jako_slovnik(kod_obce, nazev_obce)
+
+def extrahuj_obec(html, kod_obce, nazev_obce, backend=VYCHOZI_BACKEND, lokatory=LOKATORY):
+    """
+    Přečte výsledky obce jako záznam VysledekObce (viz extrahuj_data_obce).
+
+    Záznam se vytváří v procesu, který ho bude používat - indexy stran
+    ve sdílené tabulce stran platí jen v rámci jednoho procesu.
+
+    Returns:
+        VysledekObce: Výsledky obce, nebo None pokud stránka nemá hledané buňky
+    """
+    data = extrahuj_data_obce(html, kod_obce, nazev_obce, backend, lokatory)
+    return None if data is None else VysledekObce.ze_slovniku(data)
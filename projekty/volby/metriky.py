@@ -0,0 +1,326 @@
+"""
+metriky.py: počítadla, histogramy a profilování běhu scraperů
+
+Stahování, zpracování a zápis zaznamenávají do sdíleného registru METRIKY
+dobu a velikost každé stránky. Na konci běhu lze registr vypsat jako
+souhrn, uložit jako JSON nebo jako textový formát Prometheus.
+Zaznamenání hodnoty je jen pár operací pod zámkem, takže se metriky
+sbírají vždy (i bez exportu).
+
+Profilování (cProfile nebo pyinstrument) se zapíná kontextovým
+manažerem profilovani().
+"""
+import bisect
+import contextlib
+import json
+import threading
+import time
+
+# Hranice košů histogramu pro doby v sekundách a velikosti stránek v bajtech
+HRANICE_SEKUNDY = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HRANICE_BAJTY = (1024, 4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+NASTROJE_PROFILOVANI = ('cprofile', 'pyinstrument')
+
+class Citac:
+    """
+    Počítadlo, které jen roste (počet požadavků, přenesené bajty...).
+    """
+    __slots__ = ('nazev', 'popis', 'stitky', 'hodnota', '_zamek')
+
+    def __init__(self, nazev, popis, stitky):
+        self.nazev = nazev
+        self.popis = popis
+        self.stitky = stitky
+        self.hodnota = 0
+        self._zamek = threading.Lock()
+
+    def pridej(self, hodnota=1):
+        """
+        Zvýší počítadlo.
+
+        Args:
+            hodnota (int | float): O kolik se počítadlo zvýší
+        """
+        with self._zamek:
+            self.hodnota += hodnota
+
+    def jako_slovnik(self):
+        """
+        Returns:
+            dict: Štítky a hodnota počítadla
+        """
+        return {'stitky': dict(self.stitky), 'hodnota': self.hodnota}
+
+class Histogram:
+    """
+    Histogram hodnot s pevnými koši (doby, velikosti stránek).
+    """
+    __slots__ = ('nazev', 'popis', 'stitky', 'hranice', 'kose', 'pocet', 'soucet', 'minimum', 'maximum', '_zamek')
+
+    def __init__(self, nazev, popis, stitky, hranice):
+        self.nazev = nazev
+        self.popis = popis
+        self.stitky = stitky
+        self.hranice = tuple(hranice)
+        # Poslední koš je pro hodnoty nad nejvyšší hranicí (+Inf)
+        self.kose = [0] * (len(self.hranice) + 1)
+        self.pocet = 0
+        self.soucet = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._zamek = threading.Lock()
+
+    def zaznamenej(self, hodnota):
+        """
+        Přidá hodnotu do histogramu.
+
+        Args:
+            hodnota (int | float): Naměřená hodnota
+        """
+        index = bisect.bisect_left(self.hranice, hodnota)
+        with self._zamek:
+            self.kose[index] += 1
+            self.pocet += 1
+            self.soucet += hodnota
+            if self.minimum is None or hodnota < self.minimum:
+                self.minimum = hodnota
+            if self.maximum is None or hodnota > self.maximum:
+                self.maximum = hodnota
+
+    @contextlib.contextmanager
+    def mereni(self):
+        """
+        Změří dobu bloku with a zaznamená ji v sekundách.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.zaznamenej(time.perf_counter() - start)
+
+    def kvantil(self, q):
+        """
+        Odhadne kvantil lineární interpolací uvnitř koše.
+
+        Args:
+            q (float): Kvantil 0-1 (např. 0.99)
+
+        Returns:
+            float: Odhad kvantilu, nebo None pokud je histogram prázdný
+        """
+        with self._zamek:
+            if not self.pocet:
+                return None
+            cil = q * self.pocet
+            kumulativne = 0
+            for index, pocet in enumerate(self.kose):
+                if pocet and kumulativne + pocet >= cil:
+                    dolni = self.hranice[index - 1] if index > 0 else self.minimum
+                    horni = self.hranice[index] if index < len(self.hranice) else self.maximum
+                    dolni, horni = max(dolni, self.minimum), min(horni, self.maximum)
+                    return dolni + (horni - dolni) * (cil - kumulativne) / pocet
+                kumulativne += pocet
+            return self.maximum
+
+    def jako_slovnik(self):
+        """
+        Returns:
+            dict: Štítky, počet, součet, minimum, maximum, p50, p99 a koše histogramu
+        """
+        p50, p99 = self.kvantil(0.5), self.kvantil(0.99)
+        with self._zamek:
+            return {
+                'stitky': dict(self.stitky),
+                'pocet': self.pocet,
+                'soucet': self.soucet,
+                'minimum': self.minimum,
+                'maximum': self.maximum,
+                'p50': p50,
+                'p99': p99,
+                'kose': {str(hranice): pocet for hranice, pocet in zip(self.hranice + ('+Inf',), self.kose)},
+            }
+
+class Metriky:
+    """
+    Registr počítadel a histogramů. Metrika se stejným názvem a štítky
+    se vytvoří jen jednou, další volání vrátí existující objekt.
+    """
+
+    def __init__(self):
+        self.metriky = {}
+        self._zamek = threading.Lock()
+
+    def _ziskej(self, trida, nazev, popis, stitky, *args):
+        klic = (nazev, tuple(sorted(stitky.items())))
+        metrika = self.metriky.get(klic)
+        if metrika is None:
+            with self._zamek:
+                metrika = self.metriky.get(klic)
+                if metrika is None:
+                    metrika = self.metriky[klic] = trida(nazev, popis, klic[1], *args)
+        return metrika
+
+    def citac(self, nazev, popis='', **stitky):
+        """
+        Vrátí počítadlo, případně ho vytvoří.
+
+        Args:
+            nazev (str): Název metriky (ve stylu Prometheus, např. 'volby_pozadavky_celkem')
+            popis (str): Popis metriky
+            **stitky: Štítky metriky (např. stav='200')
+
+        Returns:
+            Citac: Počítadlo
+        """
+        return self._ziskej(Citac, nazev, popis, stitky)
+
+    def histogram(self, nazev, popis='', hranice=HRANICE_SEKUNDY, **stitky):
+        """
+        Vrátí histogram, případně ho vytvoří.
+
+        Args:
+            nazev (str): Název metriky
+            popis (str): Popis metriky
+            hranice (tuple): Horní hranice košů (vzestupně)
+            **stitky: Štítky metriky
+
+        Returns:
+            Histogram: Histogram
+        """
+        return self._ziskej(Histogram, nazev, popis, stitky, hranice)
+
+    def vynuluj(self):
+        """
+        Odstraní všechny metriky (např. mezi dvěma měřeními).
+        """
+        with self._zamek:
+            self.metriky.clear()
+
+    def _podle_nazvu(self):
+        skupiny = {}
+        for (nazev, _), metrika in sorted(self.metriky.items()):
+            skupiny.setdefault(nazev, []).append(metrika)
+        return skupiny
+
+    def jako_slovnik(self):
+        """
+        Returns:
+            dict: {'citace': {název: [...]}, 'histogramy': {název: [...]}}
+        """
+        vysledek = {'citace': {}, 'histogramy': {}}
+        for nazev, metriky in self._podle_nazvu().items():
+            druh = 'histogramy' if isinstance(metriky[0], Histogram) else 'citace'
+            vysledek[druh][nazev] = [metrika.jako_slovnik() for metrika in metriky]
+        return vysledek
+
+    def jako_prometheus(self):
+        """
+        Returns:
+            str: Metriky v textovém formátu Prometheus (exposition format 0.0.4)
+        """
+        radky = []
+        for nazev, metriky in self._podle_nazvu().items():
+            histogram = isinstance(metriky[0], Histogram)
+            if metriky[0].popis:
+                radky.append(f"# HELP {nazev} {metriky[0].popis}")
+            radky.append(f"# TYPE {nazev} {'histogram' if histogram else 'counter'}")
+            for metrika in metriky:
+                if not histogram:
+                    radky.append(f"{nazev}{_stitky(metrika.stitky)} {metrika.hodnota}")
+                    continue
+                data = metrika.jako_slovnik()
+                kumulativne = 0
+                for hranice, pocet in data['kose'].items():
+                    kumulativne += pocet
+                    radky.append(f"{nazev}_bucket{_stitky(metrika.stitky, le=hranice)} {kumulativne}")
+                radky.append(f"{nazev}_sum{_stitky(metrika.stitky)} {data['soucet']}")
+                radky.append(f"{nazev}_count{_stitky(metrika.stitky)} {data['pocet']}")
+        return '\n'.join(radky) + '\n'
+
+    def uloz(self, cesta):
+        """
+        Uloží metriky do souboru - .json jako JSON, jinak ve formátu Prometheus.
+
+        Args:
+            cesta (str): Cesta k výstupnímu souboru
+        """
+        with open(cesta, 'w', encoding='utf-8') as f:
+            if cesta.endswith('.json'):
+                json.dump(self.jako_slovnik(), f, ensure_ascii=False, indent=2)
+            else:
+                f.write(self.jako_prometheus())
+
+    def vypis_souhrn(self):
+        """
+        Vypíše počet, p50 a p99 všech neprázdných histogramů dob.
+        """
+        for (nazev, stitky), metrika in sorted(self.metriky.items()):
+            if not isinstance(metrika, Histogram) or not metrika.pocet or metrika.hranice != HRANICE_SEKUNDY:
+                continue
+            popis = nazev + _stitky(stitky)
+            print(f"{popis}: {metrika.pocet}x, p50 {metrika.kvantil(0.5) * 1000:.1f} ms, "
+                  f"p99 {metrika.kvantil(0.99) * 1000:.1f} ms, celkem {metrika.soucet:.2f} s")
+
+def _stitky(stitky, **dalsi):
+    # Štítky ve tvaru {klic="hodnota",...} pro formát Prometheus
+    polozky = list(stitky) + list(dalsi.items())
+    if not polozky:
+        return ''
+    return '{' + ','.join(f'{klic}="{hodnota}"' for klic, hodnota in polozky) + '}'
+
+
+# Sdílený registr metrik pro celý proces
+METRIKY = Metriky()
+
+
+@contextlib.contextmanager
+def profilovani(nastroj=None, vystup=None):
+    """
+    Profiluje blok with zvoleným nástrojem.
+
+    cProfile uloží statistiky do souboru (výchozí profil.prof, lze otevřít
+    např. nástrojem snakeviz) a vypíše 15 nejdražších funkcí.
+    pyinstrument uloží HTML (výchozí profil.html) a vypíše textový strom.
+
+    Args:
+        nastroj (str): 'cprofile', 'pyinstrument' nebo None (bez profilování)
+        vystup (str): Cesta k výstupnímu souboru profilu
+
+    Raises:
+        ImportError: Pokud není nainstalovaný pyinstrument
+        ValueError: Pokud nástroj neexistuje
+    """
+    if nastroj is None:
+        yield
+        return
+    if nastroj not in NASTROJE_PROFILOVANI:
+        raise ValueError(f"Neznámý profiler '{nastroj}', dostupné: {', '.join(NASTROJE_PROFILOVANI)}")
+
+    if nastroj == 'cprofile':
+        import cProfile
+        import pstats
+
+        profil = cProfile.Profile()
+        profil.enable()
+        try:
+            yield
+        finally:
+            profil.disable()
+            profil.dump_stats(vystup or 'profil.prof')
+            pstats.Stats(profil).sort_stats('cumulative').print_stats(15)
+        return
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        raise ImportError("Profiler 'pyinstrument' vyžaduje knihovnu pyinstrument (pip install pyinstrument)") from None
+    profil = Profiler()
+    profil.start()
+    try:
+        yield
+    finally:
+        profil.stop()
+        with open(vystup or 'profil.html', 'w', encoding='utf-8') as f:
+            f.write(profil.output_html())
+        print(profil.output_text())
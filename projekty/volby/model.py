@@ -0,0 +1,156 @@
+"""
+model.py: kompaktní záznam výsledků jedné obce
+
+Místo slovníku řetězců s vnořeným slovníkem stran ({název strany: hlasy})
+se výsledek obce drží v dataclass se __slots__ a celočíselnými poli.
+Hlasy stran jsou v poli array('I') indexovaném podle sdílené tabulky
+stran, takže se názvy stran v paměti neopakují u každé obce.
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+# Hodnota v poli hlasů pro stranu, která na stránce obce nebyla
+CHYBI = 0xFFFFFFFF
+
+class TabulkaStran:
+    """
+    Sdílená tabulka stran - přiřazuje názvům stran pořadová čísla.
+    """
+
+    def __init__(self):
+        self.nazvy = []
+        self.indexy = {}
+
+    def index(self, nazev):
+        """
+        Vrátí index strany, novou stranu přidá na konec tabulky.
+
+        Args:
+            nazev (str): Název strany
+
+        Returns:
+            int: Index strany
+        """
+        index = self.indexy.get(nazev)
+        if index is None:
+            index = self.indexy[nazev] = len(self.nazvy)
+            self.nazvy.append(nazev)
+        return index
+
+# Tabulka stran sdílená všemi záznamy v procesu
+STRANY = TabulkaStran()
+
+
+def na_cislo(hodnota, chybi=None):
+    """
+    Převede počet ze stránky (text s mezerami jako oddělovači tisíců) na číslo.
+
+    Jediný převod počtů pro záznamy i všechny zapisovače (SQLite, sloupcové
+    formáty), které se liší jen hodnotou pro chybějící počet.
+
+    Args:
+        hodnota (str | int | None): Počet ze stránky
+        chybi: Hodnota vrácená za chybějící nebo nečíselný počet (např. -1 v .npz)
+
+    Returns:
+        int: Počet, nebo chybi pokud hodnota chybí nebo není celé číslo
+    """
+    if isinstance(hodnota, int):
+        return hodnota
+    if hodnota is None:
+        return chybi
+    hodnota = str(hodnota).replace('\xa0', '').replace(' ', '').strip()
+    return int(hodnota) if hodnota.isdigit() else chybi
+
+
+@dataclass(slots=True)
+class VysledekObce:
+    """
+    Výsledky voleb v jedné obci.
+    """
+    kod: str
+    nazev: str
+    registrovani: Optional[int]
+    vydane_obalky: Optional[int]
+    platne_hlasy: Optional[int]
+    hlasy: array
+
+    @classmethod
+    def z_hodnot(cls, kod, nazev, registrovani, vydane_obalky, platne_hlasy, strany):
+        """
+        Vytvoří záznam z hodnot přečtených ze stránky.
+
+        Args:
+            kod (str): Kód obce
+            nazev (str): Název obce
+            registrovani (str | int): Počet voličů v seznamu
+            vydane_obalky (str | int): Počet vydaných obálek
+            platne_hlasy (str | int): Počet platných hlasů
+            strany (dict): Slovník {název strany: počet hlasů}, strany
+                           s nečíselným počtem se vynechají
+
+        Returns:
+            VysledekObce: Nový záznam
+        """
+        hlasy = array('I')
+        for nazev_strany, pocet in strany.items():
+            pocet = na_cislo(pocet)
+            if pocet is None:
+                continue
+            index = STRANY.index(nazev_strany)
+            if index >= len(hlasy):
+                hlasy.extend([CHYBI] * (index + 1 - len(hlasy)))
+            hlasy[index] = pocet
+        return cls(kod, nazev, na_cislo(registrovani), na_cislo(vydane_obalky), na_cislo(platne_hlasy), hlasy)
+
+    @classmethod
+    def ze_slovniku(cls, data):
+        """
+        Vytvoří záznam ze slovníku (výsledek jako_slovnik() nebo parseru scraperu).
+
+        Args:
+            data (dict): Slovník s klíči kod, nazev, registrovani, vydane_obalky, platne_hlasy, strany
+
+        Returns:
+            VysledekObce: Nový záznam
+        """
+        return cls.z_hodnot(
+            data['kod'], data['nazev'], data['registrovani'], data['vydane_obalky'], data['platne_hlasy'],
+            data['strany'],
+        )
+
+    def strany(self):
+        """
+        Returns:
+            list: Dvojice (název strany, počet hlasů) pro strany uvedené na stránce obce
+        """
+        nazvy = STRANY.nazvy
+        return [(nazvy[index], pocet) for index, pocet in enumerate(self.hlasy) if pocet != CHYBI]
+
+    def zakladni_hodnoty(self):
+        """
+        Returns:
+            list: Kód, název a tři počty pro základní sloupce výstupu (chybějící počet jako '')
+        """
+        return [
+            self.kod,
+            self.nazev,
+            '' if self.registrovani is None else self.registrovani,
+            '' if self.vydane_obalky is None else self.vydane_obalky,
+            '' if self.platne_hlasy is None else self.platne_hlasy,
+        ]
+
+    def jako_slovnik(self):
+        """
+        Returns:
+            dict: Záznam jako slovník vhodný pro JSON
+        """
+        return {
+            'kod': self.kod,
+            'nazev': self.nazev,
+            'registrovani': self.registrovani,
+            'vydane_obalky': self.vydane_obalky,
+            'platne_hlasy': self.platne_hlasy,
+            'strany': dict(self.strany()),
+        }
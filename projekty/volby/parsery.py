@@ -0,0 +1,160 @@
+"""
+parsery.py: zaměnitelné backendy pro čtení tabulek z HTML stránek volby.cz
+
+Každý backend převede HTML na stejný jednoduchý model - seznam tabulek
+(Tabulka) s řádky (Radek), kde má každá buňka text spočítaný právě
+jednou. Scrapery pak nad tímto modelem hledají výsledky a nezávisí na
+tom, kterou knihovnou se HTML četlo.
+
+Backendy:
+    'stream' - html.parser.HTMLParser, sbírá jen text buněk <td>/<th> (bez závislostí)
+    'lxml'   - lxml.html (volitelná závislost)
+    'bs4'    - BeautifulSoup s html.parser (původní cesta)
+"""
+from html.parser import HTMLParser
+
+VYCHOZI_BACKEND = 'stream'
+
+class Radek:
+    """
+    Řádek tabulky - texty hlavičkových (th) a datových (td) buněk.
+    """
+    __slots__ = ('th', 'td')
+
+    def __init__(self):
+        self.th = []
+        self.td = []
+
+class Tabulka:
+    """
+    Tabulka - třídy elementu, řádky a veškerý text uvnitř tabulky.
+    """
+    __slots__ = ('tridy', 'radky', 'text')
+
+    def __init__(self, tridy):
+        self.tridy = tridy
+        self.radky = []
+        self.text = ''
+
+
+class _SberTabulek(HTMLParser):
+    """
+    Proudový parser, který si všímá jen tabulek a textu jejich buněk.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tabulky = []
+        self.tabulka = None
+        self.radek = None
+        self.bunka = None
+        self.text_tabulky = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            tridy = next((hodnota or '' for nazev, hodnota in attrs if nazev == 'class'), '').split()
+            self.tabulka = Tabulka(tridy)
+            self.text_tabulky = []
+            self.tabulky.append(self.tabulka)
+        elif self.tabulka is None:
+            return
+        elif tag == 'tr':
+            self._uzavri_bunku()
+            self.radek = Radek()
+            self.tabulka.radky.append(self.radek)
+        elif tag in ('td', 'th') and self.radek is not None:
+            self._uzavri_bunku()
+            self.bunka = (tag, [])
+
+    def handle_endtag(self, tag):
+        if self.tabulka is None:
+            return
+        if tag in ('td', 'th'):
+            self._uzavri_bunku()
+        elif tag == 'tr':
+            self._uzavri_bunku()
+            self.radek = None
+        elif tag == 'table':
+            self._uzavri_bunku()
+            self.tabulka.text = ''.join(self.text_tabulky)
+            self.tabulka = self.radek = self.text_tabulky = None
+
+    def handle_data(self, data):
+        if self.tabulka is None:
+            return
+        self.text_tabulky.append(data)
+        if self.bunka is not None:
+            self.bunka[1].append(data)
+
+    def _uzavri_bunku(self):
+        if self.bunka is None:
+            return
+        tag, casti = self.bunka
+        (self.radek.th if tag == 'th' else self.radek.td).append(''.join(casti))
+        self.bunka = None
+
+
+def _tabulky_stream(html):
+    sber = _SberTabulek()
+    sber.feed(html)
+    sber.close()
+    return sber.tabulky
+
+def _tabulky_bs4(html):
+    from bs4 import BeautifulSoup
+
+    tabulky = []
+    for table in BeautifulSoup(html, 'html.parser').find_all('table'):
+        tabulka = Tabulka(table.get('class') or [])
+        tabulka.text = table.text
+        for tr in table.find_all('tr'):
+            radek = Radek()
+            for bunka in tr.find_all(('th', 'td')):
+                (radek.th if bunka.name == 'th' else radek.td).append(bunka.text)
+            tabulka.radky.append(radek)
+        tabulky.append(tabulka)
+    return tabulky
+
+def _tabulky_lxml(html):
+    try:
+        import lxml.html
+    except ImportError:
+        raise ImportError("Backend 'lxml' vyžaduje knihovnu lxml (pip install lxml)") from None
+
+    tabulky = []
+    for table in lxml.html.fromstring(html).iter('table'):
+        tabulka = Tabulka((table.get('class') or '').split())
+        tabulka.text = table.text_content()
+        for tr in table.iter('tr'):
+            radek = Radek()
+            for bunka in tr.iter('th', 'td'):
+                (radek.th if bunka.tag == 'th' else radek.td).append(bunka.text_content())
+            tabulka.radky.append(radek)
+        tabulky.append(tabulka)
+    return tabulky
+
+BACKENDY = {
+    'stream': _tabulky_stream,
+    'lxml': _tabulky_lxml,
+    'bs4': _tabulky_bs4,
+}
+
+def nacti_tabulky(html, backend=VYCHOZI_BACKEND):
+    """
+    Převede HTML stránky na seznam tabulek.
+
+    Args:
+        html (str): HTML obsah stránky
+        backend (str): Název backendu ('stream', 'lxml' nebo 'bs4')
+
+    Returns:
+        list: Seznam objektů Tabulka v pořadí výskytu na stránce
+
+    Raises:
+        ValueError: Pokud backend neexistuje
+    """
+    try:
+        funkce = BACKENDY[backend]
+    except KeyError:
+        raise ValueError(f"Neznámý parser '{backend}', dostupné: {', '.join(BACKENDY)}") from None
+    return funkce(html)
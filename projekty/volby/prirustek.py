@@ -0,0 +1,120 @@
+"""
+prirustek.py: přírůstkové obnovení výsledků během sčítání hlasů
+
+Stav minulého běhu (soubor JSON vedle výstupu) uchovává pro každou obec
+URL detailní stránky, validátory HTTP (ETag, Last-Modified), SHA-256 hash
+obsahu stránky a přečtená data obce. Při dalším běhu se každá stránka
+ověří podmíněným GET - nezměněná stránka vrátí 304 bez těla a jednou
+odpovědí se tak ušetří i druhý požadavek, který by po HEAD následoval.
+Pokud server validátory neposílá, stránka se stáhne celá, ale znovu se
+zpracuje, jen když se změnil hash obsahu. Doba obnovení tak roste
+s počtem změněných obcí, ne s velikostí územního celku.
+
+Ověření jdou přes Stahovac.stahni_podminene mimo diskovou cache (data
+drží tento stav) a s vlastním řízením tempa, které levné odpovědi 304
+nebrzdí stropem pro stahování celých stránek.
+"""
+import hashlib
+import json
+import os
+
+from .metriky import METRIKY
+from .stahovani import ziskej_stahovac
+
+# Výsledek ověření jedné stránky
+NEZMENENO = 'nezmeneno'          # server odpověděl 304
+STEJNY_OBSAH = 'stejny_obsah'    # stránka stažená, ale se stejným hashem
+ZMENENO = 'zmeneno'              # změněný obsah, stránka se znovu zpracovala
+NOVA = 'nova'                    # obec v minulém běhu nebyla
+
+VERZE_STAVU = 1
+
+class StavObnoveni:
+    """
+    Stav stránek obcí z minulého běhu pro přírůstkové obnovení.
+    """
+
+    def __init__(self, cesta, metriky=METRIKY):
+        """
+        Args:
+            cesta (str): Cesta k souboru stavu (neexistující soubor = první běh)
+            metriky (Metriky): Registr metrik, do kterého se počítají výsledky ověření
+        """
+        self.cesta = cesta
+        self.metriky = metriky
+        self.obce = {}
+        self.zmenene = []
+        if os.path.exists(cesta):
+            with open(cesta, encoding='utf-8') as f:
+                stav = json.load(f)
+            if stav.get('verze') == VERZE_STAVU:
+                self.obce = stav['obce']
+
+    def obnov(self, kod, url, zpracuj):
+        """
+        Ověří stránku obce a podle potřeby ji znovu zpracuje.
+
+        Args:
+            kod (str): Kód obce
+            url (str): URL detailní stránky obce
+            zpracuj (callable): Funkce html -> data obce (slovník serializovatelný do JSON)
+
+        Returns:
+            tuple: (data obce, výsledek ověření - NEZMENENO, STEJNY_OBSAH, ZMENENO nebo NOVA)
+
+        Raises:
+            requests.exceptions.RequestException: Pokud se stránku nepodaří stáhnout
+        """
+        zaznam = self.obce.get(kod)
+        if zaznam is not None and zaznam['url'] != url:
+            zaznam = None
+
+        if zaznam is None:
+            response = ziskej_stahovac().stahni_podminene(url)
+        else:
+            response = ziskej_stahovac().stahni_podminene(url, zaznam['etag'], zaznam['last_modified'])
+
+        if response.status_code == 304 and zaznam is not None:
+            return self._vysledek(zaznam['data'], NEZMENENO)
+
+        hash_obsahu = hashlib.sha256(response.content).hexdigest()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if zaznam is not None and zaznam['hash'] == hash_obsahu:
+            zaznam['etag'], zaznam['last_modified'] = etag, last_modified
+            return self._vysledek(zaznam['data'], STEJNY_OBSAH)
+
+        data = zpracuj(response.text)
+        self.obce[kod] = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'hash': hash_obsahu,
+            'data': data,
+        }
+        self.zmenene.append(kod)
+        return self._vysledek(data, NOVA if zaznam is None else ZMENENO)
+
+    def _vysledek(self, data, vysledek):
+        self.metriky.citac('volby_obnoveni_celkem', "Ověřené stránky obcí podle výsledku",
+                           vysledek=vysledek).pridej()
+        return data, vysledek
+
+    def ponech(self, kody):
+        """
+        Zapomene obce, které už na přehledové stránce nejsou.
+
+        Args:
+            kody (iterable): Kódy obcí aktuálního běhu
+        """
+        kody = set(kody)
+        self.obce = {kod: zaznam for kod, zaznam in self.obce.items() if kod in kody}
+
+    def uloz(self):
+        """
+        Uloží stav pro další běh (přes dočasný soubor, aby se při pádu nepoškodil).
+        """
+        docasny = self.cesta + '.tmp'
+        with open(docasny, 'w', encoding='utf-8') as f:
+            json.dump({'verze': VERZE_STAVU, 'obce': self.obce}, f, ensure_ascii=False)
+        os.replace(docasny, self.cesta)
@@ -0,0 +1,241 @@
+"""
+rejstrik.py: uložený rejstřík obcí jedněch voleb (kód -> název, okres, odkaz, hash stránky)
+
+Seznam obcí se jinak při každém běhu skládá z přehledových stránek okresů.
+Rejstřík se sestaví jednou (python -m volby index nebo průběžně při
+stahování) a další běhy z něj vezmou obce okresu, jednotlivé obce i celou
+republiku bez stahování přehledů. Odkazy jsou uložené relativně k adresáři
+voleb (ps311?...), takže rejstřík platí pro volby.cz i lokální server.
+
+Vyhledávání:
+    podle kódu obce   - slovník, O(1)
+    podle okresu      - slovník okresů se seznamem kódů v pořadí stránky, O(1)
+    podle začátku názvu - bisect v seřazených názvech bez diakritiky, O(log n)
+
+Přehledovou stránku okresu přečte obce_z_prehledu() jedním průchodem
+regulárním výrazem přes buňky s kódem a názvem obce (headers t1sa1 t1sb1
+a t1sa1 t1sb2, tabulek bývá víc), ostatní HTML se neparsuje.
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from html import unescape
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+from .cache import VYCHOZI_ADRESAR
+
+VERZE_REJSTRIKU = 1
+
+# Buňka s odkazem a kódem obce, za ní buňka s názvem (stejná tabulka tN)
+_OBEC = re.compile(
+    r'<td\b[^>]*\bheaders="t(\d+)sa1 t\1sb1"[^>]*>\s*<a\b[^>]*\bhref="([^"]+)"[^>]*>\s*(\d+)\s*</a>\s*</td\s*>\s*'
+    r'<td\b[^>]*\bheaders="t\1sa1 t\1sb2"[^>]*>(.*?)</td\s*>',
+    re.S | re.I,
+)
+_ZNACKA = re.compile(r'<[^>]*>')
+
+def cesta_rejstriku(volby, adresar=VYCHOZI_ADRESAR, url=None):
+    """
+    Vrátí výchozí soubor rejstříku voleb (vedle diskové cache).
+
+    Stránky jiného serveru než volby.cz (lokální server s korpusem) mají
+    vlastní rejstřík, aby se testovací obce nemíchaly se skutečnými.
+
+    Args:
+        volby (str): Klíč voleb
+        adresar (str): Adresář rejstříků
+        url (str): URL stránky, ze které se obce berou (None = volby.cz)
+
+    Returns:
+        str: Cesta, např. ~/.cache/volby/rejstrik_ps2017.json nebo rejstrik_ps2017_127.0.0.1_8000.json
+    """
+    hostitel = urlsplit(url).netloc if url else ''
+    if hostitel in ('', 'volby.cz', 'www.volby.cz'):
+        return os.path.join(adresar, f"rejstrik_{volby}.json")
+    return os.path.join(adresar, f"rejstrik_{volby}_{re.sub(r'[^0-9A-Za-z.-]', '_', hostitel)}.json")
+
+def obce_z_prehledu(html, url):
+    """
+    Přečte obce z přehledové stránky okresu (ps32) jedním průchodem.
+
+    Args:
+        html (str): HTML obsah přehledové stránky
+        url (str): URL přehledové stránky, odkazy na obce jsou vůči ní relativní
+
+    Returns:
+        dict: Slovník {kód: {'nazev', 'url'}} v pořadí na stránce (prázdný, pokud má stránka jiné rozložení)
+    """
+    obce = {}
+    for bunka in _OBEC.finditer(html):
+        nazev = bunka[4]
+        if '<' in nazev:
+            nazev = _ZNACKA.sub('', nazev)
+        nazev = unescape(nazev).strip()
+        if nazev:
+            obce[bunka[3]] = {'nazev': nazev, 'url': urljoin(url, unescape(bunka[2]))}
+    return obce
+
+def normalizuj_nazev(nazev):
+    """
+    Returns:
+        str: Název malými písmeny bez diakritiky (klíč pro hledání podle začátku názvu)
+    """
+    rozlozeny = unicodedata.normalize('NFKD', nazev.casefold())
+    return ''.join(znak for znak in rozlozeny if not unicodedata.combining(znak))
+
+def _relativni(url):
+    # Všechny stránky voleb leží v jednom adresáři (/pls/ps2017nss/ps32?..., .../ps311?...)
+    return url.rsplit('/', 1)[-1]
+
+class RejstrikObci:
+    """
+    Rejstřík obcí a okresů jedněch voleb, volitelně uložený v souboru JSON.
+    """
+
+    def __init__(self, cesta=None, volby=''):
+        """
+        Args:
+            cesta (str): Soubor rejstříku (neexistující = prázdný rejstřík), None = jen v paměti
+            volby (str): Klíč voleb (uloží se do souboru pro kontrolu)
+        """
+        self.cesta = cesta
+        self.volby = volby
+        self.okresy = {}
+        self.obce = {}
+        self.celostatni = False
+        self.zmeneno = False
+        self._podle_url = None
+        self._nazvy = None
+        if cesta is not None and os.path.exists(cesta):
+            with open(cesta, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('verze') == VERZE_REJSTRIKU and data.get('volby') == volby:
+                self.okresy = data['okresy']
+                self.obce = data['obce']
+                self.celostatni = data['celostatni']
+
+    def __len__(self):
+        return len(self.obce)
+
+    def obec(self, kod):
+        """
+        Returns:
+            dict: Záznam obce {'nazev', 'okres', 'url', 'hash'} (url relativní), nebo None
+        """
+        return self.obce.get(kod)
+
+    def obce_okresu(self, okres, zaklad_url):
+        """
+        Vrátí obce okresu, pokud je okres v rejstříku.
+
+        Args:
+            okres (str): Kód okresu (parametr xnumnuts)
+            zaklad_url (str): URL libovolné stránky voleb, vůči níž se odkazy doplní
+
+        Returns:
+            dict: Slovník {kód: {'nazev', 'url'}} v pořadí přehledové stránky, nebo None
+        """
+        zaznam = self.okresy.get(okres)
+        if zaznam is None or 'obce' not in zaznam:
+            return None
+        return {kod: {'nazev': self.obce[kod]['nazev'], 'url': urljoin(zaklad_url, self.obce[kod]['url'])}
+                for kod in zaznam['obce']}
+
+    def vsechny_okresy(self, zaklad_url):
+        """
+        Vrátí okresy celostátní stránky, pokud jsou v rejstříku všechny i s obcemi.
+
+        Args:
+            zaklad_url (str): URL libovolné stránky voleb, vůči níž se odkazy doplní
+
+        Returns:
+            list: Seznam slovníků {'kod', 'kraj', 'nazev', 'url'} jako ze sber.ziskej_okresy(), nebo None
+        """
+        if not self.celostatni or any('obce' not in zaznam for zaznam in self.okresy.values()):
+            return None
+        return [{'kod': kod, 'kraj': zaznam['kraj'], 'nazev': zaznam['nazev'], 'url': urljoin(zaklad_url, zaznam['url'])}
+                for kod, zaznam in self.okresy.items()]
+
+    def hledej(self, zacatek):
+        """
+        Najde obce podle začátku názvu (bez ohledu na velikost písmen a diakritiku).
+
+        Args:
+            zacatek (str): Začátek názvu obce
+
+        Returns:
+            list: Kódy nalezených obcí seřazené podle názvu
+        """
+        if self._nazvy is None:
+            self._nazvy = sorted((normalizuj_nazev(zaznam['nazev']), kod) for kod, zaznam in self.obce.items())
+        klic = normalizuj_nazev(zacatek)
+        kody = []
+        for nazev, kod in self._nazvy[bisect.bisect_left(self._nazvy, (klic,)):]:
+            if not nazev.startswith(klic):
+                break
+            kody.append(kod)
+        return kody
+
+    def nastav_okresy(self, okresy):
+        """
+        Uloží seznam okresů z celostátní stránky (obce se doplní pridej_okres()).
+
+        Args:
+            okresy (list): Okresy ze sber.ziskej_okresy()
+        """
+        for okres in okresy:
+            zaznam = self.okresy.setdefault(okres['kod'], {})
+            zaznam.update(nazev=okres['nazev'], kraj=okres['kraj'], url=_relativni(okres['url']))
+        self.celostatni = True
+        self.zmeneno = True
+
+    def pridej_okres(self, okres, url, obce):
+        """
+        Uloží obce přehledové stránky okresu (hash dříve viděných stránek obcí zůstane).
+
+        Args:
+            okres (str): Kód okresu (parametr xnumnuts)
+            url (str): URL přehledové stránky okresu
+            obce (dict): Obce okresu {kód: {'nazev', 'url'}} v pořadí stránky
+        """
+        kraj = parse_qs(urlsplit(url).query).get('xkraj', [''])[0]
+        zaznam = self.okresy.setdefault(okres, {'nazev': '', 'kraj': kraj, 'url': _relativni(url)})
+        zaznam['obce'] = list(obce)
+        for kod, obec in obce.items():
+            puvodni = self.obce.get(kod, {})
+            self.obce[kod] = {'nazev': obec['nazev'], 'okres': okres, 'url': _relativni(obec['url']),
+                              'hash': puvodni.get('hash')}
+        self._podle_url = self._nazvy = None
+        self.zmeneno = True
+
+    def zaznamenej_obsah(self, url, obsah):
+        """
+        Zapamatuje si hash naposledy stažené stránky obce.
+
+        Args:
+            url (str): URL detailní stránky obce
+            obsah (bytes): Obsah stránky
+        """
+        if self._podle_url is None:
+            self._podle_url = {zaznam['url']: kod for kod, zaznam in self.obce.items()}
+        kod = self._podle_url.get(_relativni(url))
+        if kod is not None:
+            self.obce[kod]['hash'] = hashlib.sha256(obsah).hexdigest()
+            self.zmeneno = True
+
+    def uloz(self):
+        """
+        Uloží rejstřík, pokud se změnil (přes dočasný soubor, aby se při pádu nepoškodil).
+        """
+        if self.cesta is None or not self.zmeneno:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cesta)), exist_ok=True)
+        docasny = self.cesta + '.tmp'
+        with open(docasny, 'w', encoding='utf-8') as f:
+            json.dump({'verze': VERZE_REJSTRIKU, 'volby': self.volby, 'celostatni': self.celostatni,
+                       'okresy': self.okresy, 'obce': self.obce}, f, ensure_ascii=False)
+        os.replace(docasny, self.cesta)
+        self.zmeneno = False
@@ -0,0 +1,233 @@
+"""
+rizeni.py: adaptivní řízení rychlosti požadavků na jednotlivé servery (AIMD)
+
+Místo pevné pauzy po každé obci se rychlost požadavků na server řídí
+podle jeho odpovědí, podobně jako okno TCP:
+
+    pomalý start     - dokud server nedá najevo přetížení, rychlost roste
+                       o `prirustek` s každou úspěšnou odpovědí (zhruba
+                       zdvojnásobení za sekundu)
+    aditivní růst    - potom roste o `prirustek` za sekundu provozu
+    násobné snížení  - při odpovědi 429/503, výpadku spojení nebo když
+                       průměrná latence vzroste nad `prah_latence` násobek
+                       nejnižší naměřené latence, se rychlost vynásobí
+                       `nasobitel` (nejvýše jednou za dobu jedné odpovědi)
+
+Rychlost je tempo doplňování token bucketu serveru: každý požadavek
+spotřebuje jeden žeton a žetonů se naspoří nejvýše `davka`, takže po
+klidné chvíli smí najednou odejít až `davka` požadavků (souběžné
+stahování, davka = --concurrency), dlouhodobě ale ne víc než
+`rychlost` za sekundu. S davka=1 jsou požadavky rovnoměrně rozestoupené.
+
+Počet souběžných požadavků na server (okno) plyne z Littleova zákona:
+rychlost × latence + 1, omezený stropem `max_soubeznost`. Hlavička
+Retry-After pozastaví celý server, ne jen vlákno, které ji dostalo.
+Každé rozhodnutí se započítá do metrik (volby_rizeni_rozhodnuti_celkem)
+a rychlost po něm do histogramu volby_rizeni_rychlost.
+"""
+import contextlib
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .metriky import METRIKY
+
+# Hranice košů histogramu rychlosti (požadavky za sekundu)
+HRANICE_RYCHLOST = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200)
+
+VYCHOZI_MAX_RYCHLOST = 10.0
+
+# Podmíněné ověření s odpovědí 304 (bez těla) stojí server řádově méně než stažení
+# stránky, proto má vlastní řízení s vyšším stropem i počáteční rychlostí
+VYCHOZI_MAX_RYCHLOST_OVERENI = 50.0
+POCATECNI_RYCHLOST_OVERENI = 10.0
+
+# Latence pod touto hranicí nad základní latencí se za přetížení nepovažuje (šum na rychlé síti)
+MIN_NARUST_LATENCE = 0.05
+
+class _StavHostitele:
+    """
+    Řídicí stav jednoho serveru.
+    """
+    __slots__ = ('rychlost', 'okno', 'bezi', 'zetony', 'doplneno', 'dalsi_start', 'zakladni_latence', 'latence',
+                 'posledni_snizeni', 'pomaly_start', 'snizeni')
+
+    def __init__(self, rychlost, davka, okno):
+        self.rychlost = rychlost
+        self.okno = okno
+        self.bezi = 0
+        self.zetony = float(davka)
+        self.doplneno = time.monotonic()
+        self.dalsi_start = 0.0
+        self.zakladni_latence = None
+        self.latence = None
+        self.posledni_snizeni = float('-inf')
+        self.pomaly_start = True
+        self.snizeni = 0
+
+class RizeniRychlosti:
+    """
+    AIMD řízení rychlosti a souběžnosti požadavků pro každý server zvlášť.
+
+    Instanci lze bezpečně sdílet mezi vlákny (používá ji volby.stahovani.Stahovac).
+    """
+
+    def __init__(self, max_rychlost=VYCHOZI_MAX_RYCHLOST, max_soubeznost=4, pocatecni_rychlost=2.0,
+                 min_rychlost=0.2, prirustek=1.0, nasobitel=0.5, prah_latence=2.0, davka=1, metriky=METRIKY):
+        """
+        Args:
+            max_rychlost (float): Strop rychlosti v požadavcích za sekundu na jeden server
+            max_soubeznost (int): Strop souběžných požadavků na jeden server
+            pocatecni_rychlost (float): Rychlost prvních požadavků (2 = dřívější pauza 0.5 s)
+            min_rychlost (float): Nejnižší rychlost, pod kterou se neklesá
+            prirustek (float): Aditivní přírůstek rychlosti (požadavky/s za sekundu)
+            nasobitel (float): Násobek rychlosti při přetížení (0-1)
+            prah_latence (float): Kolikrát vyšší latence než nejnižší znamená přetížení
+            davka (int): Kapacita token bucketu - kolik požadavků smí odejít najednou
+                         (a kolik jich první okno pustí souběžně), 1 = rovnoměrné rozestupy
+            metriky (Metriky): Registr metrik pro zaznamenání rozhodnutí
+        """
+        if max_rychlost <= 0 or max_soubeznost < 1 or davka < 1 or not 0 < nasobitel < 1:
+            raise ValueError("Strop rychlosti, souběžnosti i dávka musí být kladné a násobitel mezi 0 a 1")
+        self.max_rychlost = max_rychlost
+        self.max_soubeznost = max_soubeznost
+        self.pocatecni_rychlost = min(pocatecni_rychlost, max_rychlost)
+        self.min_rychlost = min(min_rychlost, self.pocatecni_rychlost)
+        self.prirustek = prirustek
+        self.nasobitel = nasobitel
+        self.prah_latence = prah_latence
+        self.davka = davka
+        self.metriky = metriky
+        self.cekani = metriky.histogram('volby_rizeni_cekani_sekundy', "Čekání požadavku na povolení řízení rychlosti")
+        self.podminka = threading.Condition()
+        self.hostitele = {}
+
+    def _stav(self, hostitel):
+        stav = self.hostitele.get(hostitel)
+        if stav is None:
+            stav = self.hostitele[hostitel] = _StavHostitele(
+                self.pocatecni_rychlost, self.davka, min(self.davka, self.max_soubeznost)
+            )
+        return stav
+
+    @contextlib.contextmanager
+    def pozadavek(self, url):
+        """
+        Počká, až řízení povolí požadavek na server URL, a po dobu bloku ho počítá jako běžící.
+
+        Args:
+            url (str): URL adresa požadavku
+        """
+        hostitel = urlsplit(url).netloc
+        start = time.monotonic()
+        with self.podminka:
+            stav = self._stav(hostitel)
+            while True:
+                ted = time.monotonic()
+                stav.zetony = min(self.davka, stav.zetony + (ted - stav.doplneno) * stav.rychlost)
+                stav.doplneno = ted
+                if stav.bezi < stav.okno and ted >= stav.dalsi_start and stav.zetony >= 1:
+                    break
+                # Plné okno uvolní až dokončený požadavek, jinak čekáme na žeton (a konec Retry-After)
+                if stav.bezi >= stav.okno:
+                    self.podminka.wait()
+                else:
+                    self.podminka.wait(max(stav.dalsi_start - ted, (1 - stav.zetony) / stav.rychlost))
+            stav.bezi += 1
+            stav.zetony -= 1
+        self.cekani.zaznamenej(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            with self.podminka:
+                stav.bezi -= 1
+                self.podminka.notify_all()
+
+    def zaznamenej(self, url, doba, stav_kod=None, retry_after=None):
+        """
+        Upraví rychlost serveru podle výsledku požadavku.
+
+        Args:
+            url (str): URL adresa požadavku
+            doba (float): Doba odpovědi v sekundách
+            stav_kod (int): HTTP stavový kód, None = výpadek spojení nebo timeout
+            retry_after (str): Hodnota hlavičky Retry-After, pokud ji server poslal
+
+        Returns:
+            str: Rozhodnutí ('pomaly_start', 'zvyseni', 'snizeni_chyba', 'snizeni_latence', 'bez_zmeny')
+        """
+        hostitel = urlsplit(url).netloc
+        with self.podminka:
+            stav = self._stav(hostitel)
+            ted = time.monotonic()
+            if stav_kod is not None:
+                # Nejnižší latence se pomalu posouvá nahoru, aby se přizpůsobila změně sítě
+                if stav.zakladni_latence is None or doba < stav.zakladni_latence:
+                    stav.zakladni_latence = doba
+                else:
+                    stav.zakladni_latence += (doba - stav.zakladni_latence) * 0.01
+                stav.latence = doba if stav.latence is None else 0.8 * stav.latence + 0.2 * doba
+
+            if stav_kod is None or stav_kod in (429, 503):
+                rozhodnuti = 'snizeni_chyba'
+                if retry_after and retry_after.isdigit():
+                    stav.dalsi_start = max(stav.dalsi_start, ted + float(retry_after))
+                    stav.zetony, stav.doplneno = 0.0, ted
+            elif stav.latence > self.prah_latence * stav.zakladni_latence + MIN_NARUST_LATENCE:
+                rozhodnuti = 'snizeni_latence'
+            else:
+                rozhodnuti = 'pomaly_start' if stav.pomaly_start else 'zvyseni'
+
+            if rozhodnuti.startswith('snizeni'):
+                # Na jedno přetížení reagujeme jednou - další signály z téže doby odpovědi přeskočíme
+                if ted - stav.posledni_snizeni < max(stav.latence or 0.0, 0.1):
+                    rozhodnuti = 'bez_zmeny'
+                else:
+                    stav.rychlost = max(self.min_rychlost, stav.rychlost * self.nasobitel)
+                    stav.posledni_snizeni = ted
+                    stav.pomaly_start = False
+                    stav.snizeni += 1
+            elif stav.pomaly_start:
+                stav.rychlost = min(self.max_rychlost, stav.rychlost + self.prirustek)
+            else:
+                # Přírůstek na odpověď / rychlost = přírůstek za sekundu provozu
+                stav.rychlost = min(self.max_rychlost, stav.rychlost + self.prirustek / stav.rychlost)
+
+            okno = math.ceil(stav.rychlost * (stav.latence or 0.0)) + 1
+            stav.okno = max(1, min(self.max_soubeznost, okno))
+            rychlost = stav.rychlost
+            self.podminka.notify_all()
+
+        self.metriky.citac('volby_rizeni_rozhodnuti_celkem', "Rozhodnutí řízení rychlosti",
+                           hostitel=hostitel, rozhodnuti=rozhodnuti).pridej()
+        self.metriky.histogram('volby_rizeni_rychlost', "Rychlost serveru po rozhodnutí (požadavky/s)",
+                               hranice=HRANICE_RYCHLOST, hostitel=hostitel).zaznamenej(rychlost)
+        return rozhodnuti
+
+    def stav(self):
+        """
+        Returns:
+            dict: {server: {'rychlost', 'okno', 'latence_ms', 'snizeni'}} - aktuální stav řízení
+        """
+        with self.podminka:
+            return {
+                hostitel: {
+                    'rychlost': round(stav.rychlost, 2),
+                    'okno': stav.okno,
+                    'latence_ms': round((stav.latence or 0.0) * 1000, 1),
+                    'snizeni': stav.snizeni,
+                }
+                for hostitel, stav in self.hostitele.items()
+            }
+
+    def vypis_stav(self, popis="Řízení rychlosti"):
+        """
+        Vypíše aktuální rychlost, okno a latenci každého serveru.
+
+        Args:
+            popis (str): Začátek řádku výpisu (odliší více instancí řízení)
+        """
+        for hostitel, stav in self.stav().items():
+            print(f"{popis} {hostitel}: {stav['rychlost']:.1f} pož./s (strop {self.max_rychlost:g}), "
+                  f"okno {stav['okno']}, latence {stav['latence_ms']:.0f} ms, snížení {stav['snizeni']}x")
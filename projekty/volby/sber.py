@@ -0,0 +1,988 @@
+"""
+sber.py: stahování výsledků obcí z volby.cz do CSV, sloupcových formátů a SQLite
+
+Jádro příkazu `python -m volby crawl` a skriptu projekty/scraper/scraper.py:
+načtení seznamu obcí z přehledových stránek, stažení a zpracování stránek
+obcí (sekvenčně, souběžně nebo v pipeline s procesy, viz soubezne.py)
+a průběžný zápis do zvoleného výstupu.
+
+Těžké knihovny (requests, bs4, asyncio) se načítají až ve funkcích, které
+je potřebují, takže --help a chybné argumenty skončí bez jejich importu.
+"""
+import sys
+import os
+import csv
+import time
+import re
+import argparse
+from urllib.parse import urljoin, urlsplit, parse_qs
+
+from .stahovani import Stahovac, nastav_stahovac, ziskej_stahovac, stahni
+from .rizeni import POCATECNI_RYCHLOST_OVERENI, VYCHOZI_MAX_RYCHLOST_OVERENI, RizeniRychlosti
+from .cache import DiskovaCache, VYCHOZI_ADRESAR
+from .parsery import BACKENDY, VYCHOZI_BACKEND, nacti_tabulky
+from .zapis import CsvZapisovac, DlouhyZapisovac
+from .sloupcove import FORMATY, PRIPONY, SloupcovyZapisovac
+from .databaze import PRIPONA_SQLITE, SqliteZapisovac
+from .zurnal import Zurnal, nacti_zurnal
+from .model import VysledekObce
+from .extrakce import LOKATORY, extrahuj_data_obce
+from .definice import VOLBY, VYCHOZI_VOLBY, najdi_volby, povolene_url, prepis_url
+from .metriky import METRIKY, NASTROJE_PROFILOVANI, profilovani
+from .rejstrik import RejstrikObci, cesta_rejstriku, obce_z_prehledu
+
+# Povolené začátky URL - adresáře podporovaných voleb na volby.cz (i www varianta)
+# a lokální zástupný server pro testování bez přístupu k síti (viz lokalni_server.py)
+POVOLENE_URL = povolene_url()
+
+# Výstupní formáty - CSV, sloupcové (volby.sloupcove) a databáze SQLite (volby.databaze)
+VYSTUPNI_FORMATY = FORMATY + ('sqlite',)
+PRIPONY_VYSTUPU = {**PRIPONY, 'sqlite': PRIPONA_SQLITE}
+
+POPIS = "Stáhne výsledky voleb do Poslanecké sněmovny (2013, 2017, 2021) z webu volby.cz do CSV souboru."
+
+def pridej_argumenty(parser):
+    """
+    Přidá argumenty stahování do parseru (scraper.py i podpříkaz crawl).
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser programu nebo podpříkazu
+    """
+    parser.add_argument("url", help="URL adresa přehledové stránky územního celku, detailní stránky obce "
+                                    "nebo celostátní stránky s výběrem územní úrovně (ps3)")
+    parser.add_argument("vystupni_soubor", help="název výstupního CSV souboru")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="počet souběžně stahovaných stránek obcí (výchozí 1 = sekvenční režim)")
+    parser.add_argument("--rate", type=float, default=10.0, metavar="R",
+                        help="strop počtu požadavků za sekundu na jeden server; skutečné tempo se pod ním přizpůsobuje "
+                             "latenci a odpovědím 429/503 (výchozí 10)")
+    parser.add_argument("--per-host", type=int, default=None, metavar="N",
+                        help="maximální počet souběžných požadavků na jeden server (výchozí = --concurrency)")
+    parser.add_argument("--split", action="store_true",
+                        help="u celostátní stránky zapsat každý okres do vlastního souboru <vystup>_<kód okresu>.<přípona>")
+    parser.add_argument("--format", choices=VYSTUPNI_FORMATY, default="csv",
+                        help="formát výstupu: csv (výchozí), sloupcový parquet/feather/npz s celočíselnými sloupci, "
+                             "nebo sqlite s normalizovanými tabulkami (dotazy viz dotaz.py)")
+    parser.add_argument("--processes", type=int, default=0, metavar="N",
+                        help="zpracovávat HTML v N procesech odděleně od stahování (výchozí 0 = vypnuto)")
+    parser.add_argument("--queue-size", type=int, default=64, metavar="N",
+                        help="maximální počet stažených a dosud nezpracovaných stránek (výchozí 64)")
+    parser.add_argument("--pool-size", type=int, default=10, metavar="N",
+                        help="maximální počet udržovaných spojení se serverem (výchozí 10)")
+    parser.add_argument("--timeout", type=float, default=10.0, metavar="S",
+                        help="timeout jednoho požadavku v sekundách (výchozí 10)")
+    parser.add_argument("--retries", type=int, default=3, metavar="N",
+                        help="počet opakování požadavku při chybě 5xx/429 nebo výpadku spojení (výchozí 3)")
+    parser.add_argument("--parser", choices=list(BACKENDY), default=VYCHOZI_BACKEND,
+                        help=f"backend pro čtení HTML stránek obcí (výchozí {VYCHOZI_BACKEND})")
+    parser.add_argument("--resume", action="store_true",
+                        help="navázat na přerušený běh - obce zapsané v žurnálu se znovu nestahují")
+    parser.add_argument("--journal", metavar="SOUBOR",
+                        help="soubor žurnálu hotových obcí (výchozí <vystupni_soubor>.journal.jsonl, "
+                             "ten se po úspěšném uložení výstupu smaže)")
+    parser.add_argument("--from-journal", action="store_true",
+                        help="jen vytvořit CSV z existujícího žurnálu, bez stahování")
+    parser.add_argument("--cache-dir", default=VYCHOZI_ADRESAR, metavar="ADRESAR",
+                        help=f"adresář diskové cache stažených stránek (výchozí {VYCHOZI_ADRESAR})")
+    parser.add_argument("--cache-size", type=int, default=200, metavar="MB",
+                        help="maximální velikost cache v MB, nejdéle nepoužité stránky se mažou (výchozí 200)")
+    parser.add_argument("--no-cache", action="store_true", help="nepoužívat diskovou cache")
+    parser.add_argument("--offline", action="store_true",
+                        help="brát stránky jen z cache, bez přístupu na server")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="nevypisovat řádek pro každou obec (jen souhrn na konci)")
+    parser.add_argument("--metrics", metavar="SOUBOR",
+                        help="uložit metriky běhu (.json jako JSON, jinak formát Prometheus)")
+    parser.add_argument("--profile", choices=NASTROJE_PROFILOVANI,
+                        help="profilovat běh nástrojem cProfile nebo pyinstrument")
+    parser.add_argument("--profile-output", metavar="SOUBOR",
+                        help="soubor s profilem (výchozí profil.prof / profil.html)")
+    parser.add_argument("--obce", metavar="SEZNAM",
+                        help="stáhnout jen vybrané obce - kódy nebo začátky názvů oddělené čárkou "
+                             "(např. 506761,Bedihošť); seznam obcí se vezme z rejstříku, pokud v něm je")
+    parser.add_argument("--index", metavar="SOUBOR",
+                        help="soubor rejstříku obcí (výchozí <cache-dir>/rejstrik_<volby>.json, viz python -m volby index)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="nepoužívat uložený rejstřík obcí, vždy stáhnout přehledové stránky")
+    parser.add_argument("--elections", metavar="VOLBY",
+                        help=f"stáhnout stejné území pro více voleb najednou (např. {','.join(VOLBY)}) "
+                             "do jednoho CSV v dlouhém formátu (volby, obec, strana)")
+
+def over_argumenty(args):
+    """
+    Zkontroluje správnost argumentů stahování, při chybě ukončí program.
+    
+    Args:
+        args (argparse.Namespace): Argumenty z parseru s pridej_argumenty()
+        
+    Returns:
+        argparse.Namespace: argumenty programu (url, vystupni_soubor a volby stahování a cache)
+    """
+    # Kontrola, zda URL začíná správně - nyní akceptuje i www variantu
+    if not args.url.startswith(POVOLENE_URL):
+        print("ERROR: URL adresa musí být z webu volby.cz!")
+        sys.exit(1)
+        
+    # Kontrola, zda výstupní soubor má příponu odpovídající formátu (výchozí .csv)
+    if not args.vystupni_soubor.endswith(PRIPONY_VYSTUPU[args.format]):
+        print(f"ERROR: Výstupní soubor musí mít příponu {PRIPONY_VYSTUPU[args.format]}!")
+        sys.exit(1)
+
+    if args.concurrency < 1 or args.rate <= 0 or args.processes < 0 or args.queue_size < 1:
+        print("ERROR: Počet souběžných požadavků, jejich rychlost i velikost fronty musí být kladné!")
+        sys.exit(1)
+
+    if args.per_host is not None and args.per_host < 1:
+        print("ERROR: Počet souběžných požadavků na jeden server musí být kladný!")
+        sys.exit(1)
+
+    if args.offline and args.no_cache:
+        print("ERROR: Offline režim vyžaduje diskovou cache!")
+        sys.exit(1)
+
+    # Výchozí žurnál slouží jen k navázání přerušeného běhu, zadaný --journal se ponechá
+    args.ponechat_zurnal = args.journal is not None
+    if args.journal is None:
+        args.journal = args.vystupni_soubor + '.journal.jsonl'
+
+    if args.obce is not None:
+        args.obce = [polozka.strip() for polozka in args.obce.split(',') if polozka.strip()]
+        if not args.obce:
+            print("ERROR: Seznam obcí (--obce) je prázdný!")
+            sys.exit(1)
+
+    if args.elections is not None:
+        args.elections = [klic.strip() for klic in args.elections.split(',') if klic.strip()]
+        nezname = [klic for klic in args.elections if klic not in VOLBY]
+        if not args.elections or nezname:
+            print(f"ERROR: Neznámé volby {', '.join(nezname)}, dostupné: {', '.join(VOLBY)}!")
+            sys.exit(1)
+        if args.format != 'csv' or args.split:
+            print("ERROR: Více voleb najednou se zapisuje jen do jednoho CSV (bez --format a --split)!")
+            sys.exit(1)
+        if najdi_volby(args.url) is None:
+            print("ERROR: URL musí obsahovat adresář voleb (např. /pls/ps2017nss/)!")
+            sys.exit(1)
+        if args.index:
+            print("ERROR: Více voleb najednou používá výchozí rejstříky jednotlivých voleb (bez --index)!")
+            sys.exit(1)
+        
+    return args
+
+def zkontroluj_argumenty(argv=None):
+    """
+    Zkontroluje správnost vstupních argumentů programu.
+    
+    Args:
+        argv (list): Argumenty příkazové řádky, None = sys.argv
+    
+    Returns:
+        argparse.Namespace: argumenty programu (url, vystupni_soubor a volby stahování a cache)
+    """
+    parser = argparse.ArgumentParser(description=POPIS)
+    pridej_argumenty(parser)
+    return over_argumenty(parser.parse_args(argv))
+
+# Tichý režim (--quiet) - bez výpisu pro každou obec, výpisy samy stojí čas
+TICHY_REZIM = False
+
+# Rejstřík obcí běhu (volby.rejstrik) - zaznamenává se do něj hash stažených stránek obcí
+REJSTRIK = None
+
+# Metriky zpracování a zápisu (stahování měří volby.stahovani)
+DOBA_ZPRACOVANI = METRIKY.histogram('volby_zpracovani_sekundy', "Doba zpracování HTML stránky obce")
+DOBA_ZAPISU = METRIKY.histogram('volby_zapis_sekundy', "Doba zápisu řádku obce do výstupu")
+
+def vypis_prubeh(zprava):
+    """
+    Vypíše průběžnou zprávu o jedné obci, v tichém režimu nic nevypíše.
+    
+    Args:
+        zprava (str): Text zprávy
+    """
+    if not TICHY_REZIM:
+        print(zprava)
+
+def zapocitej_obec(vysledek):
+    """
+    Zvýší počítadlo obcí podle výsledku zpracování.
+    
+    Args:
+        vysledek (str): 'ok', 'chyba' nebo 'zurnal' (převzato z žurnálu)
+    """
+    METRIKY.citac('volby_obce_celkem', "Obce podle výsledku zpracování", vysledek=vysledek).pridej()
+
+def je_detailni_stranka(url):
+    """
+    Zjistí, zda je zadaná URL adresa detailní stránkou obce.
+    
+    Args:
+        url (str): URL adresa stránky
+        
+    Returns:
+        bool: True pokud jde o detailní stránku obce, False pokud jde o přehledovou stránku
+    """
+    return '&xobec=' in url
+
+def je_celostatni_stranka(url):
+    """
+    Zjistí, zda je zadaná URL adresa celostátní stránkou s výběrem územní úrovně (ps3).
+    
+    Args:
+        url (str): URL adresa stránky
+        
+    Returns:
+        bool: True pokud jde o celostátní stránku se seznamem krajů a okresů
+    """
+    return urlsplit(url).path.rsplit('/', 1)[-1] == 'ps3'
+
+def ziskej_okresy(url):
+    """
+    Získá seznam okresů (přehledových stránek obcí) z celostátní stránky.
+    
+    Args:
+        url (str): URL adresa celostátní stránky (ps3)
+        
+    Returns:
+        list: Seznam slovníků {'kod', 'kraj', 'nazev', 'url'} v pořadí na stránce
+    """
+    import requests
+    from bs4 import BeautifulSoup
+    
+    try:
+        print(f"Stahuji seznam okresů z: {url}")
+        response = stahni(url)
+    except requests.exceptions.RequestException as e:
+        print(f"ERROR: Nepodařilo se stáhnout celostátní stránku: {e}")
+        sys.exit(1)
+    
+    soup = BeautifulSoup(response.text, 'html.parser')
+    
+    # Okres poznáme podle odkazu na výběr obce (ps32), název je ve druhém sloupci
+    okresy = []
+    videne = set()
+    for row in soup.find_all('tr'):
+        cells = row.find_all('td')
+        odkaz = next((a for a in row.find_all('a', href=True) if a['href'].startswith('ps32?')), None)
+        if len(cells) < 2 or odkaz is None:
+            continue
+        odkaz_url = urljoin(url, odkaz['href'])
+        if odkaz_url in videne:
+            continue
+        videne.add(odkaz_url)
+        parametry = parse_qs(urlsplit(odkaz_url).query)
+        okresy.append({
+            'kod': parametry.get('xnumnuts', [''])[0],
+            'kraj': parametry.get('xkraj', [''])[0],
+            'nazev': cells[1].text.strip(),
+            'url': odkaz_url
+        })
+    
+    if not okresy:
+        print("ERROR: Nepodařilo se najít žádné okresy na zadané URL adrese!")
+        sys.exit(1)
+    
+    return okresy
+
+def ziskej_obce_vsech_okresu(okresy, soubeznost, rejstrik=None):
+    """
+    Stáhne přehledové stránky všech okresů a sloučí jejich obce.
+    
+    Okresy, které už jsou v rejstříku, se nestahují; stažené se do něj doplní.
+    
+    Args:
+        okresy (list): Seznam okresů z ziskej_okresy()
+        soubeznost (int): Maximální počet současně stahovaných stránek
+        rejstrik (RejstrikObci): Rejstřík obcí voleb, None = jen pro tento běh
+        
+    Returns:
+        dict: Slovník obcí jako z ziskej_odkazy_obci(), každá obec má navíc klíč 'okres'
+              (kód okresu); obce jsou seřazené po okresech
+    """
+    rejstrik = rejstrik if rejstrik is not None else RejstrikObci()
+    chybejici = [okres for okres in okresy if rejstrik.obce_okresu(okres['kod'], okres['url']) is None]
+    if chybejici:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=soubeznost) as executor:
+            obce_okresu = list(executor.map(lambda okres: ziskej_odkazy_obci(okres['url']), chybejici))
+        for okres, obce_okresu in zip(chybejici, obce_okresu):
+            rejstrik.pridej_okres(okres['kod'], okres['url'], obce_okresu)
+    
+    obce = {}
+    for okres in okresy:
+        for kod_obce, obec_info in rejstrik.obce_okresu(okres['kod'], okres['url']).items():
+            obce[kod_obce] = {**obec_info, 'okres': okres['kod']}
+    return obce
+
+def ziskej_kod_a_nazev_obce_z_url(url):
+    """
+    Získá kód a název obce z detailní URL adresy.
+    
+    Args:
+        url (str): URL adresa detailní stránky obce
+        
+    Returns:
+        tuple: (kod_obce, nazev_obce, url)
+    """
+    from bs4 import BeautifulSoup
+    
+    try:
+        # Získáme kód obce z URL
+        kod_obce_match = re.search(r'xobec=(\d+)', url)
+        if kod_obce_match:
+            kod_obce = kod_obce_match.group(1)
+        else:
+            kod_obce = "NEZNAMY"
+        
+        # Stáhneme stránku a získáme název obce z titulku
+        response = stahni(url)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, 'html.parser')
+        
+        # Zkusíme najít název obce v nadpisu
+        h3_tag = soup.find('h3')
+        if h3_tag:
+            nazev_obce = h3_tag.text.strip().split(':')[-1].strip()
+        else:
+            # Zkusíme alternativní způsob
+            title_tag = soup.find('title')
+            if title_tag:
+                nazev_obce = title_tag.text.strip().split('-')[-1].strip()
+            else:
+                nazev_obce = "Neznámá obec"
+        
+        return kod_obce, nazev_obce, url
+        
+    except Exception as e:
+        print(f"ERROR: Nepodařilo se získat informace o obci z URL: {e}")
+        sys.exit(1)
+
+def ziskej_odkazy_obci(url):
+    """
+    Získá odkazy na jednotlivé obce z přehledové stránky.
+    
+    Args:
+        url (str): URL adresa přehledové stránky volebních výsledků
+        
+    Returns:
+        dict: slovník s kódy obcí jako klíči a názvy obcí a odkazy jako hodnotami
+    """
+    # Pokud jde o detailní stránku obce, vrátíme informace pro tuto obec
+    if je_detailni_stranka(url):
+        kod_obce, nazev_obce, odkaz_url = ziskej_kod_a_nazev_obce_z_url(url)
+        obce = {
+            kod_obce: {
+                'nazev': nazev_obce,
+                'url': odkaz_url
+            }
+        }
+        return obce
+    
+    # Jinak pokračujeme standardně s přehledovou stránkou
+    import requests
+    
+    try:
+        print(f"Stahuji data z: {url}")
+        response = stahni(url)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"ERROR: Nepodařilo se stáhnout přehledovou stránku: {e}")
+        sys.exit(1)
+    
+    # Buňky kódu a názvu obce jedním průchodem (volby.rejstrik), při jiném rozložení stránky
+    # se projdou všechny řádky všech tabulek
+    obce = obce_z_prehledu(response.text, url)
+    if obce:
+        return obce
+    
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(response.text, 'html.parser')
+    
+    # Hledáme všechny tabulky
+    tables = soup.find_all('table')
+    
+    # Procházíme všechny řádky ve všech tabulkách a hledáme odkazy na obce
+    obce = {}
+    
+    for table in tables:
+        rows = table.find_all('tr')
+        for row in rows:
+            cells = row.find_all('td')
+            if len(cells) >= 3:
+                # Pokud obsahuje odkaz na obec
+                odkaz = cells[0].find('a')
+                if odkaz and cells[1].text.strip():
+                    kod_obce = cells[0].text.strip()
+                    nazev_obce = cells[1].text.strip()
+                    
+                    # Sestavíme kompletní URL (relativně k přehledové stránce)
+                    odkaz_href = odkaz.get('href')
+                    odkaz_url = urljoin(url, odkaz_href)
+                    
+                    obce[kod_obce] = {
+                        'nazev': nazev_obce,
+                        'url': odkaz_url
+                    }
+    
+    if not obce:
+        print("ERROR: Nepodařilo se najít žádné obce na zadané URL adrese!")
+        sys.exit(1)
+    
+    return obce
+
+def stahni_stranku_obce(obec_info):
+    """
+    Stáhne HTML detailní stránky obce.
+    
+    Args:
+        obec_info (dict): Informace o obci (název a URL)
+        
+    Returns:
+        str: HTML obsah stránky, nebo None pokud se stažení nepodařilo
+    """
+    import requests
+    
+    url = obec_info['url']
+    vypis_prubeh(f"Stahuji data pro obec {obec_info['nazev']} z: {url}")
+    
+    try:
+        response = stahni(url)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"ERROR: Nepodařilo se stáhnout data pro obec {obec_info['nazev']}: {e}")
+        zapocitej_obec('chyba')
+        return None
+    
+    if REJSTRIK is not None:
+        REJSTRIK.zaznamenej_obsah(url, response.content)
+    return response.text
+
+def ziskej_data_obce(kod_obce, obec_info, parser=VYCHOZI_BACKEND, lokatory=LOKATORY):
+    """
+    Získá volební data pro konkrétní obec.
+    
+    Args:
+        kod_obce (str): Kód obce
+        obec_info (dict): Informace o obci (název a URL)
+        parser (str): Backend pro čtení HTML
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+        
+    Returns:
+        VysledekObce: Volební data pro danou obec
+    """
+    html = stahni_stranku_obce(obec_info)
+    if html is None:
+        return None
+    
+    return zpracuj_stranku_obce(kod_obce, obec_info, html, parser, lokatory)
+
+def zpracuj_stranku_obce(kod_obce, obec_info, html, parser=VYCHOZI_BACKEND, lokatory=LOKATORY):
+    """
+    Zpracuje stažené HTML detailní stránky obce.
+    
+    Args:
+        kod_obce (str): Kód obce
+        obec_info (dict): Informace o obci (název a URL)
+        html (str): HTML obsah detailní stránky obce
+        parser (str): Backend pro čtení HTML ('stream', 'lxml' nebo 'bs4')
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+        
+    Returns:
+        VysledekObce: Volební data pro danou obec
+    """
+    with DOBA_ZPRACOVANI.mereni():
+        vysledek = VysledekObce.ze_slovniku(data_ze_stranky(kod_obce, obec_info['nazev'], html, parser, lokatory))
+    zapocitej_obec('ok')
+    
+    # Debug: vypíšeme základní výsledky
+    if not TICHY_REZIM:
+        print(f"Registrovaní voliči: {vysledek.registrovani}")
+        print(f"Vydané obálky: {vysledek.vydane_obalky}")
+        print(f"Platné hlasy: {vysledek.platne_hlasy}")
+        print(f"Počet stran: {len(vysledek.strany())}")
+    
+    return vysledek
+
+def data_ze_stranky(kod_obce, nazev_obce, html, parser=VYCHOZI_BACKEND, lokatory=LOKATORY):
+    """
+    Přečte volební data z HTML detailní stránky obce.
+    
+    Stránka se projde jednou podle atributů headers buněk (volby.extrakce).
+    Pokud je rozložení stránky jiné a buňky se nenajdou, použije se
+    původní hledání v tabulkách (vysledek_z_tabulek).
+    
+    Args:
+        kod_obce (str): Kód obce
+        nazev_obce (str): Název obce
+        html (str): HTML obsah detailní stránky obce
+        parser (str): Backend pro čtení HTML
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+        
+    Returns:
+        dict: Slovník s volebními daty pro danou obec
+    """
+    data = extrahuj_data_obce(html, kod_obce, nazev_obce, parser, lokatory)
+    if data is None:
+        data = vysledek_z_tabulek(kod_obce, nazev_obce, nacti_tabulky(html, parser))
+    return data
+
+def vysledek_z_tabulek(kod_obce, nazev_obce, tabulky):
+    """
+    Najde volební data obce v tabulkách detailní stránky.
+    
+    Args:
+        kod_obce (str): Kód obce
+        nazev_obce (str): Název obce
+        tabulky (list): Tabulky stránky z volby.parsery.nacti_tabulky()
+        
+    Returns:
+        dict: Slovník s volebními daty pro danou obec
+    """
+    # Získáme základní údaje o volbách v obci
+    zakladni_udaje = {}
+    
+    # Najdeme tabulku s volebními údaji - hledáme podle textu "Voliči v seznamu"
+    for tabulka in tabulky:
+        if "Voliči v seznamu" in tabulka.text:
+            for radek in tabulka.radky:
+                cells = radek.td
+                
+                if len(cells) >= 3 and any("Voliči v seznamu" in h for h in radek.th):
+                    zakladni_udaje['registrovani'] = cells[0].strip().replace('\xa0', '')
+                    zakladni_udaje['vydane_obalky'] = cells[1].strip().replace('\xa0', '')
+                    zakladni_udaje['platne_hlasy'] = cells[2].strip().replace('\xa0', '')
+                    break
+    
+    # Najdeme údaje o stranách
+    strany = {}
+    for tabulka in tabulky:
+        # Hledáme tabulky s výsledky stran - ty mají charakteristický formát
+        for radek in tabulka.radky:
+            cells = radek.td
+            # Hledáme řádky, kde první buňka obsahuje číslo (číslo strany)
+            if len(cells) >= 3:
+                cislo_strany = cells[0].strip()
+                if cislo_strany and cislo_strany.isdigit():
+                    nazev_strany = cells[1].strip()
+                    hlasy = cells[2].strip().replace('\xa0', '')
+                    
+                    if nazev_strany and hlasy:
+                        strany[nazev_strany] = hlasy
+    
+    # Sestavíme kompletní výsledek
+    return {
+        'kod': kod_obce,
+        'nazev': nazev_obce,
+        'registrovani': zakladni_udaje.get('registrovani', ''),
+        'vydane_obalky': zakladni_udaje.get('vydane_obalky', ''),
+        'platne_hlasy': zakladni_udaje.get('platne_hlasy', ''),
+        'strany': strany
+    }
+
+
+class Prubeh:
+    """
+    Počítadlo zpracovaných obcí s odhadem zbývajícího času (ETA).
+    """
+
+    def __init__(self, celkem):
+        self.celkem = celkem
+        self.hotovo = 0
+        self.start = time.monotonic()
+
+    def dalsi(self):
+        """
+        Započítá další obec.
+        
+        Returns:
+            str: Text průběhu ve tvaru "12/97, ETA 0:42"
+        """
+        self.hotovo += 1
+        uplynulo = time.monotonic() - self.start
+        zbyva = int(uplynulo / self.hotovo * (self.celkem - self.hotovo))
+        return f"{self.hotovo}/{self.celkem}, ETA {zbyva // 60}:{zbyva % 60:02d}"
+
+
+# Hlavička CSV v češtině (za ní následují sloupce jednotlivých stran)
+HLAVICKA_CSV = ['Kód obce', 'Název obce', 'Voliči v seznamu', 'Vydané obálky', 'Platné hlasy']
+
+def vytvor_zapisovac(vystupni_soubor, format='csv', volby=VYCHOZI_VOLBY, okresy=None):
+    """
+    Vytvoří průběžný zapisovač výstupního souboru.
+    
+    Args:
+        vystupni_soubor (str): Název výstupního souboru.
+        format (str): 'csv' (optimalizované pro Excel), 'parquet', 'feather', 'npz' nebo 'sqlite'
+        volby (str): Klíč voleb (ukládá se jen do sqlite)
+        okresy (dict): Slovník {kód obce: kód okresu} (ukládá se jen do sqlite)
+        
+    Returns:
+        CsvZapisovac | SloupcovyZapisovac | SqliteZapisovac: Zapisovač, do kterého se řádky obcí
+        přidávají funkcí zapis_obec()
+    """
+    if format == 'sqlite':
+        return SqliteZapisovac(vystupni_soubor, volby, okresy)
+    if format != 'csv':
+        return SloupcovyZapisovac(vystupni_soubor, HLAVICKA_CSV, format)
+    return CsvZapisovac(vystupni_soubor, HLAVICKA_CSV, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+
+def zapis_obec(zapisovac, obec):
+    """
+    Zapíše data jedné obce do CSV souboru.
+    
+    Args:
+        zapisovac (CsvZapisovac): Zapisovač z vytvor_zapisovac()
+        obec (VysledekObce): Volební data obce
+    """
+    # Počty jsou v záznamu už jako čísla, chybějící strany zapisovač doplní nulou
+    zapisovac.zapis_vysledek(obec)
+
+def dokonci_csv(zapisovac):
+    """
+    Dokončí zápis CSV souboru.
+    
+    Args:
+        zapisovac (CsvZapisovac): Zapisovač z vytvor_zapisovac()
+        
+    Returns:
+        bool: True pokud se data uložila
+    """
+    try:
+        if not zapisovac.dokonci():
+            print("ERROR: Žádná data k uložení!")
+            return False
+        print(f"Data byla úspěšně uložena do souboru: {zapisovac.vystupni_soubor}")
+        return True
+    except Exception as e:
+        print(f"ERROR: Nepodařilo se uložit data do souboru {zapisovac.vystupni_soubor}: {e}")
+        return False
+
+def uloz_do_csv(obce_data, vystupni_soubor, format='csv', volby=VYCHOZI_VOLBY):
+    """
+    Uloží získaná data do CSV souboru optimalizovaného pro Excel a odpovídající požadovanému formátu.
+
+    Args:
+        obce_data (iterable): Seznam (nebo generátor) záznamů VysledekObce.
+        vystupni_soubor (str): Název výstupního CSV souboru.
+        format (str): Formát výstupu (viz vytvor_zapisovac)
+        volby (str): Klíč voleb (viz vytvor_zapisovac)
+    """
+    zapisovac = vytvor_zapisovac(vystupni_soubor, format, volby)
+    try:
+        for obec in obce_data:
+            zapis_obec(zapisovac, obec)
+    except Exception as e:
+        print(f"ERROR: Nepodařilo se uložit data do souboru {vystupni_soubor}: {e}")
+        return False
+    return dokonci_csv(zapisovac)
+
+
+def nacti_obce(url, soubeznost, rejstrik=None):
+    """
+    Získá odkazy na obce - u celostátní stránky ze všech okresů.
+    
+    Co už je v rejstříku obcí, se nestahuje: obce okresu, název obce u detailní
+    stránky i seznam okresů celostátní stránky. Stažené přehledy se do rejstříku doplní.
+    
+    Args:
+        url (str): URL přehledové, detailní nebo celostátní stránky
+        soubeznost (int): Počet souběžně stahovaných přehledů okresů
+        rejstrik (RejstrikObci): Rejstřík obcí voleb, None = jen pro tento běh
+        
+    Returns:
+        tuple: (seznam okresů, slovník obcí {kód: info}); okresy jsou prázdné, pokud nejde o celostátní stránku
+    """
+    rejstrik = rejstrik if rejstrik is not None else RejstrikObci()
+    parametry = parse_qs(urlsplit(url).query)
+    okresy = []
+    if je_celostatni_stranka(url):
+        okresy = rejstrik.vsechny_okresy(url)
+        if okresy is None:
+            okresy = ziskej_okresy(url)
+            rejstrik.nastav_okresy(okresy)
+        else:
+            print("Okresy a jejich obce z rejstříku obcí (bez stahování přehledů).")
+        print(f"Nalezeno {len(okresy)} okresů.")
+        obce = ziskej_obce_vsech_okresu(okresy, soubeznost, rejstrik)
+    elif je_detailni_stranka(url):
+        kod_obce = parametry.get('xobec', [''])[0]
+        zaznam = rejstrik.obec(kod_obce)
+        if zaznam is None:
+            obce = ziskej_odkazy_obci(url)
+        else:
+            obce = {kod_obce: {'nazev': zaznam['nazev'], 'url': url}}
+    else:
+        okres = parametry.get('xnumnuts', [None])[0]
+        obce = rejstrik.obce_okresu(okres, url)
+        if obce is None:
+            obce = ziskej_odkazy_obci(url)
+            if okres:
+                rejstrik.pridej_okres(okres, url, obce)
+        else:
+            print(f"Obce okresu {okres} z rejstříku obcí (bez stahování přehledu).")
+    
+    print(f"Nalezeno {len(obce)} obcí.")
+    return okresy, obce
+
+def vyber_obce(obce, vyber, rejstrik):
+    """
+    Ponechá jen vybrané obce (--obce).
+    
+    Args:
+        obce (dict): Slovník obcí {kód: info} z nacti_obce()
+        vyber (list): Kódy obcí nebo začátky jejich názvů
+        rejstrik (RejstrikObci): Rejstřík obcí pro hledání podle názvu
+        
+    Returns:
+        dict: Vybrané obce v původním pořadí
+    """
+    kody = set()
+    for polozka in vyber:
+        if polozka.isdigit():
+            kody.add(polozka)
+        else:
+            kody.update(rejstrik.hledej(polozka))
+    vybrane = {kod_obce: obec_info for kod_obce, obec_info in obce.items() if kod_obce in kody}
+    print(f"Vybráno {len(vybrane)} obcí.")
+    return vybrane
+
+def otevri_rejstrik(args, volby):
+    """
+    Načte rejstřík obcí voleb podle argumentů a nastaví ho jako rejstřík běhu.
+    
+    Args:
+        args (argparse.Namespace): Argumenty z zkontroluj_argumenty()
+        volby (str): Klíč voleb
+        
+    Returns:
+        RejstrikObci: Rejstřík ze souboru (--index nebo výchozí vedle cache), při --no-index jen v paměti
+    """
+    global REJSTRIK
+    cesta = None if args.no_index else (args.index or cesta_rejstriku(volby, args.cache_dir, args.url))
+    REJSTRIK = RejstrikObci(cesta, volby)
+    return REJSTRIK
+
+def stahni_obce(args, obce, hotove, pri_vysledku, lokatory=LOKATORY):
+    """
+    Stáhne a zpracuje obce v režimu podle argumentů (pipeline, souběžně, nebo sekvenčně).
+    
+    Args:
+        args (argparse.Namespace): Argumenty z zkontroluj_argumenty()
+        obce (dict): Slovník obcí {kód: info}
+        hotove (dict): Již hotové obce {kód: VysledekObce}, které se nestahují
+        pri_vysledku (callable): Volá se s výsledkem každé obce v pořadí obcí
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+    """
+    if args.processes > 0:
+        # Pipeline - stahování ve vláknech, zpracování HTML v procesech
+        import asyncio
+        from .soubezne import ziskej_data_obci_pipeline
+        asyncio.run(ziskej_data_obci_pipeline(
+            obce, args.concurrency, args.processes, args.queue_size, pri_vysledku, args.parser, hotove, lokatory
+        ))
+    elif args.concurrency > 1:
+        # Souběžný režim - tempo (token bucket) i souběžnost na server řídí RizeniRychlosti stahovače
+        import asyncio
+        from .soubezne import ziskej_data_obci_soubezne
+        asyncio.run(ziskej_data_obci_soubezne(
+            obce, args.concurrency, pri_vysledku, args.parser, hotove, lokatory
+        ))
+    else:
+        # Získáme data pro každou obec
+        prubeh = Prubeh(sum(1 for kod_obce in obce if kod_obce not in hotove))
+        
+        for kod_obce, obec_info in obce.items():
+            if kod_obce in hotove:
+                pri_vysledku(hotove[kod_obce])
+                continue
+            vypis_prubeh(f"Zpracovávám obec {prubeh.dalsi()}: {obec_info['nazev']} ({kod_obce})")
+            
+            obec_data = ziskej_data_obce(kod_obce, obec_info, args.parser, lokatory)
+            if obec_data:
+                pri_vysledku(obec_data)
+            # Tempo požadavků hlídá řízení rychlosti stahovače (volby.rizeni), v offline režimu se nečeká
+
+def zurnal_voleb(zurnal, klic):
+    """
+    Returns:
+        str: Cesta k žurnálu jedněch voleb v dávce (např. vystup.csv.journal.ps2013.jsonl)
+    """
+    zaklad, pripona = os.path.splitext(zurnal)
+    return f"{zaklad}.{klic}{pripona}"
+
+def spust_davku(args):
+    """
+    Stáhne stejné území pro více voleb za sebou do jednoho CSV v dlouhém formátu.
+    
+    Všechny volby sdílejí jeden Stahovac (pool spojení i diskovou cache),
+    každé volby mají vlastní žurnál, takže --resume naváže u každých zvlášť.
+    
+    Args:
+        args (argparse.Namespace): Argumenty z zkontroluj_argumenty() s vyplněným args.elections
+    """
+    zapisovac = DlouhyZapisovac(args.vystupni_soubor, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    zurnaly = []
+    
+    for klic in args.elections:
+        definice = VOLBY[klic]
+        cesta_zurnalu = zurnal_voleb(args.journal, klic)
+        print(f"Volby {definice.nazev} ({klic})")
+        
+        if args.from_journal:
+            if not os.path.exists(cesta_zurnalu):
+                print(f"ERROR: Žurnál {cesta_zurnalu} neexistuje!")
+                continue
+            for obec in nacti_zurnal(cesta_zurnalu, VysledekObce.ze_slovniku).values():
+                zapisovac.zapis_vysledek(klic, obec)
+            continue
+        
+        rejstrik = otevri_rejstrik(args, klic)
+        _, obce = nacti_obce(prepis_url(args.url, definice), args.concurrency, rejstrik)
+        if args.obce:
+            obce = vyber_obce(obce, args.obce, rejstrik)
+        zurnal = Zurnal(cesta_zurnalu, navazat=args.resume, prevod=VysledekObce.ze_slovniku)
+        zurnaly.append(zurnal)
+        hotove = dict(zurnal.hotove)
+        if hotove:
+            print(f"Navazuji na přerušený běh: {len(hotove)} obcí už je hotových.")
+        poradi_obci = {kod_obce: poradi for poradi, kod_obce in enumerate(obce)}
+        
+        def pri_vysledku(obec_data):
+            with DOBA_ZAPISU.mereni():
+                zapisovac.zapis_vysledek(klic, obec_data)
+            if obec_data.kod in hotove:
+                zapocitej_obec('zurnal')
+            else:
+                zurnal.zapis(poradi_obci[obec_data.kod], obec_data)
+        
+        try:
+            stahni_obce(args, obce, hotove, pri_vysledku, definice.lokatory)
+        finally:
+            zurnal.zavri()
+            rejstrik.uloz()
+    
+    if dokonci_csv(zapisovac) and not args.ponechat_zurnal:
+        for zurnal in zurnaly:
+            zurnal.odstran()
+
+def spust(args):
+    """
+    Stáhne a uloží výsledky podle argumentů programu.
+    
+    Args:
+        args (argparse.Namespace): Argumenty z zkontroluj_argumenty()
+    """
+    cache = None
+    if not args.no_cache:
+        cache = DiskovaCache(args.cache_dir, max_velikost=args.cache_size * 1024 * 1024, jen_offline=args.offline)
+    nastav_stahovac(Stahovac(
+        velikost_poolu=max(args.pool_size, args.concurrency),
+        timeout=args.timeout,
+        max_opakovani=args.retries,
+        cache=cache,
+        # Token bucket s dávkou --concurrency a doplňováním adaptivní rychlostí (nejvýše --rate)
+        rizeni=RizeniRychlosti(max_rychlost=args.rate, max_soubeznost=args.per_host or args.concurrency,
+                               davka=args.concurrency),
+        rizeni_overeni=RizeniRychlosti(VYCHOZI_MAX_RYCHLOST_OVERENI, pocatecni_rychlost=POCATECNI_RYCHLOST_OVERENI,
+                                       max_soubeznost=args.per_host or args.concurrency),
+    ))
+    
+    if args.elections:
+        spust_davku(args)
+        return
+    
+    # Lokátory buněk podle voleb v URL (lokální server bez adresáře voleb = výchozí volby)
+    definice = najdi_volby(args.url) or VOLBY[VYCHOZI_VOLBY]
+    
+    if args.from_journal:
+        # Export z žurnálu - bez stahování, obce v pořadí z přehledové stránky
+        if not os.path.exists(args.journal):
+            print(f"ERROR: Žurnál {args.journal} neexistuje!")
+            sys.exit(1)
+        uloz_do_csv(nacti_zurnal(args.journal, VysledekObce.ze_slovniku).values(), args.vystupni_soubor, args.format,
+                    definice.klic)
+        return
+    
+    rejstrik = otevri_rejstrik(args, definice.klic)
+    okresy, obce = nacti_obce(args.url, args.concurrency, rejstrik)
+    if args.obce:
+        obce = vyber_obce(obce, args.obce, rejstrik)
+    # Okres obce (pro sqlite) - u celostátní stránky z přehledu okresů, jinak z parametru xnumnuts v URL
+    okres_url = parse_qs(urlsplit(args.url).query).get('xnumnuts', [None])[0]
+    okresy_obci = {kod_obce: obec_info.get('okres', okres_url) for kod_obce, obec_info in obce.items()}
+    
+    # Hotové obce se zapisují do žurnálu, při --resume se z něj načtou a přeskočí
+    zurnal = Zurnal(args.journal, navazat=args.resume, prevod=VysledekObce.ze_slovniku)
+    hotove = dict(zurnal.hotove)
+    if hotove:
+        print(f"Navazuji na přerušený běh: {len(hotove)} obcí už je hotových.")
+    poradi_obci = {kod_obce: poradi for poradi, kod_obce in enumerate(obce)}
+    
+    # Řádky se do CSV zapisují průběžně, jak jsou obce zpracované
+    # (při --split do souboru příslušného okresu, okresy přicházejí postupně)
+    rozdelit = args.split and bool(okresy)
+    zapisovac = None if rozdelit else vytvor_zapisovac(args.vystupni_soubor, args.format, definice.klic, okresy_obci)
+    okres_zapisovace = None
+    pocet_okresu = 0
+    ulozeno = True
+    
+    def pri_vysledku(obec_data):
+        nonlocal zapisovac, okres_zapisovace, pocet_okresu, ulozeno
+        if rozdelit:
+            okres = obce[obec_data.kod]['okres']
+            if okres != okres_zapisovace:
+                if zapisovac is not None:
+                    ulozeno = dokonci_csv(zapisovac) and ulozeno
+                pocet_okresu += 1
+                print(f"Okres {pocet_okresu}/{len(okresy)}: {okres}")
+                zaklad, pripona = os.path.splitext(args.vystupni_soubor)
+                zapisovac = vytvor_zapisovac(f"{zaklad}_{okres}{pripona}", args.format, definice.klic, okresy_obci)
+                okres_zapisovace = okres
+        with DOBA_ZAPISU.mereni():
+            zapis_obec(zapisovac, obec_data)
+        if obec_data.kod in hotove:
+            zapocitej_obec('zurnal')
+        else:
+            zurnal.zapis(poradi_obci[obec_data.kod], obec_data)
+    
+    stahni_obce(args, obce, hotove, pri_vysledku, definice.lokatory)
+    
+    zurnal.zavri()
+    rejstrik.uloz()
+    
+    # Dokončíme CSV soubor (u --split soubor posledního okresu)
+    if zapisovac is not None:
+        ulozeno = dokonci_csv(zapisovac) and ulozeno
+    
+    # Po úspěšném uložení výstupu už výchozí žurnál není k ničemu
+    if zapisovac is not None and ulozeno and not args.ponechat_zurnal:
+        zurnal.odstran()
+
+def proved(args):
+    """
+    Stáhne výsledky podle zkontrolovaných argumentů a vypíše statistiky a metriky běhu.
+    
+    Args:
+        args (argparse.Namespace): Argumenty z zkontroluj_argumenty() nebo over_argumenty()
+    """
+    global TICHY_REZIM
+    TICHY_REZIM = args.quiet
+    
+    with profilovani(args.profile, args.profile_output):
+        spust(args)
+    
+    ziskej_stahovac().vypis_statistiky()
+    METRIKY.vypis_souhrn()
+    if args.metrics:
+        METRIKY.uloz(args.metrics)
+        print(f"Metriky uloženy do souboru: {args.metrics}")
+
+def main(argv=None):
+    """
+    Hlavní funkce programu.
+    
+    Args:
+        argv (list): Argumenty příkazové řádky, None = sys.argv
+    """
+    proved(zkontroluj_argumenty(argv))
\ No newline at end of file
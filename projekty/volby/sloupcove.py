@@ -0,0 +1,190 @@
+"""
+sloupcove.py: sloupcové výstupní formáty (Parquet, Feather, NumPy .npz)
+
+Na rozdíl od CSV se počty ukládají jako celá čísla, takže je při načtení
+není potřeba znovu převádět z textu. Názvy obcí jsou slovníkově kódované
+(seznam unikátních názvů + index u každé obce). Hlasy stran tvoří matici
+obce × strany - v .npz jako 2D pole, v Parquet/Feather jako jeden
+celočíselný sloupec pro každou stranu.
+
+Parquet a Feather vyžadují knihovnu pyarrow, .npz knihovnu numpy.
+Chybějící hodnota počtu je v .npz uložena jako -1, v Arrow jako null.
+"""
+import os
+from array import array
+
+from .model import na_cislo
+
+FORMATY = ('csv', 'parquet', 'feather', 'npz')
+PRIPONY = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather', 'npz': '.npz'}
+
+# Chybějící počet v poli array('q') (v Arrow se z něj stane null)
+CHYBI_POCET = -1
+
+class SloupcovyZapisovac:
+    """
+    Zapisovač výsledků obcí do sloupcového formátu.
+
+    Má stejné rozhraní jako volby.zapis.CsvZapisovac (zapis, zapis_vysledek, dokonci),
+    takže ho scrapery mohou použít místo CSV. Hodnoty se průběžně ukládají
+    do kompaktních polí array('q') a soubor se zapíše při dokončení.
+    """
+
+    def __init__(self, vystupni_soubor, zakladni_hlavicka, format):
+        """
+        Args:
+            vystupni_soubor (str): Název výstupního souboru
+            zakladni_hlavicka (list): Názvy sloupců před sloupci stran
+                                      (kód, název a tři počty - jako u CSV)
+            format (str): 'parquet', 'feather' nebo 'npz'
+        """
+        if format not in ('parquet', 'feather', 'npz'):
+            raise ValueError(f"Neznámý sloupcový formát '{format}'")
+        self.vystupni_soubor = vystupni_soubor
+        self.zakladni_hlavicka = list(zakladni_hlavicka)
+        self.format = format
+
+        self.kody = []
+        self.nazvy = {}
+        self.index_nazvu = array('i')
+        self.pocty = [array('q') for _ in self.zakladni_hlavicka[2:]]
+        self.strany = {}
+        self.hlasy = []
+
+    def zapis(self, zakladni_hodnoty, hlasy):
+        """
+        Přidá řádek jedné obce.
+
+        Args:
+            zakladni_hodnoty (list): Kód, název a počty (jako text nebo čísla)
+            hlasy (dict): Slovník {název strany: počet hlasů}
+        """
+        kod, nazev = zakladni_hodnoty[0], zakladni_hodnoty[1]
+        self.kody.append(str(kod))
+        self.index_nazvu.append(self.nazvy.setdefault(nazev, len(self.nazvy)))
+        for sloupec, hodnota in zip(self.pocty, zakladni_hodnoty[2:]):
+            sloupec.append(na_cislo(hodnota, CHYBI_POCET))
+
+        radek = array('q', bytes(8 * len(self.strany)))
+        for strana, pocet in hlasy.items():
+            index = self.strany.setdefault(strana, len(self.strany))
+            if index >= len(radek):
+                radek.extend([0] * (index + 1 - len(radek)))
+            radek[index] = na_cislo(pocet, 0)
+        self.hlasy.append(radek)
+
+    def zapis_vysledek(self, vysledek):
+        """
+        Přidá řádek obce ze záznamu volby.model.VysledekObce.
+
+        Args:
+            vysledek (VysledekObce): Výsledky obce
+        """
+        self.zapis(vysledek.zakladni_hodnoty(), dict(vysledek.strany()))
+
+    def dokonci(self):
+        """
+        Zapíše soubor ve zvoleném formátu.
+
+        Returns:
+            int: Počet zapsaných obcí (0 znamená, že se nic nezapsalo)
+        """
+        if not self.kody:
+            return 0
+        if self.format == 'npz':
+            self._zapis_npz()
+        else:
+            self._zapis_arrow()
+        return len(self.kody)
+
+    def _serazene_strany(self):
+        # Strany seřazené podle názvu (jako sloupce v CSV) a jejich původní indexy
+        strany = sorted(self.strany)
+        return strany, [self.strany[strana] for strana in strany]
+
+    def _matice_hlasu(self, np):
+        strany, indexy = self._serazene_strany()
+        matice = np.zeros((len(self.hlasy), len(self.strany)), dtype=np.int64)
+        for i, radek in enumerate(self.hlasy):
+            matice[i, :len(radek)] = radek
+        return strany, matice[:, indexy]
+
+    def _zapis_npz(self):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Formát npz vyžaduje knihovnu numpy (pip install numpy)") from None
+
+        strany, matice = self._matice_hlasu(np)
+        kody = np.array(self.kody)
+        if all(kod.isdigit() for kod in self.kody):
+            kody = kody.astype(np.int64)
+        pocty = {
+            nazev: np.frombuffer(sloupec, dtype=np.int64)
+            for nazev, sloupec in zip(('registrovani', 'vydane_obalky', 'platne_hlasy'), self.pocty)
+        }
+        docasny = self.vystupni_soubor + '.tmp.npz'
+        np.savez(
+            docasny,
+            kod=kody,
+            nazev_index=np.frombuffer(self.index_nazvu, dtype=np.int32),
+            nazvy=np.array(list(self.nazvy)),
+            strany=np.array(strany),
+            hlasy=matice,
+            **pocty,
+        )
+        os.replace(docasny, self.vystupni_soubor)
+
+    def _zapis_arrow(self):
+        try:
+            import numpy as np
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(f"Formát {self.format} vyžaduje knihovny pyarrow a numpy (pip install pyarrow)") from None
+
+        strany, matice = self._matice_hlasu(np)
+        sloupce = {
+            self.zakladni_hlavicka[0]: pa.array(self.kody, type=pa.string()),
+            self.zakladni_hlavicka[1]: pa.DictionaryArray.from_arrays(
+                pa.array(np.frombuffer(self.index_nazvu, dtype=np.int32)),
+                pa.array(list(self.nazvy), type=pa.string()),
+            ),
+        }
+        for nazev, sloupec in zip(self.zakladni_hlavicka[2:], self.pocty):
+            hodnoty = np.frombuffer(sloupec, dtype=np.int64)
+            sloupce[nazev] = pa.array(hodnoty, mask=hodnoty < 0)
+        for i, strana in enumerate(strany):
+            sloupce[strana] = pa.array(matice[:, i])
+        tabulka = pa.table(sloupce)
+
+        docasny = self.vystupni_soubor + '.tmp'
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(tabulka, docasny)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(tabulka, docasny)
+        os.replace(docasny, self.vystupni_soubor)
+
+
+def nacti_vysledky(cesta):
+    """
+    Načte výsledky uložené ve sloupcovém formátu podle přípony souboru.
+
+    Args:
+        cesta (str): Cesta k souboru .npz, .parquet nebo .feather
+
+    Returns:
+        dict | pyarrow.Table: U .npz slovník polí numpy, jinak tabulka pyarrow
+    """
+    if cesta.endswith('.npz'):
+        import numpy as np
+        with np.load(cesta) as data:
+            return {klic: data[klic] for klic in data.files}
+    if cesta.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(cesta)
+    if cesta.endswith('.feather'):
+        import pyarrow.feather as feather
+        return feather.read_table(cesta)
+    raise ValueError(f"Neznámá přípona souboru: {cesta}")
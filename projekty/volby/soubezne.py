@@ -0,0 +1,221 @@
+"""
+soubezne.py: souběžné stahování obcí (asyncio) a pipeline se zpracováním v procesech
+
+Používá se jen při --concurrency > 1 nebo --processes, takže se asyncio
+a concurrent.futures načítají až tehdy (viz volby.sber.stahni_obce).
+Stahování i zpracování jedné obce je stejné jako v sekvenčním režimu.
+Tempo a souběžnost požadavků na každý server řídí jen RizeniRychlosti
+sdíleného stahovače (viz rizeni.py) - token bucket s dávkou --concurrency,
+který se doplňuje adaptivní rychlostí do stropu --rate. Tento modul
+omezuje pouze celkový počet rozpracovaných stránek.
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .extrakce import LOKATORY
+from .model import VysledekObce
+from .parsery import VYCHOZI_BACKEND
+from .sber import (DOBA_ZPRACOVANI, Prubeh, data_ze_stranky, stahni_stranku_obce, vypis_prubeh, zapocitej_obec,
+                   zpracuj_stranku_obce)
+
+class PoradaVysledku:
+    """
+    Předává výsledky obcí dál ve stejném pořadí, v jakém byly obce zadány.
+    
+    Výsledky dokončené mimo pořadí čekají, než dorazí všechny předchozí.
+    Aby se za jednou zaseknutou stránkou (timeouty a opakování) nehromadily
+    bez omezení, obec se smí začít stahovat, až když je nejvýše `okno`
+    pozic za první nepředanou obcí (pockej_na_misto). Stažených obcí
+    čekajících na předání je tak nejvýše `okno`.
+    """
+
+    def __init__(self, pri_vysledku, okno=None):
+        """
+        Args:
+            pri_vysledku (callable): Funkce volaná s daty každé obce v pořadí vstupu
+            okno (int): Nejvyšší vzdálenost rozpracované obce od první nepředané, None = bez omezení
+        """
+        self.pri_vysledku = pri_vysledku
+        self.okno = okno
+        self.cekajici = {}
+        self.dalsi = 0
+        self.posun = asyncio.Event()
+
+    async def pockej_na_misto(self, poradi):
+        """
+        Počká, až se obec s daným pořadím vejde do okna za první nepředanou obcí.
+        
+        Args:
+            poradi (int): Pořadí obce ve vstupu (od 0)
+        """
+        while self.okno is not None and poradi - self.dalsi >= self.okno:
+            await self.posun.wait()
+
+    def pridej(self, poradi, vysledek):
+        """
+        Přidá výsledek obce s daným pořadím a předá dál vše, co už je na řadě.
+        
+        Args:
+            poradi (int): Pořadí obce ve vstupu (od 0)
+            vysledek (dict): Data obce, nebo None, pokud se obec nepodařilo zpracovat
+        """
+        self.cekajici[poradi] = vysledek
+        dalsi = self.dalsi
+        while self.dalsi in self.cekajici:
+            vysledek = self.cekajici.pop(self.dalsi)
+            self.dalsi += 1
+            if vysledek:
+                self.pri_vysledku(vysledek)
+        if self.dalsi != dalsi:
+            # Probudí obce čekající na místo v okně, další posun čeká na novou událost
+            self.posun.set()
+            self.posun = asyncio.Event()
+
+
+async def ziskej_data_obci_soubezne(obce, soubeznost, pri_vysledku, parser=VYCHOZI_BACKEND, hotove=None,
+                                    lokatory=LOKATORY):
+    """
+    Získá volební data pro všechny obce se souběžným stahováním stránek.
+    
+    Stahování běží ve vláknech (nejvýše `soubeznost` najednou), tempo na
+    jednotlivé servery řídí RizeniRychlosti stahovače. Zpracování HTML je
+    stejné jako v sekvenčním režimu a výsledky se předávají v pořadí obcí.
+    Stahovat se smí jen obce nejvýše 2 × `soubeznost` pozic za první
+    nepředanou, aby zaseknutá stránka nenechala hromadit hotové výsledky.
+    
+    Args:
+        obce (dict): Slovník obcí z ziskej_odkazy_obci()
+        soubeznost (int): Maximální počet současně stahovaných stránek (celkem)
+        pri_vysledku (callable): Funkce volaná s daty každé obce ve stejném pořadí jako vstup
+        parser (str): Backend pro čtení HTML
+        hotove (dict): Již hotové obce {kód: data}, které se nestahují
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+    """
+    loop = asyncio.get_running_loop()
+    porada = PoradaVysledku(pri_vysledku, okno=2 * soubeznost)
+    hotove = hotove or {}
+    semafor = asyncio.Semaphore(soubeznost)
+    prubeh = Prubeh(sum(1 for kod_obce in obce if kod_obce not in hotove))
+
+    async def zpracuj(poradi, kod_obce, obec_info, executor):
+        if kod_obce in hotove:
+            porada.pridej(poradi, hotove[kod_obce])
+            return
+        await porada.pockej_na_misto(poradi)
+        async with semafor:
+            html = await loop.run_in_executor(executor, stahni_stranku_obce, obec_info)
+        vypis_prubeh(f"Zpracovávám obec {prubeh.dalsi()}: {obec_info['nazev']} ({kod_obce})")
+        if html is None:
+            porada.pridej(poradi, None)
+        else:
+            porada.pridej(poradi, zpracuj_stranku_obce(kod_obce, obec_info, html, parser, lokatory))
+
+    with ThreadPoolExecutor(max_workers=soubeznost) as executor:
+        await asyncio.gather(
+            *(zpracuj(poradi, kod_obce, obec_info, executor)
+              for poradi, (kod_obce, obec_info) in enumerate(obce.items()))
+        )
+
+
+def _zpracuj_v_procesu(kod_obce, nazev_obce, html, parser, lokatory):
+    """
+    Zpracuje HTML stránky obce v pracovním procesu (bez ladicích výpisů).
+    
+    Vrací slovník, záznam VysledekObce se vytvoří až v hlavním procesu -
+    indexy stran ve sdílené tabulce stran platí jen v rámci jednoho procesu.
+    Stejně tak metriky - dobu zpracování zaznamená až hlavní proces.
+    
+    Returns:
+        tuple: (slovník s volebními daty pro danou obec, doba zpracování v sekundách)
+    """
+    start = time.perf_counter()
+    vysledek = data_ze_stranky(kod_obce, nazev_obce, html, parser, lokatory)
+    return vysledek, time.perf_counter() - start
+
+
+async def ziskej_data_obci_pipeline(obce, soubeznost, procesy, velikost_fronty, pri_vysledku,
+                                    parser=VYCHOZI_BACKEND, hotove=None, lokatory=LOKATORY):
+    """
+    Získá volební data pro všechny obce v dvoustupňové pipeline.
+    
+    Stahování běží souběžně ve vláknech (jako ziskej_data_obci_soubezne)
+    a stažené HTML předává přes omezenou frontu do ProcessPoolExecutoru,
+    kde se stránky zpracují na všech jádrech. Když je fronta plná,
+    stahování čeká (backpressure). Na konci se vypíše propustnost
+    jednotlivých fází a zaplnění fronty. Okno pořadí (viz PoradaVysledku)
+    pokrývá stahované, čekající i zpracovávané stránky.
+    
+    Args:
+        obce (dict): Slovník obcí z ziskej_odkazy_obci()
+        soubeznost (int): Maximální počet současně stahovaných stránek (celkem)
+        procesy (int): Počet procesů pro zpracování HTML
+        velikost_fronty (int): Maximální počet stažených, dosud nezpracovaných stránek
+        pri_vysledku (callable): Funkce volaná s daty každé obce ve stejném pořadí jako vstup
+        parser (str): Backend pro čtení HTML
+        hotove (dict): Již hotové obce {kód: data}, které se nestahují
+        lokatory (dict): Lokátory buněk podle voleb (DefiniceVoleb.lokatory)
+    """
+    loop = asyncio.get_running_loop()
+    porada = PoradaVysledku(pri_vysledku, okno=2 * soubeznost + velikost_fronty + procesy)
+    hotove = hotove or {}
+    semafor = asyncio.Semaphore(soubeznost)
+    prubeh = Prubeh(sum(1 for kod_obce in obce if kod_obce not in hotove))
+    fronta = asyncio.Queue(maxsize=velikost_fronty)
+    statistiky = {'stazeno': 0, 'zpracovano': 0, 'cas_stahovani': 0.0, 'cas_zpracovani': 0.0,
+                  'max_fronta': 0, 'soucet_fronty': 0}
+    start = time.perf_counter()
+
+    async def stahuj(poradi, kod_obce, obec_info, executor):
+        if kod_obce in hotove:
+            porada.pridej(poradi, hotove[kod_obce])
+            return
+        await porada.pockej_na_misto(poradi)
+        async with semafor:
+            html = await loop.run_in_executor(executor, stahni_stranku_obce, obec_info)
+        statistiky['stazeno'] += 1
+        statistiky['cas_stahovani'] = time.perf_counter() - start
+        if html is None:
+            porada.pridej(poradi, None)
+        else:
+            # Při plné frontě zde stahování čeká, dokud zpracování neuvolní místo
+            await fronta.put((poradi, kod_obce, obec_info, html))
+            hloubka = fronta.qsize()
+            statistiky['max_fronta'] = max(statistiky['max_fronta'], hloubka)
+            statistiky['soucet_fronty'] += hloubka
+
+    async def zpracovavej(pool):
+        while True:
+            polozka = await fronta.get()
+            if polozka is None:
+                return
+            poradi, kod_obce, obec_info, html = polozka
+            data, doba = await loop.run_in_executor(
+                pool, _zpracuj_v_procesu, kod_obce, obec_info['nazev'], html, parser, lokatory
+            )
+            DOBA_ZPRACOVANI.zaznamenej(doba)
+            zapocitej_obec('ok')
+            porada.pridej(poradi, VysledekObce.ze_slovniku(data))
+            statistiky['zpracovano'] += 1
+            statistiky['cas_zpracovani'] = time.perf_counter() - start
+            vypis_prubeh(f"Zpracovávám obec {prubeh.dalsi()}: {obec_info['nazev']} ({kod_obce})")
+
+    with ThreadPoolExecutor(max_workers=soubeznost) as executor, ProcessPoolExecutor(max_workers=procesy) as pool:
+        # Každý proces má jednoho konzumenta fronty, aby nečekal bez práce
+        konzumenti = [asyncio.create_task(zpracovavej(pool)) for _ in range(procesy)]
+        await asyncio.gather(
+            *(stahuj(poradi, kod_obce, obec_info, executor)
+              for poradi, (kod_obce, obec_info) in enumerate(obce.items()))
+        )
+        for _ in konzumenti:
+            await fronta.put(None)
+        await asyncio.gather(*konzumenti)
+
+    stazeno = statistiky['stazeno']
+    zpracovano = statistiky['zpracovano']
+    print(f"Stahování: {stazeno} stránek za {statistiky['cas_stahovani']:.2f} s "
+          f"({stazeno / max(statistiky['cas_stahovani'], 1e-9):.1f} str/s)")
+    print(f"Zpracování: {zpracovano} stránek za {statistiky['cas_zpracovani']:.2f} s "
+          f"({zpracovano / max(statistiky['cas_zpracovani'], 1e-9):.1f} str/s, {procesy} procesů)")
+    print(f"Fronta: max {statistiky['max_fronta']}/{velikost_fronty}, "
+          f"průměr {statistiky['soucet_fronty'] / max(stazeno, 1):.1f}")
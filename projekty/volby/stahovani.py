@@ -0,0 +1,355 @@
+"""
+stahovani.py: sdílená vrstva pro stahování stránek z webu volby.cz
+
+Všechny požadavky jdou přes jednu requests.Session se sdíleným poolem
+spojení (keep-alive), takže se TCP a TLS spojení navazuje jen jednou
+pro každé souběžné spojení. Každý požadavek má timeout a při chybách
+5xx/429 nebo výpadku spojení se opakuje s exponenciálním čekáním
+a náhodným rozptylem (jitter). Volitelně se odpovědi ukládají do diskové
+cache (viz cache.py) a při dalším běhu se jen podmíněně ověří. Doba
+a velikost každé odpovědi se zaznamenávají do metrik (viz metriky.py).
+Tempo a souběžnost požadavků na každý server může řídit RizeniRychlosti
+(viz rizeni.py), které se přizpůsobuje latenci a odpovědím 429/503.
+Podmíněná ověření stránek z cache i z minulého běhu (stahni_podminene,
+viz prirustek.py) mají vlastní řízení s vyšším stropem, protože odpověď
+304 je levná.
+Knihovna requests se načte až s prvním stahovačem, ne při importu modulu.
+"""
+import contextlib
+import random
+import threading
+import time
+
+from .cache import DiskovaCache
+from .metriky import HRANICE_BAJTY, METRIKY
+from .rizeni import (POCATECNI_RYCHLOST_OVERENI, VYCHOZI_MAX_RYCHLOST, VYCHOZI_MAX_RYCHLOST_OVERENI,
+                     RizeniRychlosti)
+
+# Stavové kódy, u kterých má smysl požadavek zopakovat
+OPAKOVATELNE_KODY = (429, 500, 502, 503, 504)
+
+class Stahovac:
+    """
+    Stahovač stránek se sdíleným poolem spojení, timeouty a opakováním.
+    
+    Instanci lze bezpečně sdílet mezi vlákny.
+    """
+
+    def __init__(self, velikost_poolu=10, timeout=10.0, max_opakovani=3, zakladni_prodleva=0.5, cache=None,
+                 rizeni=None, rizeni_overeni=None, metriky=METRIKY):
+        """
+        Args:
+            velikost_poolu (int): Maximální počet otevřených spojení na jeden server
+            timeout (float): Timeout jednoho požadavku v sekundách
+            max_opakovani (int): Kolikrát se neúspěšný požadavek zopakuje
+            zakladni_prodleva (float): Čekání před prvním opakováním v sekundách
+            cache (DiskovaCache): Disková cache odpovědí, nebo None
+            rizeni (RizeniRychlosti): Adaptivní řízení tempa požadavků, nebo None (bez omezení)
+            rizeni_overeni (RizeniRychlosti): Řízení podmíněných ověření (stránka z cache
+                                              nebo stahni_podminene), None = stejné jako rizeni
+            metriky (Metriky): Registr metrik, do kterého se zaznamenávají požadavky
+        """
+        self.cache = cache
+        self.rizeni = rizeni
+        self.rizeni_overeni = rizeni if rizeni_overeni is None else rizeni_overeni
+        self.metriky = metriky
+        self.doba_pozadavku = metriky.histogram('volby_stahovani_sekundy', "Doba jednoho HTTP požadavku")
+        self.velikost_odpovedi = metriky.histogram(
+            'volby_odpoved_bajty', "Velikost těla HTTP odpovědi", hranice=HRANICE_BAJTY
+        )
+        self.chyby_spojeni = metriky.citac('volby_chyby_spojeni_celkem', "Výpadky spojení a timeouty")
+        self.timeout = timeout
+        self.max_opakovani = max_opakovani
+        self.zakladni_prodleva = zakladni_prodleva
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=velikost_poolu)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self.zamek = threading.Lock()
+        self.pocet_pozadavku = 0
+        self.pocet_opakovani = 0
+        self.prenesene_bajty = 0
+        self.zasahy_cache = 0
+        self.overene_z_cache = 0
+
+    def stahni(self, url):
+        """
+        Stáhne stránku, případně ji vezme z cache.
+        
+        Pokud je stránka v cache, server se jen podmíněně dotáže
+        (If-None-Match / If-Modified-Since) a při odpovědi 304 se vrátí
+        uložený obsah. V offline režimu cache se na server nechodí vůbec.
+        
+        Args:
+            url (str): URL adresa stránky
+            
+        Returns:
+            requests.Response: Úspěšná odpověď serveru nebo z cache
+            
+        Raises:
+            requests.exceptions.RequestException: Pokud se stránku nepodaří stáhnout ani po opakování
+        """
+        if self.cache is None:
+            return self._stahni_s_opakovanim(url, {})
+
+        zaznam = self.cache.nacti(url)
+        if self.cache.jen_offline:
+            if zaznam is None:
+                import requests
+                raise requests.exceptions.ConnectionError(f"Stránka není v cache (offline režim): {url}")
+            with self.zamek:
+                self.zasahy_cache += 1
+            self.metriky.citac('volby_cache_celkem', "Odpovědi vrácené z cache", vysledek='offline').pridej()
+            return self._odpoved_z_cache(url, zaznam)
+
+        hlavicky = {}
+        if zaznam is not None:
+            if zaznam['etag']:
+                hlavicky['If-None-Match'] = zaznam['etag']
+            if zaznam['last_modified']:
+                hlavicky['If-Modified-Since'] = zaznam['last_modified']
+
+        # Ověření stránky z cache je levné (304 bez těla), řídí ho rizeni_overeni
+        response = self._stahni_s_opakovanim(url, hlavicky, self.rizeni_overeni if hlavicky else self.rizeni)
+        if response.status_code == 304 and zaznam is not None:
+            with self.zamek:
+                self.overene_z_cache += 1
+            self.metriky.citac('volby_cache_celkem', "Odpovědi vrácené z cache", vysledek='overeno').pridej()
+            return self._odpoved_z_cache(url, zaznam)
+
+        if response.status_code == 200:
+            self.cache.uloz(
+                url,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                content_type=response.headers.get('Content-Type'),
+                kodovani=response.encoding,
+            )
+        return response
+
+    def stahni_podminene(self, url, etag=None, last_modified=None):
+        """
+        Stáhne stránku podmíněně podle validátorů z minulého běhu.
+
+        Disková cache se obchází: validátory i data stránky si drží volající
+        (volby.prirustek.StavObnoveni), odpověď 304 proto nemá tělo a obsah
+        stránky se do cache neukládá ani z ní nebere. Požadavky s validátory
+        řídí rizeni_overeni, požadavky bez nich (nová obec) běžné rizeni.
+
+        Args:
+            url (str): URL adresa stránky
+            etag (str): Hodnota ETag z minulé odpovědi, nebo None
+            last_modified (str): Hodnota Last-Modified z minulé odpovědi, nebo None
+
+        Returns:
+            requests.Response: Odpověď 200 s obsahem, nebo 304 pokud se stránka nezměnila
+
+        Raises:
+            requests.exceptions.RequestException: Pokud se stránku nepodaří stáhnout ani po opakování
+        """
+        hlavicky = {}
+        if etag:
+            hlavicky['If-None-Match'] = etag
+        if last_modified:
+            hlavicky['If-Modified-Since'] = last_modified
+        return self._stahni_s_opakovanim(url, hlavicky, self.rizeni_overeni if hlavicky else self.rizeni)
+
+    @staticmethod
+    def _odpoved_z_cache(url, zaznam):
+        """
+        Sestaví objekt odpovědi z uloženého záznamu cache.
+        
+        Args:
+            url (str): URL adresa stránky
+            zaznam (dict): Záznam vrácený DiskovaCache.nacti()
+            
+        Returns:
+            requests.Response: Odpověď se stavovým kódem 200 a uloženým obsahem
+        """
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = zaznam['obsah']
+        response.encoding = zaznam['kodovani']
+        response.headers = CaseInsensitiveDict()
+        if zaznam['content_type']:
+            response.headers['Content-Type'] = zaznam['content_type']
+        return response
+
+    def _stahni_s_opakovanim(self, url, hlavicky, rizeni=None):
+        """
+        Stáhne stránku ze serveru, při přechodné chybě požadavek opakuje.
+        
+        Args:
+            url (str): URL adresa stránky
+            hlavicky (dict): Dodatečné hlavičky požadavku
+            rizeni (RizeniRychlosti): Řízení tempa tohoto požadavku, None = self.rizeni
+            
+        Returns:
+            requests.Response: Úspěšná odpověď serveru (včetně 304 Not Modified)
+        """
+        import requests
+        
+        if rizeni is None:
+            rizeni = self.rizeni
+        
+        pokus = 0
+        while True:
+            povoleni = rizeni.pozadavek(url) if rizeni is not None else contextlib.nullcontext()
+            try:
+                with povoleni:
+                    start = time.perf_counter()
+                    response = self.session.get(url, headers=hlavicky, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.chyby_spojeni.pridej()
+                if rizeni is not None:
+                    rizeni.zaznamenej(url, time.perf_counter() - start)
+                if pokus >= self.max_opakovani:
+                    raise
+                self._pockej(pokus, None)
+                pokus += 1
+                continue
+
+            doba = time.perf_counter() - start
+            self.doba_pozadavku.zaznamenej(doba)
+            if rizeni is not None:
+                rizeni.zaznamenej(url, doba, response.status_code, response.headers.get('Retry-After'))
+            self.velikost_odpovedi.zaznamenej(len(response.content))
+            self.metriky.citac('volby_odpovedi_celkem', "HTTP odpovědi podle stavového kódu",
+                               stav=str(response.status_code)).pridej()
+            with self.zamek:
+                self.pocet_pozadavku += 1
+                self.prenesene_bajty += len(response.content)
+
+            if response.status_code in OPAKOVATELNE_KODY and pokus < self.max_opakovani:
+                self._pockej(pokus, response.headers.get('Retry-After'))
+                pokus += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def _pockej(self, pokus, retry_after):
+        """
+        Počká před dalším pokusem (exponenciální čekání s plným jitterem).
+        
+        Args:
+            pokus (int): Pořadí neúspěšného pokusu (od 0)
+            retry_after (str): Hodnota hlavičky Retry-After, pokud ji server poslal
+        """
+        with self.zamek:
+            self.pocet_opakovani += 1
+        prodleva = random.uniform(0, self.zakladni_prodleva * 2 ** pokus)
+        if retry_after and retry_after.isdigit():
+            prodleva = max(prodleva, float(retry_after))
+        time.sleep(prodleva)
+
+    def znovupouzita_spojeni(self):
+        """
+        Spočítá, kolik požadavků využilo již otevřené spojení z poolu.
+        
+        Returns:
+            int: Počet požadavků obsloužených bez navázání nového spojení
+        """
+        pools = self.adapter.poolmanager.pools
+        pozadavky = spojeni = 0
+        for klic in pools.keys():
+            pool = pools.get(klic)
+            if pool is not None:
+                pozadavky += pool.num_requests
+                spojeni += pool.num_connections
+        return pozadavky - spojeni
+
+    def statistiky(self):
+        """
+        Vrátí počítadla stahování.
+        
+        Returns:
+            dict: Počet požadavků, opakování, znovupoužitých spojení, přenesených bajtů
+                  a odpovědí vrácených z cache (bez ověření / po ověření 304)
+        """
+        with self.zamek:
+            return {
+                'pozadavky': self.pocet_pozadavku,
+                'opakovani': self.pocet_opakovani,
+                'znovupouzita_spojeni': self.znovupouzita_spojeni(),
+                'prenesene_bajty': self.prenesene_bajty,
+                'zasahy_cache': self.zasahy_cache,
+                'overene_z_cache': self.overene_z_cache,
+            }
+
+    def vypis_statistiky(self):
+        """
+        Vypíše počítadla stahování na standardní výstup.
+        """
+        s = self.statistiky()
+        print(f"Statistiky stahování: {s['pozadavky']} požadavků, {s['opakovani']} opakování, "
+              f"{s['znovupouzita_spojeni']} znovupoužitých spojení, {s['prenesene_bajty'] / 1024:.0f} kB, "
+              f"z cache {s['zasahy_cache']} + {s['overene_z_cache']} ověřených (304)")
+        if self.rizeni is not None:
+            self.rizeni.vypis_stav()
+        if self.rizeni_overeni is not None and self.rizeni_overeni is not self.rizeni:
+            self.rizeni_overeni.vypis_stav("Řízení ověření (304)")
+
+
+# Sdílený stahovač pro celý proces
+_stahovac = None
+
+def nastav_stahovac(stahovac):
+    """
+    Nastaví sdílený stahovač používaný funkcí stahni().
+    
+    Args:
+        stahovac (Stahovac): Nový sdílený stahovač
+    """
+    global _stahovac
+    _stahovac = stahovac
+
+def vytvor_stahovac(max_rychlost=VYCHOZI_MAX_RYCHLOST):
+    """
+    Vytvoří stahovač s výchozí diskovou cache a řízením rychlosti.
+    
+    Args:
+        max_rychlost (float): Strop požadavků za sekundu na jeden server (ověření 304 mají vlastní strop)
+        
+    Returns:
+        Stahovac: Nový stahovač
+    """
+    return Stahovac(
+        cache=DiskovaCache(),
+        rizeni=RizeniRychlosti(max_rychlost),
+        rizeni_overeni=RizeniRychlosti(VYCHOZI_MAX_RYCHLOST_OVERENI, pocatecni_rychlost=POCATECNI_RYCHLOST_OVERENI),
+    )
+
+def ziskej_stahovac():
+    """
+    Vrátí sdílený stahovač, případně vytvoří výchozí.
+    
+    Returns:
+        Stahovac: Sdílený stahovač
+    """
+    global _stahovac
+    if _stahovac is None:
+        _stahovac = vytvor_stahovac()
+    return _stahovac
+
+def stahni(url):
+    """
+    Stáhne stránku sdíleným stahovačem.
+    
+    Args:
+        url (str): URL adresa stránky
+        
+    Returns:
+        requests.Response: Úspěšná odpověď serveru
+    """
+    return ziskej_stahovac().stahni(url)
@@ -0,0 +1,109 @@
+"""
+studeny_start.py: měření doby studeného startu příkazů (python -X importtime)
+
+Každý příkaz se spustí jako nový proces několikrát a bere se nejkratší
+doba běhu. Jeden běh navíc s -X importtime ukáže celkovou dobu importů,
+nejpomalejší importy nejvyšší úrovně a které těžké knihovny se načetly.
+U --help a chybných argumentů by se žádná těžká knihovna načíst neměla.
+"""
+import os
+import subprocess
+import sys
+import time
+
+ADRESAR_PROJEKTU = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Knihovny, které mají načítat až etapy, které je potřebují
+TEZKE_MODULY = ('requests', 'bs4', 'lxml', 'numpy', 'pyarrow', 'asyncio', 'concurrent.futures')
+
+def prikazy_startu():
+    """
+    Returns:
+        dict: {název: argumenty procesu} - měřené příkazy (nápověda a chybné argumenty)
+    """
+    python = sys.executable
+    return {
+        'volby --help': [python, '-m', 'volby', '--help'],
+        'volby crawl --help': [python, '-m', 'volby', 'crawl', '--help'],
+        'volby export --help': [python, '-m', 'volby', 'export', '--help'],
+        'scraper.py --help': [python, os.path.join(ADRESAR_PROJEKTU, 'scraper', 'scraper.py'), '--help'],
+        'scraper.py špatná URL': [python, os.path.join(ADRESAR_PROJEKTU, 'scraper', 'scraper.py'),
+                                  'https://example.com/', 'x.csv'],
+        'main.py bez argumentů': [python, os.path.join(ADRESAR_PROJEKTU, 'main', 'main.py')],
+    }
+
+def rozbor_importtime(vystup):
+    """
+    Přečte výpis -X importtime (standardní chybový výstup procesu).
+
+    Args:
+        vystup (str): Chybový výstup procesu spuštěného s -X importtime
+
+    Returns:
+        tuple: (celková doba importů v ms, {modul: kumulativní doba v ms} importů nejvyšší úrovně)
+    """
+    nejvyssi = {}
+    for radek in vystup.splitlines():
+        if not radek.startswith('import time:') or 'cumulative' in radek:
+            continue
+        _, kumulativni, nazev = radek.split('|')
+        # Vnořené importy jsou za svislítkem odsazené o další dvě mezery
+        if not nazev.startswith('  '):
+            nejvyssi[nazev.strip()] = int(kumulativni) / 1000
+    return sum(nejvyssi.values()), nejvyssi
+
+def zmer_start(argumenty, opakovani=5):
+    """
+    Změří studený start jednoho příkazu.
+
+    Args:
+        argumenty (list): Argumenty procesu (první je interpret Pythonu)
+        opakovani (int): Počet spuštění, bere se nejkratší
+
+    Returns:
+        dict: Doba běhu (min a medián v ms), doba importů v ms, nejpomalejší importy
+              a načtené těžké knihovny
+    """
+    doby = []
+    for _ in range(opakovani):
+        start = time.perf_counter()
+        subprocess.run(argumenty, cwd=ADRESAR_PROJEKTU, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        doby.append((time.perf_counter() - start) * 1000)
+    doby.sort()
+
+    proces = subprocess.run([argumenty[0], '-X', 'importtime', *argumenty[1:]], cwd=ADRESAR_PROJEKTU,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    importy_ms, nejvyssi = rozbor_importtime(proces.stderr)
+    nactene = {radek.rsplit('|', 1)[-1].strip() for radek in proces.stderr.splitlines()
+               if radek.startswith('import time:')}
+    return {
+        'min_ms': round(doby[0], 1),
+        'median_ms': round(doby[len(doby) // 2], 1),
+        'importy_ms': round(importy_ms, 1),
+        'nejpomalejsi': sorted(nejvyssi.items(), key=lambda polozka: -polozka[1])[:5],
+        'tezke_moduly': [modul for modul in TEZKE_MODULY if modul in nactene],
+    }
+
+def zmer_starty(opakovani=5, prikazy=None):
+    """
+    Změří studený start všech příkazů.
+
+    Args:
+        opakovani (int): Počet spuštění každého příkazu
+        prikazy (dict): {název: argumenty}, None = prikazy_startu()
+
+    Returns:
+        dict: {název: výsledek zmer_start()}
+    """
+    return {nazev: zmer_start(argumenty, opakovani) for nazev, argumenty in (prikazy or prikazy_startu()).items()}
+
+def vypis_starty(vysledky):
+    """
+    Vypíše výsledky zmer_starty() jako tabulku.
+    """
+    print(f"{'příkaz':<24} {'min ms':>8} {'medián ms':>10} {'importy ms':>11}  těžké knihovny / nejpomalejší importy")
+    for nazev, vysledek in vysledky.items():
+        tezke = ', '.join(vysledek['tezke_moduly']) or '-'
+        pomale = ', '.join(f"{modul} {ms:.0f}" for modul, ms in vysledek['nejpomalejsi'][:3])
+        print(f"{nazev:<24} {vysledek['min_ms']:>8.1f} {vysledek['median_ms']:>10.1f} {vysledek['importy_ms']:>11.1f}"
+              f"  {tezke} / {pomale}")
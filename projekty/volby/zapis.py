@@ -0,0 +1,167 @@
+"""
+zapis.py: průběžný zápis výsledků obcí do CSV souboru
+
+Řádky se zapisují hned, jak je obec zpracovaná, do rozpracovaného souboru
+<vystup>.part, takže paměť nezávisí na počtu obcí a při pádu programu
+zůstanou již zpracované obce na disku. Sloupce stran se určí z první obce
+(kandidátní listina je v celém kraji stejná). Pokud se později objeví
+nová strana, přidá se na konec řádku a při dokončení se soubor jedním
+průchodem přepíše s úplnou hlavičkou a sloupci stran seřazenými podle
+názvu - výsledek je stejný jako při zápisu všech dat najednou.
+
+DlouhyZapisovac zapisuje výsledky více voleb v dlouhém formátu
+s pevnými sloupci (jeden řádek pro každou stranu v každé obci).
+"""
+import csv
+import os
+
+class CsvZapisovac:
+    """
+    Průběžný zapisovač řádků obcí se sloupci pro jednotlivé strany.
+    """
+
+    def __init__(self, vystupni_soubor, zakladni_hlavicka, **format_csv):
+        """
+        Args:
+            vystupni_soubor (str): Název výstupního CSV souboru
+            zakladni_hlavicka (list): Názvy sloupců před sloupci stran
+            **format_csv: Parametry pro csv.writer (např. delimiter=';')
+        """
+        self.vystupni_soubor = vystupni_soubor
+        self.rozpracovany_soubor = vystupni_soubor + '.part'
+        self.zakladni_hlavicka = list(zakladni_hlavicka)
+        self.format_csv = format_csv
+        self.strany = None
+        self.poradi_stran = {}
+        self.prepsat = False
+        self.pocet_radku = 0
+        self.soubor = None
+        self.writer = None
+
+    def zapis(self, zakladni_hodnoty, hlasy):
+        """
+        Zapíše řádek jedné obce.
+
+        Args:
+            zakladni_hodnoty (list): Hodnoty základních sloupců
+            hlasy (dict): Slovník {název strany: počet hlasů}
+        """
+        if self.soubor is None:
+            # Sloupce stran určí první obec, seřazené jako ve výsledném souboru
+            self.strany = sorted(hlasy)
+            self.poradi_stran = {strana: i for i, strana in enumerate(self.strany)}
+            self.soubor = open(self.rozpracovany_soubor, 'w', newline='', encoding='utf-8-sig')
+            self.writer = csv.writer(self.soubor, **self.format_csv)
+            self.writer.writerow(self.zakladni_hlavicka + self.strany)
+
+        for strana in hlasy:
+            if strana not in self.poradi_stran:
+                self.poradi_stran[strana] = len(self.strany)
+                self.strany.append(strana)
+                self.prepsat = True
+
+        self.writer.writerow(list(zakladni_hodnoty) + [hlasy.get(strana, '0') for strana in self.strany])
+        self.soubor.flush()
+        self.pocet_radku += 1
+
+    def zapis_vysledek(self, vysledek):
+        """
+        Zapíše řádek obce ze záznamu volby.model.VysledekObce.
+
+        Args:
+            vysledek (VysledekObce): Výsledky obce
+        """
+        self.zapis(vysledek.zakladni_hodnoty(), dict(vysledek.strany()))
+
+    def dokonci(self):
+        """
+        Uzavře rozpracovaný soubor a přesune ho na místo výstupního souboru.
+
+        Returns:
+            int: Počet zapsaných řádků obcí (0 znamená, že se nic nezapsalo)
+        """
+        if self.soubor is None:
+            return 0
+        self.soubor.close()
+        self.soubor = None
+
+        if self.prepsat:
+            self._prepis_s_uplnou_hlavickou()
+        else:
+            os.replace(self.rozpracovany_soubor, self.vystupni_soubor)
+        return self.pocet_radku
+
+    def _prepis_s_uplnou_hlavickou(self):
+        # Streamovaně přepíšeme soubor - nová hlavička, seřazené sloupce stran,
+        # chybějící hodnoty u starších (kratších) řádků doplníme nulou
+        strany = sorted(self.strany)
+        zaklad = len(self.zakladni_hlavicka)
+        indexy = [zaklad + self.poradi_stran[strana] for strana in strany]
+        docasny = self.vystupni_soubor + '.tmp'
+
+        with open(self.rozpracovany_soubor, newline='', encoding='utf-8-sig') as vstup, \
+                open(docasny, 'w', newline='', encoding='utf-8-sig') as vystup:
+            reader = csv.reader(vstup, **self.format_csv)
+            writer = csv.writer(vystup, **self.format_csv)
+            next(reader)
+            writer.writerow(self.zakladni_hlavicka + strany)
+            for radek in reader:
+                writer.writerow(radek[:zaklad] + [radek[i] if i < len(radek) else '0' for i in indexy])
+
+        os.replace(docasny, self.vystupni_soubor)
+        os.remove(self.rozpracovany_soubor)
+
+
+# Hlavička dlouhého formátu - jeden řádek pro každou dvojici (volby, obec, strana)
+HLAVICKA_DLOUHA = ['Volby', 'Kód obce', 'Název obce', 'Voliči v seznamu', 'Vydané obálky', 'Platné hlasy',
+                   'Strana', 'Hlasy']
+
+class DlouhyZapisovac:
+    """
+    Průběžný zapisovač výsledků více voleb v dlouhém formátu.
+
+    Každý řádek je klíčovaný trojicí (volby, kód obce, strana), souhrnné
+    počty obce se opakují u každé její strany. Sloupce jsou pevné, takže
+    se soubor nikdy nepřepisuje a volby s různými kandidátkami jdou do
+    jednoho souboru.
+    """
+
+    def __init__(self, vystupni_soubor, **format_csv):
+        """
+        Args:
+            vystupni_soubor (str): Název výstupního CSV souboru
+            **format_csv: Parametry pro csv.writer (např. delimiter=';')
+        """
+        self.vystupni_soubor = vystupni_soubor
+        self.rozpracovany_soubor = vystupni_soubor + '.part'
+        self.soubor = open(self.rozpracovany_soubor, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.soubor, **format_csv)
+        self.writer.writerow(HLAVICKA_DLOUHA)
+        self.pocet_obci = 0
+
+    def zapis_vysledek(self, volby, vysledek):
+        """
+        Zapíše řádky jedné obce (jeden pro každou stranu).
+
+        Args:
+            volby (str): Klíč voleb (např. 'ps2017')
+            vysledek (VysledekObce): Výsledky obce
+        """
+        zaklad = [volby] + vysledek.zakladni_hodnoty()
+        self.writer.writerows(zaklad + [strana, hlasy] for strana, hlasy in vysledek.strany())
+        self.soubor.flush()
+        self.pocet_obci += 1
+
+    def dokonci(self):
+        """
+        Uzavře rozpracovaný soubor a přesune ho na místo výstupního souboru.
+
+        Returns:
+            int: Počet zapsaných obcí (0 znamená, že se nic nezapsalo)
+        """
+        self.soubor.close()
+        if not self.pocet_obci:
+            os.remove(self.rozpracovany_soubor)
+            return 0
+        os.replace(self.rozpracovany_soubor, self.vystupni_soubor)
+        return self.pocet_obci
@@ -0,0 +1,95 @@
+"""
+zurnal.py: žurnál hotových obcí pro navázání přerušeného stahování
+
+Každá zpracovaná obec se připíše jako jeden řádek JSON (JSONL) a soubor
+se hned vyprázdní na disk. Po přerušení se žurnál načte a hotové obce se
+znovu nestahují. Neúplný poslední řádek (pád uprostřed zápisu) se při
+načítání přeskočí.
+"""
+import json
+import os
+
+class Zurnal:
+    """
+    Žurnál výsledků obcí ve formátu JSONL, do kterého se jen připisuje.
+
+    Atribut hotove obsahuje jen obce načtené ze žurnálu při navázání.
+    Nově zapsané výsledky se v paměti nedrží (jsou v souboru), aby
+    stahování i se žurnálem běželo s konstantní pamětí.
+    """
+
+    def __init__(self, cesta, navazat=False, prevod=None):
+        """
+        Args:
+            cesta (str): Cesta k souboru žurnálu
+            navazat (bool): True = ponechat dosavadní záznamy, False = začít znovu
+            prevod (callable): Funkce převádějící uložený slovník na výsledek
+                               (např. VysledekObce.ze_slovniku), None = ponechat slovník
+        """
+        self.cesta = cesta
+        self.hotove = nacti_zurnal(cesta, prevod) if navazat else {}
+        self.soubor = open(cesta, 'a' if navazat else 'w', encoding='utf-8')
+        if navazat and self.soubor.tell() > 0:
+            # Neúplný poslední řádek uzavřeme, aby se nespojil s dalším záznamem
+            with open(cesta, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self.soubor.write('\n')
+
+    def zapis(self, poradi, vysledek):
+        """
+        Připíše výsledek obce do žurnálu.
+
+        Args:
+            poradi (int): Pořadí obce na přehledové stránce (od 0)
+            vysledek (dict | VysledekObce): Data obce (slovník s klíčem 'kod' nebo záznam s jako_slovnik())
+        """
+        data = vysledek.jako_slovnik() if hasattr(vysledek, 'jako_slovnik') else vysledek
+        self.soubor.write(json.dumps({'poradi': poradi, 'vysledek': data}, ensure_ascii=False) + '\n')
+        self.soubor.flush()
+
+    def zavri(self):
+        """
+        Uzavře soubor žurnálu.
+        """
+        self.soubor.close()
+
+    def odstran(self):
+        """
+        Uzavře a smaže soubor žurnálu (po úspěšném uložení výstupu).
+        """
+        self.soubor.close()
+        try:
+            os.remove(self.cesta)
+        except FileNotFoundError:
+            pass
+
+
+def nacti_zurnal(cesta, prevod=None):
+    """
+    Načte hotové obce ze žurnálu.
+
+    Args:
+        cesta (str): Cesta k souboru žurnálu
+        prevod (callable): Funkce převádějící uložený slovník na výsledek, None = ponechat slovník
+
+    Returns:
+        dict: Slovník {kód obce: data obce} v pořadí obcí na přehledové stránce
+    """
+    if not os.path.exists(cesta):
+        return {}
+
+    zaznamy = []
+    with open(cesta, encoding='utf-8') as f:
+        for radek in f:
+            try:
+                zaznam = json.loads(radek)
+            except json.JSONDecodeError:
+                # Neúplný řádek po pádu programu
+                continue
+            zaznamy.append((zaznam['poradi'], zaznam['vysledek']))
+
+    zaznamy.sort(key=lambda zaznam: zaznam[0])
+    if prevod is None:
+        return {vysledek['kod']: vysledek for _, vysledek in zaznamy}
+    return {vysledek['kod']: prevod(vysledek) for _, vysledek in zaznamy}